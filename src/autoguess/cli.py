@@ -9,9 +9,11 @@ License: GPL-3.0-or-later
 """
 
 from autoguess.core import search
+from autoguess.core import relationcache
 from argparse import ArgumentParser, RawTextHelpFormatter
 import os
-from autoguess.config import TEMP_DIR, ensure_minizinc_driver
+import multiprocessing
+from autoguess.config import TEMP_DIR, available_minizinc_solvers
 
 try:
     from importlib.metadata import version as _version
@@ -22,14 +24,9 @@ except Exception:
 
 def _get_available_cp_solvers():
     """Return list of available MiniZinc CP solvers, or a default list if MiniZinc is not installed."""
-    try:
-        ensure_minizinc_driver()
-        import minizinc
-        driver = minizinc.default_driver
-        if driver is not None:
-            return list(driver.available_solvers().keys())
-    except (ImportError, Exception):
-        pass
+    solvers = available_minizinc_solvers()
+    if solvers:
+        return solvers
     # Default choices when MiniZinc is not available
     return ["cp-sat", "gecode", "chuffed"]
 
@@ -61,42 +58,131 @@ def _get_available_smt_solvers():
         return ['z3']
 
 
+def _default_milp_solver():
+    """Use Gurobi if gurobipy is installed, and HiGHS (via SciPy) otherwise."""
+    import importlib.util
+    return 'gurobi' if importlib.util.find_spec('gurobipy') is not None else 'highs'
+
+
+def _validate_backend_parameters(parser, params):
+    """
+    Check the solver name of the selected backend only.  Discovering the
+    solvers of every backend up front costs seconds (MiniZinc, pySMT), which
+    dominates short SAT or propagate runs.
+    """
+    solver = params['solver']
+    if params['deepen'] and (solver != 'sat' or params['findmin']):
+        parser.error("argument --deepen: only supported with -s sat and without --findmin")
+    if (params['bisect'] or params['probes'] > 1) and (solver != 'sat' or not params['findmin']):
+        parser.error("argument --bisect/--probes: only supported with -s sat and --findmin")
+    if params['probes'] > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+        parser.error("argument --probes: parallel probes require the 'fork' start method")
+    if params['enumerate'] is not None and (solver != 'sat' or params['findmin'] or params['deepen']
+                                            or params['enumerate'] < 1):
+        parser.error("argument --enumerate: a positive number, only supported with -s sat and without --findmin/--deepen")
+    if params['blocksupersets'] and params['enumerate'] is None:
+        parser.error("argument --blocksupersets: only supported with --enumerate")
+    if params['stratify'] and solver != 'maxsat':
+        parser.error("argument --stratify: only supported with -s maxsat")
+    if params['hint'] is not None and solver not in ('cp', 'cpsat', 'milp', 'sat', 'portfolio'):
+        parser.error("argument --hint: only supported with -s cp, cpsat, milp, sat and portfolio")
+    if solver == 'cp':
+        if params['cpsolver'] is None:
+            params['cpsolver'] = _default_cp_solver()
+        else:
+            available = _get_available_cp_solvers()
+            if params['cpsolver'] not in available:
+                parser.error("argument -cps/--cpsolver: invalid choice: '%s' (choose from %s)" % (
+                    params['cpsolver'], ', '.join(available)))
+    elif solver == 'milp':
+        if params['milpsolver'] is None:
+            params['milpsolver'] = _default_milp_solver()
+        if params['hint'] is not None and params['milpsolver'] == 'highs':
+            parser.error("argument --hint: scipy.optimize.milp takes no initial solution (use -milps gurobi)")
+    elif solver in ('sat', 'maxsat', 'portfolio') or params['reducestrategy'] == 'exact':
+        available = _get_available_sat_solvers()
+        if params['satsolver'] not in available:
+            parser.error("argument -sats/--satsolver: invalid choice: '%s' (choose from %s)" % (
+                params['satsolver'], ', '.join(available)))
+    elif solver == 'smt':
+        available = _get_available_smt_solvers()
+        if params['smtsolver'] not in available:
+            parser.error("argument -smts/--smtsolver: invalid choice: '%s' (choose from %s)" % (
+                params['smtsolver'], ', '.join(available)))
+
+
 def _resolve_dynamic_defaults(params):
     """
-    If maxguess or maxsteps were not supplied by the user, derive sensible
-    defaults from the input file:
+    If maxguess or maxsteps were not supplied by the user, derive defaults
+    from the input file.  A greedy guess basis (propagate.greedy_guess_basis)
+    is a witness for its own size and propagation depth, so these are used:
+      maxguess  -> size of the greedy basis
+      maxsteps  -> number of propagation steps the greedy basis needs
+    unless the value given for the other option rules the witness out, in
+    which case the loose bounds are used:
       maxguess  -> number of target variables
       maxsteps  -> number of all variables (before preprocessing)
-    A lightweight parse (preprocess=0) is used so this is fast.
+    A lightweight parse (preprocess=0) is used so this is fast.  Adding the
+    relations derived by preprocessing can only shorten the propagation, so
+    the bounds also hold for the preprocessed system.
     """
     if params['maxguess'] is not None and params['maxsteps'] is not None:
         return
     from .core.inputparser import read_relation_file
-    parsed = read_relation_file(params['inputfile'], preprocess=0, D=2, log=0)
+    parsed = read_relation_file(params['inputfile'], preprocess=0, D=2, log=0,
+                                extra_known=search._parse_extra_known(params))
+    loose_guess = len(parsed['target_variables'])
+    loose_steps = len(parsed['variables'])
+    # These solvers do not unroll the propagation (and --reducebasis uses
+    # maxsteps for another basis), so the heuristic would be wasted
+    if params['solver'] in ('groebner', 'propagate'):
+        greedy = None
+    else:
+        from .core.propagate import greedy_guess_basis
+        greedy = greedy_guess_basis(parsed)
+    if greedy is not None:
+        basis, depth = greedy
+        print('Greedy heuristic: %d guessed variable(s), determined within %d step(s)' % (len(basis), depth))
+        print('  %s' % (', '.join(basis) if basis else '(no guess needed)'))
     if params['maxguess'] is None:
-        params['maxguess'] = len(parsed['target_variables'])
+        if greedy is not None and (params['maxsteps'] is None or depth <= params['maxsteps']):
+            params['maxguess'] = len(basis)
+        else:
+            params['maxguess'] = loose_guess
     if params['maxsteps'] is None:
-        params['maxsteps'] = len(parsed['variables'])
+        if greedy is not None and len(basis) <= params['maxguess']:
+            params['maxsteps'] = depth
+        else:
+            params['maxsteps'] = loose_steps
+
 
 def start_search(params):
     """
     Starts the search tool for the given parameters
     """
+    if not params['cache']:
+        # Also seen by the subprocesses (e.g., the Groebner basis solver)
+        os.environ['AUTOGUESS_NO_CACHE'] = '1'
+        relationcache.set_enabled(False)
     _resolve_dynamic_defaults(params)
     solver = params["solver"]
     search_methods = {
         'milp': search.search_using_milp,
         'sat': search.search_using_sat,
         'smt': search.search_using_smt,
+        'maxsat': search.search_using_maxsat,
         'cp': search.search_using_cp,
+        'cpsat': search.search_using_cpsat,
         'groebner': search.search_using_groebnerbasis,
         'propagate': search.search_using_propagate,
+        'portfolio': search.search_using_portfolio,
+        'localsearch': search.search_using_localsearch,
     }
 
     if solver in search_methods:
         search_methods[solver](params)
     else:
-        print('Choose the solver from the following options: cp, milp, sat, smt, groebner, propagate')
+        print('Choose the solver from the following options: cp, cpsat, milp, sat, smt, maxsat, groebner, propagate, portfolio, localsearch')
 
 
 def check_environment():
@@ -118,8 +204,9 @@ def load_parameters(args):
         "maxsteps": None,
         "solver": 'cp',
         "milpdirection": 'min',
+        "milpsolver": None,
         "timelimit": -1,
-        "cpsolver": _default_cp_solver(),
+        "cpsolver": None,
         "satsolver": 'cadical153',
         "smtsolver": 'z3',
         "cpoptimization": 1,
@@ -132,10 +219,20 @@ def load_parameters(args):
         "dglayout": "dot",
         "drawgraph": True,
         "findmin": False,
+        "deepen": False,
+        "bisect": False,
+        "probes": 1,
+        "stratify": False,
         "reducebasis": False,
+        "reducestrategy": 'subsets',
+        "prune": True,
+        "cache": True,
         "threads": 0,
         "log": 1,
-        "known": None
+        "known": None,
+        "hint": None,
+        "enumerate": None,
+        "blocksupersets": False
     }
 
     for key in params:
@@ -149,9 +246,27 @@ def load_parameters(args):
     if getattr(args, 'findmin', False):
         params['findmin'] = True
 
+    if getattr(args, 'deepen', False):
+        params['deepen'] = True
+
+    if getattr(args, 'bisect', False):
+        params['bisect'] = True
+
+    if getattr(args, 'stratify', False):
+        params['stratify'] = True
+
     if getattr(args, 'reducebasis', False):
         params['reducebasis'] = True
 
+    if getattr(args, 'noprune', False):
+        params['prune'] = False
+
+    if getattr(args, 'no_cache', False):
+        params['cache'] = False
+
+    if getattr(args, 'blocksupersets', False):
+        params['blocksupersets'] = True
+
     return params
 
 
@@ -167,20 +282,28 @@ def main():
         formatter_class=RawTextHelpFormatter)
     parser.add_argument('-i', '--inputfile', nargs=1, help="Use an input file in plain text format")
     parser.add_argument('-o', '--outputfile', nargs=1, help="Use an output file to write the output into it")
-    parser.add_argument('-mg', '--maxguess', nargs=1, type=int, help="An upper bound for the number of guessed variables\n(default: number of target variables)")
-    parser.add_argument('-ms', '--maxsteps', nargs=1, type=int, help="An integer number specifying the depth of search\n(default: number of variables before preprocessing)")
+    parser.add_argument('-mg', '--maxguess', nargs=1, type=int, help="An upper bound for the number of guessed variables\n(default: size of a greedy guess basis)")
+    parser.add_argument('-ms', '--maxsteps', nargs=1, type=int, help="An integer number specifying the depth of search\n(default: number of steps the greedy guess basis needs)")
     parser.add_argument('-s', '--solver', nargs=1,
-                        choices=['cp', 'milp', 'sat', 'smt', 'groebner', 'propagate'],
-                        help="Solver choice")
+                        choices=['cp', 'cpsat', 'milp', 'sat', 'smt', 'maxsat', 'groebner', 'propagate', 'portfolio', 'localsearch'],
+                        help="Solver choice ('cpsat' builds the CP model directly with OR-Tools, without MiniZinc;\n"
+                             "'portfolio' races the installed CP/MILP/SAT/SMT backends\n"
+                             "and several SAT solvers in parallel (only the weight-aware CP-SAT/MILP/SAT\n"
+                             "backends with a weights section); -t limits the number of workers;\n"
+                             "'localsearch' runs simulated annealing over guess bases until -tl\n"
+                             "(default: 10 seconds), with -t parallel restarts)")
     parser.add_argument('-milpd', '--milpdirection', nargs=1, choices=['min', 'max'], help="MILP direction")
+    parser.add_argument('-milps', '--milpsolver', nargs=1, choices=['gurobi', 'highs'],
+                        help="MILP solver choice ('highs' uses scipy.optimize.milp and needs no license)\n"
+                             "(default: gurobi if gurobipy is installed, highs otherwise)")
+    # Solver names are validated after parsing, and only for the chosen
+    # backend, so that e.g. a SAT run never probes MiniZinc or pySMT.
     parser.add_argument('-cps', '--cpsolver', nargs=1, type=str,
-                        choices=_get_available_cp_solvers(),
-                        help="CP solver choice", default=[_default_cp_solver()])
+                        help="CP solver choice\n(default: cp-sat > gecode > chuffed, whichever is installed)")
     parser.add_argument('-sats', '--satsolver', nargs=1, type=str,
-                        choices=_get_available_sat_solvers(),
                         help="SAT solver choice")
     parser.add_argument('-smts', '--smtsolver', nargs=1, type=str,
-                        choices=_get_available_smt_solvers(), help="SMT solver choice")
+                        help="SMT solver choice")
     parser.add_argument('-cpopt', '--cpoptimization', nargs=1, type=int, choices=[0, 1], help="CP optimization")
     parser.add_argument('-tl', '--timelimit', nargs=1, type=int, help="Time limit for the search in seconds")
     parser.add_argument('-tk', '--tikz', nargs=1, type=int,
@@ -204,14 +327,48 @@ def main():
     parser.add_argument('-kn', '--known', nargs=1, type=str,
                         help="Comma-separated list of additionally known variables")
     parser.add_argument('-t', '--threads', nargs=1, type=int,
-                        help="Number of threads for CP/MILP solvers\n(default: 0 = use all available cores)")
+                        help="Number of threads for CP/MILP solvers, and of worker processes\nfor the large batches of --reducebasis (default: 0 = use all available cores)")
     parser.add_argument('--nograph', action='store_true', default=False,
                         help="Skip generating the determination flow graph (faster)")
     parser.add_argument('--findmin', action='store_true', default=False,
                         help="Iteratively decrease max_guess to find the minimum number of guesses (SAT/SMT only)")
+    parser.add_argument('--bisect', action='store_true', default=False,
+                        help="With --findmin, binary search over the bound on the number of guesses\n"
+                             "instead of decreasing it one step at a time (SAT only)")
+    parser.add_argument('--probes', nargs=1, type=int,
+                        help="With --findmin, solve this many bounds at once in forked processes,\n"
+                             "each one limited by -tl (implies --bisect, SAT only, default: 1)")
+    parser.add_argument('--deepen', action='store_true', default=False,
+                        help="Add the steps one at a time to a single incremental SAT solver and stop at\n"
+                             "the smallest number of steps (up to max_steps) that is feasible (SAT only)")
+    parser.add_argument('--stratify', action='store_true', default=False,
+                        help="Use stratified RC2, which handles the heaviest guesses first\n"
+                             "(MaxSAT only, useful with a weights section)")
     parser.add_argument('--reducebasis', action='store_true', default=False,
-                        help="Reduce a known guess basis via propagation: test subsets of\n"
-                             "decreasing size (requires -s propagate and -kn)")
+                        help="Reduce a known guess basis via propagation (requires -s propagate and -kn)")
+    parser.add_argument('--reducestrategy', nargs=1, choices=['subsets', 'deletion', 'quickxplain', 'exact'],
+                        help="Strategy of --reducebasis (default: subsets):\n"
+                             "'subsets' tests the subsets of decreasing size (minimum size, exponential),\n"
+                             "'deletion' and 'quickxplain' find an inclusion-minimal subset with few closures,\n"
+                             "'exact' shrinks the deletion result to the minimum size with the SAT model\n"
+                             "(-ms steps, -sats solver)")
+    parser.add_argument('--enumerate', nargs=1, type=int,
+                        help="Stream up to this many guess bases (of at most max_guess variables) out of one\n"
+                             "incremental SAT model, written as JSON lines into the output file (SAT only)")
+    parser.add_argument('--blocksupersets', action='store_true', default=False,
+                        help="With --enumerate, shrink every basis to an inclusion-minimal one and block\n"
+                             "all its supersets, so that only distinct minimal bases are reported")
+    parser.add_argument('--hint', nargs=1, type=str,
+                        help="Warm-start the solver from a guess basis: a comma-separated list of variables,\n"
+                             "an output file of a previous run, or 'greedy' for the greedy heuristic basis\n"
+                             "(SAT phases, CP-SAT hints, MiniZinc warm_start, Gurobi MIP start)")
+    parser.add_argument('--noprune', action='store_true', default=False,
+                        help="Encode all (variable, step) pairs instead of only the cone of\n"
+                             "influence of the target variables (CP/MILP/SAT/SMT)")
+
+    parser.add_argument('--no-cache', action='store_true', default=False,
+                        help="Do not read or write the cache of parsed and preprocessed relation files\n"
+                             "(~/.autoguess/cache/, or $AUTOGUESS_CACHE_DIR)")
 
     # MiniZinc installer command
     parser.add_argument('--install-minizinc', action='store_true',
@@ -227,6 +384,7 @@ def main():
         return
 
     params = load_parameters(args)
+    _validate_backend_parameters(parser, params)
     check_environment()
     start_search(params)
 
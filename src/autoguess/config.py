@@ -5,10 +5,12 @@ Copyright (C) 2021 Hosein Hadipour
 License: GPL-3.0-or-later
 """
 
+import functools
+import json
 import os
 import platform
-import subprocess
 import shutil
+import sys
 
 
 # ---------------------------------------------------------------------------
@@ -23,6 +25,22 @@ AUTOGUESS_HOME = os.path.join(os.path.expanduser("~"), ".autoguess")
 TEMP_DIR = os.environ.get("AUTOGUESS_TEMP_DIR", os.path.join(AUTOGUESS_HOME, "temp"))
 
 
+# ---------------------------------------------------------------------------
+# Cache of parsed (and preprocessed) relation files, see core/relationcache.py
+# ---------------------------------------------------------------------------
+CACHE_DIR = os.environ.get("AUTOGUESS_CACHE_DIR", os.path.join(AUTOGUESS_HOME, "cache"))
+# The least recently used entries are evicted beyond this size (in MB)
+CACHE_SIZE_LIMIT = int(os.environ.get("AUTOGUESS_CACHE_SIZE_MB", "1024")) * 1024 * 1024
+
+# ---------------------------------------------------------------------------
+# Memory budget (in MB) of the Macaulay matrix built without Sage, see
+# core/gf2macaulay.py.  Larger matrices are eliminated sparsely, and the
+# preprocessing stops before the elimination if even its dense core does not
+# fit into the budget.
+# ---------------------------------------------------------------------------
+MACAULAY_MEMORY_LIMIT = int(os.environ.get("AUTOGUESS_MACAULAY_MEMORY_MB", "4096")) * 1024 * 1024
+
+
 # ---------------------------------------------------------------------------
 # MiniZinc binary detection
 # ---------------------------------------------------------------------------
@@ -71,6 +89,7 @@ def ensure_minizinc_driver():
 
     Call this once before any code that touches ``minizinc.default_driver``.
     """
+    prepare_minizinc_environment()
     try:
         import minizinc
     except ImportError:
@@ -79,7 +98,7 @@ def ensure_minizinc_driver():
     if minizinc.default_driver is not None:
         return  # already initialised -- nothing to do
 
-    mzn_path = find_minizinc_path()
+    mzn_path = get_minizinc_path()
     if mzn_path is None:
         return  # not installed anywhere we know of
 
@@ -91,6 +110,48 @@ def ensure_minizinc_driver():
         pass  # incompatible version or other issue -- leave driver as None
 
 
+def prepare_minizinc_environment():
+    """
+    Prepend the managed MiniZinc bin directory to PATH so that
+    ``import minizinc`` finds it during its __init__ and does not
+    emit a "MiniZinc was not found" RuntimeWarning.
+
+    Must run before the first ``import minizinc``.
+    """
+    mzn_path = get_minizinc_path()
+    if mzn_path is None:
+        return
+    mzn_bin_dir = os.path.dirname(mzn_path)
+    if mzn_bin_dir not in os.environ.get("PATH", "").split(os.pathsep):
+        os.environ["PATH"] = mzn_bin_dir + os.pathsep + os.environ.get("PATH", "")
+
+
+def available_minizinc_solvers():
+    """
+    Return the solver tags known to the MiniZinc driver, or None if MiniZinc
+    is not usable.  Querying the driver runs ``minizinc --solvers-json``,
+    so the answer is kept in the capability cache.
+    """
+    mzn_path = get_minizinc_path()
+    if mzn_path is None:
+        return None
+    stamp = _binary_stamp(mzn_path)
+    cached = _read_capability("minizinc_solvers")
+    if cached is not None and cached.get("stamp") == stamp:
+        return cached["solvers"]
+    ensure_minizinc_driver()
+    try:
+        import minizinc
+        driver = minizinc.default_driver
+        if driver is None:
+            return None
+        solvers = list(driver.available_solvers().keys())
+    except Exception:
+        return None
+    _write_capability("minizinc_solvers", {"stamp": stamp, "solvers": solvers})
+    return solvers
+
+
 # ---------------------------------------------------------------------------
 # SageMath detection (fallback for systems without passagemath)
 # ---------------------------------------------------------------------------
@@ -137,32 +198,139 @@ def find_sage_path():
 
 
 def sage_is_available():
-    """Return True if SageMath can be imported (e.g. via passagemath)."""
+    """
+    Return True if SageMath can be imported (e.g. via passagemath).
+
+    Importing ``sage.all`` takes several seconds, so the answer is kept in
+    the capability cache and keyed by the location and mtime of the
+    installed ``sage`` package.
+    """
+    import importlib.util
+    try:
+        spec = importlib.util.find_spec("sage")
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None:
+        return False
+    locations = list(spec.submodule_search_locations or []) or [spec.origin]
+    stamp = [sys.executable] + [_binary_stamp(loc) for loc in locations if loc]
+    cached = _read_capability("sage")
+    if cached is not None and cached.get("stamp") == stamp:
+        return cached["importable"]
     try:
         from sage.all import BooleanPolynomialRing  # noqa: F401
-        return True
+        importable = True
     except ImportError:
-        return False
+        importable = False
+    _write_capability("sage", {"stamp": stamp, "importable": importable})
+    return importable
+
+
+# ---------------------------------------------------------------------------
+# Capability cache
+# ---------------------------------------------------------------------------
+# Backend discovery (importing Sage, asking MiniZinc for its solvers) costs
+# seconds, which dominates short runs.  Results are stored in a small JSON
+# file and invalidated whenever the probed binary changes (path, size, mtime)
+# or autoguess itself is upgraded.
+CAPABILITY_CACHE = os.path.join(AUTOGUESS_HOME, "capabilities.json")
+
+
+def _autoguess_version():
+    try:
+        from importlib.metadata import version as _version
+        return _version("autoguess")
+    except Exception:
+        return "1.0.0"
+
+
+def _binary_stamp(path):
+    """Return a JSON-serialisable fingerprint of *path*."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return [path, None, None]
+    return [path, st.st_size, st.st_mtime_ns]
+
+
+def _read_capability(key):
+    try:
+        with open(CAPABILITY_CACHE, "r") as fileobj:
+            cache = json.load(fileobj)
+    except (OSError, ValueError):
+        return None
+    if cache.get("version") != _autoguess_version():
+        return None
+    return cache.get(key)
+
+
+def _write_capability(key, entry):
+    try:
+        with open(CAPABILITY_CACHE, "r") as fileobj:
+            cache = json.load(fileobj)
+        if cache.get("version") != _autoguess_version():
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    cache["version"] = _autoguess_version()
+    cache[key] = entry
+    try:
+        os.makedirs(AUTOGUESS_HOME, exist_ok=True)
+        tmp_path = "%s.%d" % (CAPABILITY_CACHE, os.getpid())
+        with open(tmp_path, "w") as fileobj:
+            json.dump(cache, fileobj)
+        os.replace(tmp_path, CAPABILITY_CACHE)
+    except OSError:
+        pass  # read-only home -- the cache is only an optimisation
+
+
+# ---------------------------------------------------------------------------
+# Lazily resolved backend locations
+# ---------------------------------------------------------------------------
+# Nothing is probed at import time: a plain SAT or propagate run must not pay
+# for Sage or MiniZinc discovery.  The historical module attributes
+# (PATH_SAGE, MINIZINC_PATH, SAGE_IMPORTABLE, MINIZINC_LIB_DIR) are still
+# available and are resolved on first access.
+@functools.lru_cache(maxsize=None)
+def get_sage_path():
+    return find_sage_path()
+
+
+@functools.lru_cache(maxsize=None)
+def get_minizinc_path():
+    return find_minizinc_path()
+
+
+@functools.lru_cache(maxsize=None)
+def get_sage_importable():
+    return sage_is_available()
+
+
+@functools.lru_cache(maxsize=None)
+def get_minizinc_lib_dir():
+    """
+    Bundled solver binaries (e.g. fzn-cp-sat / OR-Tools) link against
+    shared libraries shipped inside the MiniZinc bundle's lib/ directory.
+    We do NOT set LD_LIBRARY_PATH globally because it would pollute the
+    environment for other subprocesses (e.g. Graphviz's dot).  Instead
+    gdcp.py sets it only around the solve() call.
+    """
+    mzn_path = get_minizinc_path()
+    if mzn_path is None:
+        return None
+    mzn_lib_dir = os.path.join(os.path.dirname(os.path.dirname(mzn_path)), "lib")
+    return mzn_lib_dir if os.path.isdir(mzn_lib_dir) else None
+
+
+_LAZY_ATTRIBUTES = {
+    "PATH_SAGE": get_sage_path,
+    "MINIZINC_PATH": get_minizinc_path,
+    "SAGE_IMPORTABLE": get_sage_importable,
+    "MINIZINC_LIB_DIR": get_minizinc_lib_dir,
+}
 
 
-# Eagerly resolve these at import time
-PATH_SAGE = find_sage_path()
-MINIZINC_PATH = find_minizinc_path()
-SAGE_IMPORTABLE = sage_is_available()
-
-# Prepend the managed MiniZinc bin directory to PATH so that
-# ``import minizinc`` finds it during its __init__ and does not
-# emit a "MiniZinc was not found" RuntimeWarning.
-if MINIZINC_PATH is not None:
-    _mzn_bin_dir = os.path.dirname(MINIZINC_PATH)
-    if _mzn_bin_dir not in os.environ.get("PATH", "").split(os.pathsep):
-        os.environ["PATH"] = _mzn_bin_dir + os.pathsep + os.environ.get("PATH", "")
-    # Bundled solver binaries (e.g. fzn-cp-sat / OR-Tools) link against
-    # shared libraries shipped inside the MiniZinc bundle's lib/ directory.
-    # We do NOT set LD_LIBRARY_PATH globally here because it would pollute
-    # the environment for other subprocesses (e.g. Graphviz's dot).  Instead
-    # we export the path so gdcp.py can set it only around the solve() call.
-    _mzn_lib_dir = os.path.join(os.path.dirname(_mzn_bin_dir), "lib")
-    MINIZINC_LIB_DIR = _mzn_lib_dir if os.path.isdir(_mzn_lib_dir) else None
-else:
-    MINIZINC_LIB_DIR = None
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
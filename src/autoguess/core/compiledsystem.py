@@ -0,0 +1,374 @@
+'''
+Created on Oct 18, 2026
+
+@author: Hosein Hadipour
+@contact: hsn.hadipour@gmail.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+In case you use this tool please include the above copyright informations (name, contact, license)
+'''
+
+from array import array
+import numpy as np
+from .inputparser import read_relation_file
+from .varnames import step_var
+
+
+class CompiledSystem:
+    """
+    Integer-indexed intermediate representation of a parsed relation file.
+
+    Every solver backend lowers from this object instead of re-deriving the
+    deductions from the string relations.  Variables are interned to the
+    integers 0..n-1 (in the order of ``variables``), and relations as well
+    as deductions are stored as flat int arrays with offsets (CSR):
+
+        sym_ptr, sym_idx    symmetric relation r is sym_idx[sym_ptr[r]:sym_ptr[r+1]]
+        impl_ptr, impl_idx  implication relation r (premises first, conclusion last)
+        ded_ptr             deductions of variable v are ded_ptr[v]..ded_ptr[v+1]-1
+        dep_ptr, dep_idx    deduction d requires dep_idx[dep_ptr[d]:dep_ptr[d+1]]
+        ded_owner           ded_owner[d] is the variable determined by deduction d
+
+    The first deduction of every variable is the trivial one ([v]), and the
+    deductions of a variable are deduplicated once here.
+
+    Unrolled models use a fixed integer layout, so no per-step names have
+    to be built.  With n variables, m deductions and L = n + m:
+
+        state variable (v, step)        ->  step * L + v + 1
+        path variable  (d, step >= 1)   ->  (step - 1) * L + n + d + 1
+
+    Names are only materialised (via ``varnames.step_var``) for the output.
+    Since every unrolled model defines the state of step s + 1 as a function
+    of the state of step s, the whole solution is recovered from the values
+    of the initial state (see ``solution_from_initial``).
+    """
+
+    def __init__(self, parsed_data):
+        self.parsed_data = parsed_data
+        self.problem_name = parsed_data['problem_name']
+        self.variables = parsed_data['variables']
+        self.known_variables = parsed_data['known_variables']
+        self.target_variables = parsed_data['target_variables']
+        self.target_weights = parsed_data['target_weights']
+        self.notguessed_variables = parsed_data['notguessed_variables']
+        self.symmetric_relations = parsed_data['symmetric_relations']
+        self.implication_relations = parsed_data['implication_relations']
+        self.dummy_mapping = parsed_data.get('dummy_mapping', {})
+        self.num_of_vars = len(self.variables)
+        self.num_of_relations = len(self.symmetric_relations) + len(self.implication_relations)
+        self.var_index = {v: i for i, v in enumerate(self.variables)}
+        self.known = self._intern(self.known_variables)
+        self.targets = self._intern(self.target_variables)
+        self.notguessed = self._intern(self.notguessed_variables)
+        _known_set = set(self.known)
+        self.unknown_init = [i for i in range(self.num_of_vars) if i not in _known_set]
+        if self.target_weights is not None:
+            self.weights = [self.target_weights.get(v, 1) for v in self.variables]
+        else:
+            self.weights = None
+        self.sym_ptr, self.sym_idx = self._to_csr(self.symmetric_relations)
+        self.impl_ptr, self.impl_idx = self._to_csr(self.implication_relations)
+        self._compile_deductions()
+        self.layer_size = self.num_of_vars + self.num_of_deductions
+
+    def _intern(self, names):
+        """Map a list of names to ids, skipping empty and unknown names"""
+        index = self.var_index
+        ids = []
+        seen = set()
+        for v in names:
+            i = index.get(v)
+            if i is not None and i not in seen:
+                seen.add(i)
+                ids.append(i)
+        return ids
+
+    def _to_csr(self, relations):
+        index = self.var_index
+        ptr = array('i', [0])
+        idx = array('i')
+        for rel in relations:
+            idx.extend(index[v] for v in rel)
+            ptr.append(len(idx))
+        return ptr, idx
+
+    def _compile_deductions(self):
+        """
+        Generate all possible deductions once
+
+        Core idea of information propagation:
+            If there is a relation in which all terms are known except one,
+            then the value of the last term can be determined as well.
+        """
+        n = self.num_of_vars
+        by_var = [[] for _ in range(n)]
+        sym_ptr, sym_idx = self.sym_ptr, self.sym_idx
+        for r in range(len(sym_ptr) - 1):
+            rel = sym_idx[sym_ptr[r]:sym_ptr[r + 1]].tolist()
+            for v in set(rel):
+                temp = rel.copy()
+                temp.remove(v)
+                by_var[v].append(temp)
+        impl_ptr, impl_idx = self.impl_ptr, self.impl_idx
+        for r in range(len(impl_ptr) - 1):
+            rel = impl_idx[impl_ptr[r]:impl_ptr[r + 1]].tolist()
+            v = rel[-1]
+            temp = rel.copy()
+            temp.remove(v)
+            by_var[v].append(temp)
+        self.ded_ptr = array('i', [0])
+        self.dep_ptr = array('i', [0])
+        self.dep_idx = array('i')
+        self.ded_owner = array('i')
+        for v in range(n):
+            seen = set()
+            for deps in [[v]] + by_var[v]:
+                key = tuple(sorted(set(deps)))
+                if key in seen:
+                    continue
+                seen.add(key)
+                self.dep_idx.extend(key)
+                self.dep_ptr.append(len(self.dep_idx))
+                self.ded_owner.append(v)
+            self.ded_ptr.append(len(self.ded_owner))
+        self.num_of_deductions = len(self.ded_owner)
+
+    def deductions_of(self, v):
+        """Return the range of deduction ids determining variable v"""
+        return range(self.ded_ptr[v], self.ded_ptr[v + 1])
+
+    def deps(self, d):
+        """Return the variables required by deduction d"""
+        return self.dep_idx[self.dep_ptr[d]:self.dep_ptr[d + 1]]
+
+    def named_deductions(self):
+        """Return the deductions as {variable: [[variable, ...], ...]}"""
+        names = self.variables
+        return {names[v]: [[names[u] for u in self.deps(d)] for d in self.deductions_of(v)]
+                for v in range(self.num_of_vars)}
+
+    def state_id(self, v, step):
+        """Integer id of state variable v at the given step (1-based)"""
+        return step * self.layer_size + v + 1
+
+    def path_id(self, d, step):
+        """Integer id of the path variable of deduction d at step >= 1 (1-based)"""
+        return (step - 1) * self.layer_size + self.num_of_vars + d + 1
+
+    def top_id(self, max_steps):
+        """Largest integer id used by a model unrolled for max_steps"""
+        return max_steps * self.layer_size + self.num_of_vars
+
+    def cone_of_influence(self, max_steps, prune=True, backward=True):
+        """
+        Return the ConeOfInfluence of a model unrolled for max_steps.  With
+        prune=False every (variable, step) pair is kept.
+        """
+        return ConeOfInfluence(self, max_steps, prune=prune, backward=backward)
+
+    def propagate_states(self, initial_values, max_steps):
+        """
+        Evaluate the unrolled model from the values of the initial state and
+        return the list of the state values (0/1 lists) for steps 0..max_steps
+        """
+        n, m = self.num_of_vars, self.num_of_deductions
+        owner = np.frombuffer(self.ded_owner, dtype=np.int32)
+        dep_idx = np.frombuffer(self.dep_idx, dtype=np.int32)
+        dep_of = np.repeat(np.arange(m), np.diff(np.frombuffer(self.dep_ptr, dtype=np.int32)))
+        state = np.asarray(initial_values, dtype=bool)
+        states = [state]
+        for _ in range(max_steps):
+            missing = np.bincount(dep_of, weights=~state[dep_idx], minlength=m)
+            state = np.bincount(owner, weights=(missing == 0), minlength=n) > 0
+            states.append(state)
+        return [s.astype(int).tolist() for s in states]
+
+    def state_names(self, step):
+        """Materialise the names of all state variables at the given step"""
+        return [step_var(v, step) for v in self.variables]
+
+    def solution_from_values(self, values_at, max_steps):
+        """
+        Build the per-step {name: 0/1} dictionaries consumed by
+        parse_solver_solution, where values_at(step) returns the values of
+        the n state variables of that step in variable order.
+        """
+        return [dict(zip(self.state_names(step), values_at(step)))
+                for step in range(max_steps + 1)]
+
+    def solution_from_initial(self, initial_values, max_steps):
+        """
+        Same as solution_from_values, but only the values of the initial
+        state are given and the other steps are recomputed
+        """
+        states = self.propagate_states(initial_values, max_steps)
+        return self.solution_from_values(states.__getitem__, max_steps)
+
+
+class ConeOfInfluence:
+    """
+    Cone of influence of a model unrolled for max_steps.
+
+    Two bounds are computed on the relation hypergraph:
+
+        first[v]      earliest step at which v can be known, assuming every
+                      guessable variable is guessed (forward reachability
+                      from the known and guessable variables)
+        last[v]       max_steps - dist(v), where dist(v) is the number of
+                      steps v needs to influence a target variable
+                      (backward reachability from the targets)
+
+    The state variable (v, step) is only kept if first[v] <= step <= last[v],
+    and the path variable (d, step) if its owner is kept and every variable
+    of deduction d can be known at step - 1 (ded_first[d] <= step).
+    Before first[v] the state variable is always 0, and after last[v] it
+    cannot change the target variables, so neither has to be encoded.
+    With backward=False, last[v] is max_steps for every variable; this is
+    the cone to use when the depth of the targets is not fixed.
+    """
+
+    def __init__(self, system, max_steps, prune=True, backward=True):
+        self.system = system
+        self.max_steps = max_steps
+        self.prune = prune
+        n, m = system.num_of_vars, system.num_of_deductions
+        if prune:
+            self._forward()
+            if backward:
+                self._backward()
+            else:
+                self.last = [max_steps] * n
+        else:
+            self.first = [0] * n
+            self.last = [max_steps] * n
+            self.ded_first = [1] * m
+        self.first_array = np.array(self.first, dtype=np.int64)
+        self.last_array = np.array(self.last, dtype=np.int64)
+        self.ded_first_array = np.array(self.ded_first, dtype=np.int64)
+        self.guess_candidates = [v for v in system.unknown_init if self.state_live(v, 0)]
+        self.unreachable_targets = [v for v in system.targets if not self.state_live(v, max_steps)]
+
+    def _forward(self):
+        system = self.system
+        n, m = system.num_of_vars, system.num_of_deductions
+        never = self.max_steps + 1
+        # Deductions using each variable
+        users = [[] for _ in range(n)]
+        for d in range(m):
+            for u in system.deps(d):
+                users[u].append(d)
+        notguessed = set(system.notguessed) - set(system.known)
+        self.first = [never if v in notguessed else 0 for v in range(n)]
+        self.ded_first = [never] * m
+        remaining = [system.dep_ptr[d + 1] - system.dep_ptr[d] for d in range(m)]
+        frontier = [v for v in range(n) if self.first[v] == 0]
+        next_frontier = []
+        # Deductions without any required variable fire at step 1
+        for d in range(m):
+            if remaining[d] == 0:
+                self._fire(d, 0, next_frontier)
+        level = 0
+        while (frontier or next_frontier) and level < self.max_steps:
+            for u in frontier:
+                if self.first[u] != level:
+                    continue
+                for d in users[u]:
+                    remaining[d] -= 1
+                    if remaining[d] == 0:
+                        self._fire(d, level, next_frontier)
+            frontier, next_frontier = next_frontier, []
+            level += 1
+
+    def _fire(self, d, level, frontier):
+        self.ded_first[d] = level + 1
+        v = self.system.ded_owner[d]
+        if self.first[v] > level + 1:
+            self.first[v] = level + 1
+            frontier.append(v)
+
+    def _backward(self):
+        system = self.system
+        max_steps = self.max_steps
+        dist = [None] * system.num_of_vars
+        frontier = list(system.targets)
+        for v in frontier:
+            dist[v] = 0
+        k = 0
+        while frontier and k < max_steps:
+            next_frontier = []
+            for v in frontier:
+                for d in system.deductions_of(v):
+                    if self.ded_first[d] > max_steps:
+                        continue
+                    for u in system.deps(d):
+                        if dist[u] is None:
+                            dist[u] = k + 1
+                            next_frontier.append(u)
+            frontier = next_frontier
+            k += 1
+        self.last = [-1 if dv is None else max_steps - dv for dv in dist]
+
+    def state_live(self, v, step):
+        """Whether the state variable (v, step) is part of the model"""
+        return self.first[v] <= step <= self.last[v]
+
+    def path_live(self, d, step):
+        """Whether the path variable (d, step >= 1) is part of the model"""
+        return self.ded_first[d] <= step and self.state_live(self.system.ded_owner[d], step)
+
+    def live_deductions(self, v, step):
+        """Deductions of v whose path variables are kept at the given step"""
+        ded_first = self.ded_first
+        return [d for d in self.system.deductions_of(v) if ded_first[d] <= step]
+
+    def masks(self, step):
+        """Boolean arrays of the kept state and path variables at the given step"""
+        var_mask = (self.first_array <= step) & (step <= self.last_array)
+        owner = np.frombuffer(self.system.ded_owner, dtype=np.int32)
+        ded_mask = (self.ded_first_array <= step) & var_mask[owner]
+        return var_mask, ded_mask
+
+    def initial_values(self, values):
+        """
+        Clean the initial state read from a solver: known variables are 1
+        and pruned variables (which the solver leaves unconstrained) are 0
+        """
+        values = [int(bool(x)) if self.first[v] == 0 and self.last[v] >= 0 else 0
+                  for v, x in enumerate(values)]
+        for v in self.system.known:
+            values[v] = 1
+        return values
+
+    def summary(self):
+        """Number of kept state and path variables, as a printable string"""
+        system = self.system
+        n, m, ms = system.num_of_vars, system.num_of_deductions, self.max_steps
+        span = np.clip(np.minimum(self.last_array, ms) - self.first_array + 1, 0, None)
+        states = int(span.sum())
+        owner = np.frombuffer(system.ded_owner, dtype=np.int32)
+        start = np.maximum(np.maximum(self.ded_first_array, self.first_array[owner]), 1)
+        paths = int(np.clip(self.last_array[owner] - start + 1, 0, None).sum())
+        return 'Cone of influence: %d / %d state and %d / %d path variables kept' % (
+            states, n * (ms + 1), paths, m * ms)
+
+
+def compile_relation_system(inputfile_name=None, parsed_data=None, preprocess=1, D=2, log=0, extra_known=None):
+    """
+    Parse (unless parsed_data is given) and compile a relation file
+    """
+    if parsed_data is None:
+        parsed_data = read_relation_file(inputfile_name, preprocess=preprocess, D=D, log=log, extra_known=extra_known)
+    return CompiledSystem(parsed_data)
@@ -23,17 +23,20 @@ In case you use this tool please include the above copyright informations (name,
 import os
 import time
 import random
-import minizinc
-from .inputparser import read_relation_file
+from .compiledsystem import compile_relation_system
+from .warmstart import WarmStart
 from .parsesolution import parse_solver_solution
 from .graphdrawer import draw_graph
-from autoguess.config import TEMP_DIR, MINIZINC_LIB_DIR, ensure_minizinc_driver
+from autoguess.config import TEMP_DIR, get_minizinc_lib_dir, ensure_minizinc_driver, available_minizinc_solvers
 
 ensure_minizinc_driver()
-from .varnames import step_var, path_var
+import minizinc
 import datetime
 import subprocess
 
+# The parametric CP model, instantiated with the data of each problem
+CP_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cpmodel.mzn')
+
 class ReduceGDtoCP:
     """
     ReduceGDtoCP
@@ -46,12 +49,17 @@ class ReduceGDtoCP:
     inputfile_name: The name of a text file containing the relations
     max_guess:  The maximum number of guessed variables
     max_steps:  Number of state copies
+    prune:      If True (default), only the cone of influence of the target
+                variables is encoded (see ConeOfInfluence)
+    hint:       A guess basis (see WarmStart) whose assignment is passed to
+                the CP solver through a warm_start annotation
     """
 
     count = 0
 
     def __init__(self, inputfile_name=None, outputfile_name='output', max_guess=0, max_steps=0, cp_solver_name="cp-sat", \
-        cp_optimization=0, tikz=0, preprocess=1, D=2, dglayout="dot", drawgraph=True, log="0", threads=0, extra_known=None):
+        cp_optimization=0, tikz=0, preprocess=1, D=2, dglayout="dot", drawgraph=True, log="0", threads=0, extra_known=None, system=None, prune=True,
+        hint=None):
         self.inputfile_name = inputfile_name
         self.output_dir = outputfile_name     
         self.rnd_string_tmp = '%030x' % random.randrange(16**30)
@@ -61,7 +69,7 @@ class ReduceGDtoCP:
         self.dglayout = dglayout
         self.draw_graph = drawgraph
         self.log = log  
-        self.supported_cp_solvers = [solver_name for solver_name in minizinc.default_driver.available_solvers().keys()]
+        self.supported_cp_solvers = available_minizinc_solvers() or []
         if self.cp_solver_name not in self.supported_cp_solvers:
             # Try a ranked preference list of well-known solvers
             _preferred = ["cp-sat", "gecode", "chuffed"]
@@ -84,28 +92,28 @@ class ReduceGDtoCP:
         self.cp_solver = minizinc.Solver.lookup(self.cp_solver_name)      
         self.cp_optimization = cp_optimization
         self.nthreads = threads if threads > 0 else (os.cpu_count() or 1)
-        self.cp_boolean_variables = []
-        self._cp_vars_set = set()
-        self._constraint_lines = []
         self.extra_known = extra_known
-        self._parse_input_file(preprocess, D)
+        self._parse_input_file(preprocess, D, system)
+        self.cone = self.system.cone_of_influence(self.max_steps, prune=prune)
+        self.warm_start = WarmStart(self.system, self.cone, hint, self.max_steps) if hint else None
         self._set_max_guess()
-        self.deductions = self.generate_possible_deductions()        
         self.time_limit = -1
         self.tikz = tikz
 
-    def _parse_input_file(self, preprocess, D):
-        parsed_data = read_relation_file(self.inputfile_name, preprocess, D, self.log, extra_known=self.extra_known)
-        self.problem_name = parsed_data['problem_name']
-        self.variables = parsed_data['variables']
-        self.known_variables = parsed_data['known_variables']
-        self.target_variables = parsed_data['target_variables']
-        self.notguessed_variables = parsed_data['notguessed_variables']
-        self.symmetric_relations = parsed_data['symmetric_relations']
-        self.implication_relations = parsed_data['implication_relations']
-        self.dummy_mapping = parsed_data.get('dummy_mapping', {})
-        self.num_of_relations = len(self.symmetric_relations) + len(self.implication_relations)
-        self.num_of_vars = len(self.variables)
+    def _parse_input_file(self, preprocess, D, system=None):
+        if system is None:
+            system = compile_relation_system(self.inputfile_name, preprocess=preprocess, D=D, log=self.log, extra_known=self.extra_known)
+        self.system = system
+        self.problem_name = system.problem_name
+        self.variables = system.variables
+        self.known_variables = system.known_variables
+        self.target_variables = system.target_variables
+        self.notguessed_variables = system.notguessed_variables
+        self.symmetric_relations = system.symmetric_relations
+        self.implication_relations = system.implication_relations
+        self.dummy_mapping = system.dummy_mapping
+        self.num_of_relations = system.num_of_relations
+        self.num_of_vars = system.num_of_vars
 
     def _set_max_guess(self):
         if (self.max_guess is None) or (self.max_guess > len(self.target_variables)):
@@ -121,114 +129,47 @@ class ReduceGDtoCP:
         seen_add = seen.add
         return [x for x in seq if not (x in seen or seen_add(x))]
 
-    def generate_possible_deductions(self):
+    def generate_data(self):
         """
-        This method generates all possible deductions 
-
-        Core idea of information propagation: 
-            If there is a relation in which all terms are known except one, 
-            then the value of the last term can be determined as well. 
+        This method generates the data of the parametric CP model (see
+        cpmodel.mzn): the deductions of the compiled system as index arrays
+        and the cone of influence.  MiniZinc indices start from 1.
         """
-        # Build inverted indices for O(1) lookup instead of O(|R|) scan per variable
-        from collections import defaultdict
-        sym_index = defaultdict(list)
-        for rel in self.symmetric_relations:
-            for v in rel:
-                sym_index[v].append(rel)
-        impl_index = defaultdict(list)
-        for rel in self.implication_relations:
-            impl_index[rel[-1]].append(rel)
-
-        possible_deductions = {v: [[v]] for v in self.variables}
-        for v in self.variables:
-            for rel in sym_index.get(v, []):
-                temp = rel.copy()
-                temp.remove(v)
-                possible_deductions[v].append(temp)
-            for rel in impl_index.get(v, []):
-                temp = rel.copy()
-                temp.remove(v)
-                possible_deductions[v].append(temp)
-        return possible_deductions
-    
-    def update_variables_list(self, new_vars):
-        for v in new_vars:
-            if v not in self._cp_vars_set:
-                self._cp_vars_set.add(v)
-                self.cp_boolean_variables.append(v)
-        
-    def generate_initial_conditions(self):
-        """
-        This method generates the constraints corresponding to the initially known variables, 
-        and limits the maximum number of guessed variables. 
-        It also limits the target variables to be known in the final step of knowledge propagation
-        """
-        self._limit_max_guessed_variables()
-        self._force_target_variables_known()
-        self._set_known_variables()
-        self._set_notguessed_variables()
-
-    def _limit_max_guessed_variables(self):
-        initial_state_vars = [step_var(v, 0) for v in self.variables if v not in self.known_variables]
-        if initial_state_vars:
-            self.update_variables_list(initial_state_vars)
-            self._constraint_lines.append('constraint %s <= %d;\n' % (' + '.join(initial_state_vars), self.max_guess))
-
-    def _force_target_variables_known(self):
-        final_state_target_vars = [step_var(v, self.max_steps) for v in self.target_variables]
-        self.update_variables_list(final_state_target_vars)
-        for fv in final_state_target_vars:
-            self._constraint_lines.append('constraint %s = 1;\n' % fv)
-
-    def _set_known_variables(self):
-        for v in self.known_variables:
-            if v:
-                self._constraint_lines.append('constraint %s = 1;\n' % step_var(v, 0))
-
-    def _set_notguessed_variables(self):
-        for v in self.notguessed_variables:
-            if v:
-                self._constraint_lines.append('constraint %s = 0;\n' % step_var(v, 0))
-    
-    def generate_objective_function(self):
-        """
-        This method generates the objective function minimizing the 
-        set of known variables at initial state.
-        """
-        initial_state_vars = [step_var(v, 0) for v in self.variables if v not in self.known_variables]
-        if self.cp_optimization == 1 and initial_state_vars:
-            self._constraint_lines.append('solve minimize %s;\n' % ' + '.join(initial_state_vars))
-        else:
-            self._constraint_lines.append('solve satisfy;\n')
-      
-    def generate_cp_constraints(self):
-        """
-        This method generates the CP constraints corresponding to the 
-        obtained deductions
-        """
-        for step in range(self.max_steps):
-            for v in self.variables:
-                v_new = step_var(v, step + 1)
-                tau = len(self.deductions[v])
-                v_path_variables = [path_var(v, step + 1, i) for i in range(tau)]
-                self.update_variables_list([v_new] + v_path_variables)
-                self._add_state_variable_constraints(v_new, v_path_variables)
-                self._add_path_variable_constraints(v, step, tau, v_path_variables)
-
-    def _add_state_variable_constraints(self, v_new, v_path_variables):
-        RHS = ' \\/ '.join(v_path_variables)
-        self._constraint_lines.append('constraint %s <-> %s;\n' % (v_new, RHS))
+        system = self.system
+        cone = self.cone
+        # Dead variables are fixed to 0, hence known/not-guessed conditions
+        # only matter if they are live at step 0 (checked in the model)
+        return {
+            'nvars': system.num_of_vars,
+            'nsteps': self.max_steps,
+            'ndeds': system.num_of_deductions,
+            'ndeps': len(system.dep_idx),
+            'ded_start': [i + 1 for i in system.ded_ptr],
+            'dep_start': [i + 1 for i in system.dep_ptr],
+            'dep': [v + 1 for v in system.dep_idx],
+            'first': list(cone.first),
+            'last': list(cone.last),
+            'ded_first': list(cone.ded_first),
+            'guessable': {v + 1 for v in cone.guess_candidates},
+            'known': {v + 1 for v in system.known},
+            'notguessed': {v + 1 for v in system.notguessed},
+            'targets': {v + 1 for v in system.targets},
+            'x_hint': ['true' if x else 'false' for x in self.warm_start.live_states().ravel().tolist()]
+                      if self.warm_start is not None else [],
+        }
 
-    def _add_path_variable_constraints(self, v, step, tau, v_path_variables):
-        for i in range(tau):
-            v_connected_variables = [step_var(var, step) for var in self.deductions[v][i]]
-            self.update_variables_list(v_connected_variables)
-            RHS = ' /\\ '.join(v_connected_variables)
-            self._constraint_lines.append('constraint %s <-> %s;\n' % (v_path_variables[i], RHS))
+    @staticmethod
+    def dzn_value(value):
+        if isinstance(value, set):
+            return '{%s}' % ', '.join(map(str, sorted(value)))
+        if isinstance(value, list):
+            return '[%s]' % ', '.join(map(str, value))
+        return str(value)
 
     def make_model(self):
         """
-        This method makes the CP model, and then write it into a file in mzn format
+        This method writes the data of the CP model into a file in dzn format,
+        and instantiates the parametric model (cpmodel.mzn) with it
         """
         print('=' * 60)
         print('CP SOLVER — %s' % self.problem_name)
@@ -236,27 +177,27 @@ class ReduceGDtoCP:
         print('Variables: %d | Relations: %d' % (self.num_of_vars, self.num_of_relations))
         print('Max guess: %d | Max steps: %d' % (self.max_guess, self.max_steps))
         print('Solver: %s' % self.cp_solver_name)
+        if self.cone.prune:
+            print(self.cone.summary())
+        if self.warm_start is not None:
+            print(self.warm_start.summary())
         print('-' * 60)
         print('MODEL GENERATION')
         print('-' * 60)
         start_time = time.time()
-        self.generate_cp_constraints()
-        self.generate_initial_conditions()
-        self.generate_objective_function()
-        # Assemble the full model: variable declarations + constraints
-        parts = ['var bool: %s;\n' % bv for bv in self.cp_boolean_variables]
-        parts.extend(self._constraint_lines)
-        self.cp_constraints = ''.join(parts)
-        self.cp_file_path = os.path.join(TEMP_DIR, 'cpmodel_mg%d_ms%d_%s.mzn' % (
-            self.max_guess, self.max_steps, self.rnd_string_tmp))
+        data = self.generate_data()
+        self.cp_file_path = os.path.join(TEMP_DIR, 'cpdata_ms%d_%s.dzn' % (self.max_steps, self.rnd_string_tmp))
+        with open(self.cp_file_path, 'w') as dzn_file:
+            dzn_file.writelines('%s = %s;\n' % (name, self.dzn_value(value)) for name, value in data.items())
         elapsed_time = time.time() - start_time
-        print('CP model generated in %0.2f seconds' % elapsed_time)        
-        with open(self.cp_file_path, 'w') as minizinc_file:
-            minizinc_file.write(self.cp_constraints)
-        self.cp_model = minizinc.Model()
+        print('CP data generated in %0.2f seconds' % elapsed_time)
+        self.cp_model = minizinc.Model(CP_MODEL_PATH)
         self.cp_model.output_type = dict
-        self.cp_model.add_file(self.cp_file_path)        
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)        
+        self.cp_model.add_file(self.cp_file_path)
+        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
+        # Not part of the data file, so that it can be reused for other bounds
+        self.cp_inst['max_guess'] = self.max_guess
+        self.cp_inst['minimize_guesses'] = self.cp_optimization == 1
 
     def solve_via_cpsolver(self):
         """
@@ -273,11 +214,12 @@ class ReduceGDtoCP:
         # (e.g. fzn-cp-sat / OR-Tools).  Scoped here so it does not pollute
         # the environment for later subprocesses like Graphviz's dot.
         _old_ld = os.environ.get("LD_LIBRARY_PATH")
-        if MINIZINC_LIB_DIR:
+        _mzn_lib_dir = get_minizinc_lib_dir()
+        if _mzn_lib_dir:
             _ld = _old_ld or ""
-            if MINIZINC_LIB_DIR not in _ld.split(os.pathsep):
+            if _mzn_lib_dir not in _ld.split(os.pathsep):
                 os.environ["LD_LIBRARY_PATH"] = (
-                    MINIZINC_LIB_DIR + os.pathsep + _ld if _ld else MINIZINC_LIB_DIR
+                    _mzn_lib_dir + os.pathsep + _ld if _ld else _mzn_lib_dir
                 )
         try:
             result = self.cp_inst.solve(timeout=time_limit, processes=nthreads, random_seed=rand_int)
@@ -319,10 +261,10 @@ class ReduceGDtoCP:
             return None
 
     def _extract_solution(self, result):
-        self.solutions = [0] * (self.max_steps + 1)
-        for step in range(self.max_steps + 1):
-            state_vars = [step_var(v, step) for v in self.variables]
-            state_values = list(map(lambda vx: int(result.solution[vx]), state_vars))
-            self.solutions[step] = dict(zip(state_vars, state_values))
+        system = self.system
+        cone = self.cone
+        # x is indexed by [step][variable], and steps start from 0
+        initial_values = [int(x) for x in result.solution['x'][0]]
+        self.solutions = system.solution_from_initial(cone.initial_values(initial_values), self.max_steps)
         if self.log == 0:
             os.remove(self.cp_file_path)
@@ -0,0 +1,299 @@
+'''
+Created on Oct 18, 2026
+
+@author: Hosein Hadipour
+@contact: hsn.hadipour@gmail.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+In case you use this tool please include the above copyright informations (name, contact, license)
+'''
+
+import os
+import time
+import random
+from ortools.sat.python import cp_model
+from .compiledsystem import compile_relation_system
+from .warmstart import WarmStart
+from .parsesolution import parse_solver_solution
+from .graphdrawer import draw_graph
+from autoguess.config import TEMP_DIR
+
+
+class SolutionPrinter(cp_model.CpSolverSolutionCallback):
+    """
+    Report every improving solution found by CP-SAT during the search
+    """
+
+    def __init__(self, guess_literals, weights=None):
+        super().__init__()
+        self.guess_literals = guess_literals
+        self.weights = weights
+        self.count = 0
+
+    def on_solution_callback(self):
+        self.count += 1
+        guesses = sum(self.Value(lit) for lit in self.guess_literals)
+        if self.weights is None:
+            print('  Solution %d: %d guessed variable(s)  (%0.2fs)' % (self.count, guesses, self.WallTime()), flush=True)
+        else:
+            cost = sum(w * self.Value(lit) for lit, w in zip(self.guess_literals, self.weights))
+            print('  Solution %d: %d guessed variable(s), weight %d  (%0.2fs)' %
+                  (self.count, guesses, cost, self.WallTime()), flush=True)
+
+
+class ReduceGDtoCPSAT:
+    """
+    ReduceGDtoCPSAT
+    Using the Python API of OR-Tools, this class reduces the guess-and-determine
+    attack and search for key-bridges to a CP-SAT model, and then solves it.
+    This is the same model as ReduceGDtoCP, but it is built in memory and
+    handed to CP-SAT directly, with no MiniZinc text model to be flattened.
+
+    inputfile_name: The name of a text file containing the relations
+    max_guess:  The maximum number of guessed variables (their maximum total
+                weight, if the input file has a weights section)
+    max_steps:  Number of state copies
+    prune:      If True (default), only the cone of influence of the target
+                variables is encoded (see ConeOfInfluence)
+    hint:       A guess basis (see WarmStart) whose assignment is given to
+                CP-SAT as a solution hint
+    """
+
+    count = 0
+
+    def __init__(self, inputfile_name=None, outputfile_name='output', max_guess=0, max_steps=0, cp_optimization=1,\
+        tikz=0, preprocess=1, D=2, dglayout="dot", drawgraph=True, log=0, threads=0, extra_known=None, system=None, prune=True,
+        hint=None):
+        self.inputfile_name = inputfile_name
+        self.output_dir = outputfile_name
+        self.rnd_string_tmp = '%030x' % random.randrange(16**30)
+        self.max_guess = max_guess
+        self.max_steps = max_steps
+        self.cp_optimization = cp_optimization
+        self.dglayout = dglayout
+        self.draw_graph = drawgraph
+        self.log = log
+        self.nthreads = threads if threads > 0 else (os.cpu_count() or 1)
+        ###############################
+        # Read, parse and compile the input file (unless a compiled system is shared)
+        if system is None:
+            system = compile_relation_system(self.inputfile_name, preprocess=preprocess, D=D, log=self.log, extra_known=extra_known)
+        self.system = system
+        self.problem_name = system.problem_name
+        self.variables = system.variables
+        self.known_variables = system.known_variables
+        self.target_variables = system.target_variables
+        self.notguessed_variables = system.notguessed_variables
+        self.symmetric_relations = system.symmetric_relations
+        self.implication_relations = system.implication_relations
+        self.dummy_mapping = system.dummy_mapping
+        self.num_of_relations = system.num_of_relations
+        self.num_of_vars = system.num_of_vars
+        ###############################
+        self.cone = system.cone_of_influence(self.max_steps, prune=prune)
+        self.warm_start = WarmStart(system, self.cone, hint, self.max_steps) if hint else None
+        self.cp_model = cp_model.CpModel()
+        # Boolean literals are keyed by the integer ids of the compiled system
+        self.literals = dict()
+        self.time_limit = -1
+        self.tikz = tikz
+
+    def literal(self, var_id):
+        """
+        Return the Boolean literal of the given integer id, creating it on first use
+        """
+        lit = self.literals.get(var_id)
+        if lit is None:
+            lit = self.cp_model.NewBoolVar('b%d' % var_id)
+            self.literals[var_id] = lit
+        return lit
+
+    def guess_literals(self):
+        system = self.system
+        return [self.literal(system.state_id(v, 0)) for v in self.cone.guess_candidates]
+
+    def guess_weights(self):
+        """Weights of the guess literals, or None if the input file has no weights section"""
+        if self.system.weights is None:
+            return None
+        return [self.system.weights[v] for v in self.cone.guess_candidates]
+
+    def guess_cost(self):
+        """
+        The number of guessed variables, or their total weight when the
+        input file has a weights section
+        """
+        guess_literals = self.guess_literals()
+        weights = self.guess_weights()
+        if weights is None:
+            return sum(guess_literals)
+        return cp_model.LinearExpr.WeightedSum(guess_literals, weights)
+
+    def generate_cp_constraints(self):
+        """
+        This method generates the CP constraints corresponding to the
+        obtained deductions
+        """
+
+        system = self.system
+        cone = self.cone
+        model = self.cp_model
+        for step in range(self.max_steps):
+            for v in range(system.num_of_vars):
+                if not cone.state_live(v, step + 1):
+                    continue
+                v_new = self.literal(system.state_id(v, step + 1))
+                v_deductions = cone.live_deductions(v, step + 1)
+                v_path_variables = [self.literal(system.path_id(d, step + 1)) for d in v_deductions]
+                # v_new <-> OR(path variables)
+                model.AddBoolOr(v_path_variables).OnlyEnforceIf(v_new)
+                for pv in v_path_variables:
+                    model.AddImplication(pv, v_new)
+                # path variable <-> AND(state variables it depends on)
+                for d, pv in zip(v_deductions, v_path_variables):
+                    dependencies = [self.literal(system.state_id(u, step)) for u in system.deps(d)]
+                    model.AddBoolAnd(dependencies).OnlyEnforceIf(pv)
+                    model.AddBoolOr([u.Not() for u in dependencies]).OnlyEnforceIf(pv.Not())
+
+    def generate_initial_conditions(self):
+        """
+        This method generates the constraints corresponding to the initially known variables,
+        and limits the maximum number of guessed variables.
+        It also limits the target variables to be known in the final step of knowledge propagation
+        """
+
+        system = self.system
+        cone = self.cone
+        model = self.cp_model
+        if self.guess_literals():
+            model.Add(self.guess_cost() <= self.max_guess)
+        for v in system.targets:
+            model.AddBoolAnd([self.literal(system.state_id(v, self.max_steps))])
+        # Targets outside of the cone can never be known (the model is UNSAT)
+        if cone.unreachable_targets:
+            model.AddBoolOr([])
+        for v in system.known:
+            if cone.state_live(v, 0):
+                model.AddBoolAnd([self.literal(system.state_id(v, 0))])
+        for v in system.notguessed:
+            if cone.state_live(v, 0):
+                model.AddBoolAnd([self.literal(system.state_id(v, 0)).Not()])
+
+    def generate_objective_function(self):
+        """
+        This method generates the objective function minimizing the
+        number of guessed variables at the initial state
+        """
+
+        if self.cp_optimization == 1 and self.guess_literals():
+            self.cp_model.Minimize(self.guess_cost())
+
+    def generate_hint(self):
+        """
+        This method gives the hinted assignment of every literal to CP-SAT
+        """
+
+        ids = list(self.literals)
+        for var_id, value in zip(ids, self.warm_start.values(ids).tolist()):
+            self.cp_model.AddHint(self.literals[var_id], value)
+
+    def make_model(self):
+        """
+        This method makes the CP-SAT model.  When log == 1, it is also
+        written into a text file in protobuf format
+        """
+
+        print('=' * 60)
+        print('CP-SAT SOLVER — %s' % self.problem_name)
+        print('=' * 60)
+        print('Variables: %d | Relations: %d' % (self.num_of_vars, self.num_of_relations))
+        print('Max guess: %d | Max steps: %d' % (self.max_guess, self.max_steps))
+        print('Solver: OR-Tools CP-SAT (%d threads)' % self.nthreads)
+        if self.cone.prune:
+            print(self.cone.summary())
+        if self.warm_start is not None:
+            print(self.warm_start.summary())
+        print('-' * 60)
+        print('MODEL GENERATION')
+        print('-' * 60)
+        start_time = time.time()
+        self.generate_cp_constraints()
+        self.generate_initial_conditions()
+        self.generate_objective_function()
+        if self.warm_start is not None:
+            self.generate_hint()
+        elapsed_time = time.time() - start_time
+        print('CP-SAT model generated in %0.2f seconds' % elapsed_time)
+        print('Boolean variables: %d | Constraints: %d' % (len(self.literals), len(self.cp_model.Proto().constraints)))
+        if self.log == 1:
+            self.cp_file_path = os.path.join(TEMP_DIR, 'cpsatmodel_mg%d_ms%d_%s.pb.txt' % (
+                self.max_guess, self.max_steps, self.rnd_string_tmp))
+            self.cp_model.ExportToFile(self.cp_file_path)
+            print('Written to: %s' % self.cp_file_path)
+
+    def solve_via_cpsolver(self):
+        """
+        This method calls CP-SAT to solve the generated model, printing the
+        improving solutions as they are found
+        """
+
+        solver = cp_model.CpSolver()
+        solver.parameters.num_workers = self.nthreads
+        solver.parameters.random_seed = random.randint(0, 1000)
+        if self.time_limit != -1:
+            solver.parameters.max_time_in_seconds = self.time_limit
+        print('-' * 60)
+        print('SOLVING')
+        print('-' * 60)
+        start_time = time.time()
+        status = solver.Solve(self.cp_model, SolutionPrinter(self.guess_literals(), self.guess_weights()))
+        elapsed_time = time.time() - start_time
+        print('Solving finished in %0.2f seconds' % elapsed_time)
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            system = self.system
+            cone = self.cone
+            initial_values = [solver.Value(self.literal(system.state_id(v, 0)))
+                              if cone.state_live(v, 0) else 0 for v in range(system.num_of_vars)]
+            self.solutions = system.solution_from_initial(cone.initial_values(initial_values), self.max_steps)
+            parse_solver_solution(self)
+            if self.cp_optimization == 1:
+                quantity = 'number' if self.system.weights is None else 'weighted number'
+                if status == cp_model.OPTIMAL:
+                    print('The %s of guesses is proven to be optimal' % quantity)
+                else:
+                    print('The %s of guesses is not proven to be optimal (lower bound: %d)' %
+                          (quantity, round(solver.BestObjectiveBound())))
+                if self.system.weights is not None:
+                    print('Weighted number of guesses: %d' % round(solver.ObjectiveValue()))
+            if self.draw_graph:
+                draw_graph(self.vertices, self.edges, self.known_variables, self.guessed_vars, self.output_dir, self.tikz, self.dglayout)
+            return True
+        elif status == cp_model.INFEASIBLE:
+            print('\n' + '=' * 60)
+            print('RESULT: UNSATISFIABLE')
+            print('The model is UNSAT!')
+            print('Increase max_guess or max_steps and try again.')
+            print('=' * 60)
+            return False
+        elif status == cp_model.MODEL_INVALID:
+            # The model is built by this class, so this is a bug rather than an answer
+            raise RuntimeError('The CP-SAT model is invalid: %s' % self.cp_model.Validate())
+        else:
+            print('\n' + '=' * 60)
+            print('RESULT: TIMEOUT')
+            print('The solver was interrupted before finding any solution.')
+            print('Perhaps more time is needed!')
+            print('=' * 60)
+            return None
@@ -32,7 +32,8 @@ import sys
 import string
 from collections import namedtuple
 from datetime import datetime
-from .macaulay import Macaulay
+from .macaulay import reduce_polynomials
+from .compiledsystem import CompiledSystem
 
 class ReduceGDtoGroebner:
     """
@@ -77,6 +78,7 @@ class ReduceGDtoGroebner:
         ###############################
         # Read and parse the input file
         parsed_data = read_relation_file(path=self.inputfile_name, temp_dir=self.temp_dir, preprocess=preprocess, D=D, log=self.log, extra_known=extra_known)
+        self.parsed_data = parsed_data
         self.problem_name = parsed_data['problem_name']
         self.variables = parsed_data['variables']
         self.known_variables = parsed_data['known_variables']
@@ -120,37 +122,7 @@ class ReduceGDtoGroebner:
             If there is a relation in which all terms are known except one, 
             then the value of the last term can be determined as well. 
         """
-        # Build inverted indices for O(1) lookup instead of O(|R|) scan per variable
-        from collections import defaultdict
-        sym_index = defaultdict(list)
-        for rel in self.symmetric_relations:
-            for v in rel:
-                sym_index[v].append(rel)
-        impl_index = defaultdict(list)
-        for rel in self.implication_relations:
-            impl_index[rel[-1]].append(rel)
-
-        possible_deductions = {}
-        for v in self.variables:
-            possible_deductions[v] = [[v]]
-            _seen = set()
-            for rel in sym_index.get(v, []):
-                temp = rel.copy()
-                temp.remove(v)
-                temp.sort()
-                key = tuple(temp)
-                if key not in _seen:
-                    _seen.add(key)
-                    possible_deductions[v].append(temp)
-            for rel in impl_index.get(v, []):
-                temp = rel.copy()
-                temp.remove(v)
-                temp.sort()
-                key = tuple(temp)
-                if key not in _seen:
-                    _seen.add(key)
-                    possible_deductions[v].append(temp)
-        return possible_deductions
+        return CompiledSystem(self.parsed_data).named_deductions()
 
     @parallel
     def ring_evaluator(self, expression):
@@ -481,29 +453,19 @@ def read_relation_file(path, temp_dir, preprocess=1, D=2, log=0, extra_known=Non
 
     connection_relations = sections.get('connection relations', '')
     algebraic_relations = sections.get('algebraic relations', '')
-    algebraic_equations_file = os.path.join(temp_dir, 'algebraic_equations_%s.txt' % rnd_string_tmp)
-    if algebraic_relations != '' and preprocess == 1:       
-        with open(algebraic_equations_file, 'w') as equations_file:
-            equations_file.write(algebraic_relations)
+    if algebraic_relations != '' and preprocess == 1:
         starting_time = time.time()
-        macaulay_basis_file = os.path.join(temp_dir, 'macaulay_basis_%s.txt' % rnd_string_tmp)
         print('-' * 60)
         print('PREPROCESSING (Macaulay matrix)')
         print('-' * 60)
-        macaulay = Macaulay(inputfile=algebraic_equations_file, 
-                            outputfile=macaulay_basis_file,
-                            D=D, term_ordering='deglex')
-        macaulay.build_macaulay_matrix()
-        macaulay.gaussian_elimination()
-        macaulay.write_result()
+        groebner_basis = '\n'.join(reduce_polynomials(algebraic_relations.split('\n'), D=D, term_ordering='deglex'))
         elapsed_time = time.time() - starting_time
         print('Preprocessing finished in %0.4f seconds' % elapsed_time)
-        try:
-            with open(macaulay_basis_file, 'r') as groebner_basis_file:
-                groebner_basis = groebner_basis_file.read()
-        except IOError:
-            print(macaulay_basis_file + ' is not accessible!')
-            sys.exit()
+        if log != 0:
+            with open(os.path.join(temp_dir, 'algebraic_equations_%s.txt' % rnd_string_tmp), 'w') as equations_file:
+                equations_file.write(algebraic_relations + '\n')
+            with open(os.path.join(temp_dir, 'macaulay_basis_%s.txt' % rnd_string_tmp), 'w') as groebner_basis_file:
+                groebner_basis_file.write(groebner_basis + '\n')
         algebraic_relations += '\n' + groebner_basis
         # algebraic_relations = groebner_basis
         if connection_relations == '':
@@ -542,9 +504,6 @@ def read_relation_file(path, temp_dir, preprocess=1, D=2, log=0, extra_known=Non
                    'target_variables': target_variables, 'notguessed_variables': notguessed_variables,
                    'symmetric_relations': symmetric_relations, 'implication_relations': implication_relations,
                    'dummy_mapping': dummy_mapping}
-    if log == 0 and preprocess == 1 and algebraic_relations != '':
-        os.remove(algebraic_equations_file)
-        os.remove(macaulay_basis_file)
     return parsed_data
 
 
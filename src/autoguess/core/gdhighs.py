@@ -0,0 +1,184 @@
+'''
+Created on Oct 18, 2026
+
+@author: Hosein Hadipour
+@contact: hsn.hadipour@gmail.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+In case you use this tool please include the above copyright informations (name, contact, license)
+'''
+
+import os
+import time
+import random
+import numpy as np
+from scipy.optimize import milp, LinearConstraint, Bounds
+from .compiledsystem import compile_relation_system
+from .milpmatrix import MILPMatrix
+from .parsesolution import parse_solver_solution
+from .graphdrawer import draw_graph
+from autoguess.config import TEMP_DIR
+
+
+class ReduceGDtoHiGHS:
+    """
+    ReduceGDtoHiGHS
+    This class reduces the guess-and-determine attack and key-bridging to
+    the MILP problem of ReduceGDtoMILP, and solves it with the open-source
+    HiGHS solver through scipy.optimize.milp, so that no Gurobi license is
+    needed.  The constraint matrix is assembled by MILPMatrix.
+
+    direction:  'min' minimizes the number of guessed variables (at most max_guess),
+                'max' maximizes the number of known target variables
+    max_steps:  Number of state copies
+    prune:      If True (default), only the cone of influence of the target
+                variables is encoded (see ConeOfInfluence)
+    """
+
+    count = 0
+
+    def __init__(self, inputfile_name=None, outputfile_name='output', max_guess=0, max_steps=0, direction='min',\
+        tikz=0, preprocess=1, D=2, dglayout="dot", drawgraph=True, log=0, threads=0, extra_known=None, system=None, prune=True):
+        self.inputfile_name = inputfile_name
+        self.rnd_string_tmp = '%030x' % random.randrange(16**30)
+        self.output_dir = outputfile_name
+        self.max_guess = max_guess
+        self.max_steps = max_steps
+        self.direction = direction
+        self.dglayout = dglayout
+        self.draw_graph = drawgraph
+        self.log = log
+        self.threads = threads
+        ###############################
+        # Read, parse and compile the input file (unless a compiled system is shared)
+        if system is None:
+            system = compile_relation_system(self.inputfile_name, preprocess=preprocess, D=D, log=self.log, extra_known=extra_known)
+        self.system = system
+        self.problem_name = system.problem_name
+        self.variables = system.variables
+        self.known_variables = system.known_variables
+        self.target_variables = system.target_variables
+        self.notguessed_variables = system.notguessed_variables
+        self.symmetric_relations = system.symmetric_relations
+        self.implication_relations = system.implication_relations
+        self.dummy_mapping = system.dummy_mapping
+        self.num_of_relations = system.num_of_relations
+        self.num_of_vars = system.num_of_vars
+        self.cone = system.cone_of_influence(self.max_steps, prune=prune)
+        ###############################
+        if self.max_guess is None:
+            self.max_guess = len(self.target_variables)
+            print('The number of guessed variables is set to be at most %d' % self.max_guess)
+        self.milp_matrix = None
+        self.time_limit = -1
+        self.tikz = tikz
+
+    def make_model(self):
+        """
+        This method makes the MILP model in matrix form.  When log == 1, the
+        matrices are also written into an .npz file
+        """
+
+        print('=' * 60)
+        print('MILP SOLVER (HiGHS) — %s' % self.problem_name)
+        print('=' * 60)
+        print('Variables: %d | Relations: %d' % (self.num_of_vars, self.num_of_relations))
+        print('Max guess: %d | Max steps: %d | Direction: %s' % (self.max_guess, self.max_steps, self.direction))
+        if self.cone.prune:
+            print(self.cone.summary())
+        print('-' * 60)
+        print('MODEL GENERATION')
+        print('-' * 60)
+        start_time = time.time()
+        matrix = MILPMatrix(self.system, self.cone, self.max_guess, self.max_steps, self.direction)
+        self.milp_matrix = matrix
+        # scipy.optimize.milp takes two-sided rows lb <= A x <= ub
+        self.row_lower = np.where(matrix.sense == '<', -np.inf, matrix.rhs)
+        self.row_upper = np.where(matrix.sense == '>', np.inf, matrix.rhs)
+        elapsed_time = time.time() - start_time
+        print('MILP model generated in %0.2f seconds' % elapsed_time)
+        print('Binary variables: %d | Constraints: %d | Nonzeros: %d' % (
+            matrix.num_of_columns, matrix.num_of_rows, matrix.A.nnz))
+        if self.log == 1:
+            self.npz_file_path = os.path.join(TEMP_DIR, 'milp_mg%d_ms%d_%s_%s.npz' % (
+                self.max_guess, self.max_steps, self.direction, self.rnd_string_tmp))
+            np.savez_compressed(self.npz_file_path, objective=matrix.objective,
+                                data=matrix.A.data, indices=matrix.A.indices, indptr=matrix.A.indptr,
+                                shape=matrix.A.shape, row_lower=self.row_lower, row_upper=self.row_upper,
+                                column_ids=matrix.column_ids)
+            print('Written to: %s' % self.npz_file_path)
+
+    def solve_model(self):
+        """
+        This method uses HiGHS to solve the obtained MILP problem.
+        Returns True if a solution was found, False if the model is
+        infeasible, and None otherwise
+        """
+
+        matrix = self.milp_matrix
+        objective = -matrix.objective if self.direction == 'max' else matrix.objective
+        options = {'disp': self.log == 1}
+        if self.time_limit != -1:
+            options['time_limit'] = self.time_limit
+        if self.threads not in (0, 1):
+            print('The number of threads cannot be set through scipy: HiGHS runs its branch-and-bound serially')
+        print('-' * 60)
+        print('SOLVING')
+        print('-' * 60)
+        start_time = time.time()
+        result = milp(objective,
+                      constraints=LinearConstraint(matrix.A, self.row_lower, self.row_upper),
+                      integrality=np.ones(matrix.num_of_columns),
+                      bounds=Bounds(0, 1),
+                      options=options)
+        elapsed_time = time.time() - start_time
+        print('Solving finished in %0.2f seconds' % elapsed_time)
+        if result.x is not None:
+            system = self.system
+            # Pruned variables of the initial state read as 0
+            initial_values = [0] * system.num_of_vars
+            live = np.flatnonzero(matrix.state_cols[0] >= 0)
+            for v, x in zip(live.tolist(), np.round(result.x[matrix.state_slices[0]]).astype(int).tolist()):
+                initial_values[v] = x
+            self.objval = -result.fun if self.direction == 'max' else result.fun
+            self.solutions = system.solution_from_initial(self.cone.initial_values(initial_values), self.max_steps)
+            parse_solver_solution(self)
+            if result.status == 0:
+                print('The solution is proven to be optimal')
+            else:
+                bound = getattr(result, 'mip_dual_bound', None)
+                if bound is not None:
+                    bound = -bound if self.direction == 'max' else bound
+                    print('The solution is not proven to be optimal (bound: %0.2f)' % bound)
+                else:
+                    print('The solution is not proven to be optimal')
+            if self.draw_graph:
+                draw_graph(self.vertices, self.edges, self.known_variables, self.guessed_vars,\
+                    self.output_dir, self.tikz, self.dglayout)
+            return True
+        elif result.status == 2:
+            print('\n' + '=' * 60)
+            print('RESULT: INFEASIBLE')
+            print('The MILP model is infeasible!')
+            print('Increase max_guess or max_steps and try again.')
+            print('=' * 60)
+            return False
+        else:
+            print('\n' + '=' * 60)
+            print('RESULT: TIMEOUT')
+            print(result.message)
+            print('Perhaps more time is needed!')
+            print('=' * 60)
+            return None
@@ -0,0 +1,156 @@
+'''
+Created on Oct 18, 2026
+
+@author: Hosein Hadipour
+@contact: hsn.hadipour@gmail.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+In case you use this tool please include the above copyright informations (name, contact, license)
+'''
+
+import os
+import time
+from pysat import formula
+from pysat.examples.rc2 import RC2, RC2Stratified
+from threading import Timer
+from .gdsat import ReduceGDtoSAT
+from .parsesolution import parse_solver_solution
+from .graphdrawer import draw_graph
+from autoguess.config import TEMP_DIR
+
+class ReduceGDtoMaxSAT(ReduceGDtoSAT):
+    """
+    This class reduces the problem of finding a minimum guess basis to a
+    weighted partial MaxSAT problem and solves it with the core-guided RC2
+    (OLL) algorithm of PySAT.
+
+    The hard clauses are the SAT model of ReduceGDtoSAT without its
+    cardinality constraint, and every guess candidate at step 0 comes with a
+    soft clause asking it not to be guessed, weighted from the weights
+    section of the input file (1 by default).  Hence max_guess is not used:
+    the solver goes up from the lower bounds given by the unsatisfiable cores
+    instead of walking max_guess downwards as --findmin does.
+
+    stratified: If True, use RC2Stratified, which handles the heaviest soft
+                clauses first (useful for weighted problems)
+    """
+
+    def __init__(self, inputfile_name=None, outputfile_name='output', max_guess=0, max_steps=0, sat_solver='cadical153',\
+        tikz=0, preprocess=1, D=2, dglayout="dot", drawgraph=True, log=0, extra_known=None, system=None, prune=True,\
+        stratified=False):
+        super().__init__(inputfile_name=inputfile_name, outputfile_name=outputfile_name, max_guess=max_guess,
+                         max_steps=max_steps, sat_solver=sat_solver, tikz=tikz, preprocess=preprocess, D=D,
+                         dglayout=dglayout, drawgraph=drawgraph, log=log, extra_known=extra_known,
+                         system=system, stream=False, prune=prune)
+        self.stratified = stratified
+        self.wcnf = None
+
+    def make_model(self):
+        """
+        This method makes the weighted partial MaxSAT model.  When log == 1,
+        it is also written into a WCNF file
+        """
+
+        print('=' * 60)
+        print('MAXSAT SOLVER — %s' % self.problem_name)
+        print('=' * 60)
+        print('Variables: %d | Relations: %d' % (self.num_of_vars, self.num_of_relations))
+        print('Max steps: %d' % self.max_steps)
+        print('Solver: %s (%s)' % ('RC2Stratified' if self.stratified else 'RC2', self.sat_solver_name))
+        if self.cone.prune:
+            print(self.cone.summary())
+        print('-' * 60)
+        print('MODEL GENERATION')
+        print('-' * 60)
+        start_time = time.time()
+        self.generate_sat_constraints()
+        self.generate_boundary_no_cardinality()
+        lits, weights = self.get_cardinality_lits()
+        if weights is None:
+            weights = [1] * len(lits)
+        self.wcnf = formula.WCNF()
+        # The hard clauses are shared with self.cnf_formula rather than copied
+        self.wcnf.hard = self.cnf_formula.clauses
+        self.wcnf.nv = self.top_variable_identifier_so_far
+        for lit, weight in zip(lits, weights):
+            self.wcnf.append([-lit], weight=weight)
+        elapsed_time = time.time() - start_time
+        print('MaxSAT model generated in %0.2f seconds' % elapsed_time)
+        print('Hard clauses: %d | Soft clauses: %d | SAT variables: %d' % (
+            len(self.wcnf.hard), len(self.wcnf.soft), self.wcnf.nv))
+        if self.log == 1:
+            self.wcnf_file_path = os.path.join(TEMP_DIR, 'wcnf_ms%d_%s.wcnf' % (self.max_steps, self.rnd_string_tmp))
+            self.wcnf.to_file(self.wcnf_file_path)
+            print('Written to: %s' % self.wcnf_file_path)
+
+    def solve_via_maxsat(self):
+        """
+        Solve the MaxSAT model via RC2.  Returns True if an optimal guess
+        basis was found, False if the hard clauses are unsatisfiable (the
+        targets cannot be determined within max_steps) and None on timeout
+        """
+
+        print('-' * 60)
+        print('SOLVING')
+        print('-' * 60)
+        # adapt, exhaust and minz are the settings recommended for RC2
+        rc2_class = RC2Stratified if self.stratified else RC2
+        rc2 = rc2_class(self.wcnf, solver=self.sat_solver_name, adapt=True, exhaust=True, minz=True)
+        timer = None
+        if self.time_limit != -1:
+            if self.supports_time_limit():
+                timer = Timer(self.time_limit, rc2.interrupt)
+                timer.start()
+            else:
+                print('time_limit is not supported for the chosen sat solver ... ')
+        start_time = time.time()
+        try:
+            model = rc2.compute(expect_interrupt=timer is not None)
+            cost = rc2.cost
+            interrupted = rc2.interrupted
+        finally:
+            if timer is not None:
+                timer.cancel()
+            rc2.delete()
+        elapsed_time = time.time() - start_time
+        print('Solving finished in %0.2f seconds' % elapsed_time)
+        if model is not None:
+            # RC2 only reports the variables that occur in the formula
+            dense_model = [-(i + 1) for i in range(self.num_of_vars)]
+            for lit in model:
+                if 0 < lit <= self.num_of_vars:
+                    dense_model[lit - 1] = lit
+            self.max_guess = cost
+            self.extract_solution(dense_model)
+            parse_solver_solution(self)
+            print('Optimal (weighted) number of guesses: %d' % cost)
+            if self.draw_graph:
+                draw_graph(self.vertices, self.edges, self.known_variables, self.guessed_vars,\
+                     self.output_dir, self.tikz, self.dglayout)
+            return True
+        elif interrupted:
+            print('\n' + '=' * 60)
+            print('RESULT: TIMEOUT')
+            print('The solver was interrupted before finding an optimal solution.')
+            print('Lower bound on the (weighted) number of guesses: %d' % cost)
+            print('=' * 60)
+            return None
+        else:
+            print('\n' + '=' * 60)
+            print('RESULT: UNSATISFIABLE')
+            print('The target variables cannot be determined within max_steps.')
+            print('Increase max_steps and try again.')
+            print('=' * 60)
+            return False
@@ -22,14 +22,17 @@ In case you use this tool please include the above copyright informations (name,
 
 from .parsesolution import parse_solver_solution
 from gurobipy import *
-from .inputparser import read_relation_file
+from .compiledsystem import compile_relation_system
+from .milpmatrix import MILPMatrix
+from .warmstart import WarmStart
+import numpy as np
 import os
 import time
 import random
 from .parsesolution import parse_solver_solution
 from .graphdrawer import draw_graph
 from autoguess.config import TEMP_DIR
-from .varnames import step_var, path_var
+from .varnames import step_var
 
 class ReduceGDtoMILP:
     """
@@ -46,12 +49,17 @@ class ReduceGDtoMILP:
     max_guess:  The number of guessed variables in mod 0,
                 and an upper bound for the number of guessed variables in mod 1
     max_steps:  Number of state copies 
+    prune:      If True (default), only the cone of influence of the target
+                variables is encoded (see ConeOfInfluence)
+    hint:       A guess basis (see WarmStart) whose assignment is given to
+                Gurobi as a MIP start
     """
 
     count = 0
 
     def __init__(self, inputfile_name=None, outputfile_name='output', max_guess=0, max_steps=0, direction='min',\
-        tikz=0, preprocess=1, D=2, dglayout="dot", drawgraph=True, log=0, threads=0, extra_known=None):
+        tikz=0, preprocess=1, D=2, dglayout="dot", drawgraph=True, log=0, threads=0, extra_known=None, system=None, prune=True,
+        hint=None):
         self.inputfile_name = inputfile_name
         self.rnd_string_tmp = '%030x' % random.randrange(16**30)        
         self.output_dir = outputfile_name
@@ -63,20 +71,23 @@ class ReduceGDtoMILP:
         self.log = log
         self.threads = threads
         ###############################
-        # Read and parse the input file
-        parsed_data = read_relation_file(self.inputfile_name, preprocess, D, extra_known=extra_known)
-        self.problem_name = parsed_data['problem_name']
-        self.variables = parsed_data['variables']
-        self.known_variables = parsed_data['known_variables']
-        self.target_variables = parsed_data['target_variables']
-        self.target_weights = parsed_data['target_weights']
-        self.notguessed_variables = parsed_data['notguessed_variables']
-        self.symmetric_relations = parsed_data['symmetric_relations']
-        self.implication_relations = parsed_data['implication_relations']
-        self.dummy_mapping = parsed_data.get('dummy_mapping', {})
-        self.num_of_relations = len(
-            self.symmetric_relations) + len(self.implication_relations)
-        self.num_of_vars = len(self.variables)
+        # Read, parse and compile the input file (unless a compiled system is shared)
+        if system is None:
+            system = compile_relation_system(self.inputfile_name, preprocess=preprocess, D=D, extra_known=extra_known)
+        self.system = system
+        self.problem_name = system.problem_name
+        self.variables = system.variables
+        self.known_variables = system.known_variables
+        self.target_variables = system.target_variables
+        self.target_weights = system.target_weights
+        self.notguessed_variables = system.notguessed_variables
+        self.symmetric_relations = system.symmetric_relations
+        self.implication_relations = system.implication_relations
+        self.dummy_mapping = system.dummy_mapping
+        self.num_of_relations = system.num_of_relations
+        self.num_of_vars = system.num_of_vars
+        self.cone = system.cone_of_influence(self.max_steps, prune=prune)
+        self.warm_start = WarmStart(system, self.cone, hint, self.max_steps) if hint else None
         ###############################
         if self.max_guess is None:
             self.max_guess = len(self.target_variables)
@@ -84,9 +95,6 @@ class ReduceGDtoMILP:
         self.lpfile_name = 'milp_mg%d_ms%d_%s_%s.lp' % (
                             self.max_guess,\
                             max_steps, direction, self.rnd_string_tmp)
-        self.deductions = self.generate_possible_deductions()
-        # milp_variables is initialized to the variables corresponding to the initial state variables
-        self.milp_variables = [step_var(v, 0) for v in self.variables]
         self.time_limit = -1
         self.tikz = tikz
 
@@ -100,196 +108,47 @@ class ReduceGDtoMILP:
         seen_add = seen.add
         return [x for x in seq if not (x in seen or seen_add(x))]
 
-    def generate_possible_deductions(self):
+    @staticmethod
+    def lp_name(var_id):
         """
-        This method generates all possible deductions 
-
-        Core idea of information propagation: 
-            If there is a relation in which all terms are known except one, 
-            then the value of the last term can be determined as well. 
-        """
-
-        # Build inverted indices for O(1) lookup instead of O(|R|) scan per variable
-        from collections import defaultdict
-        sym_index = defaultdict(list)
-        for rel in self.symmetric_relations:
-            for v in rel:
-                sym_index[v].append(rel)
-        impl_index = defaultdict(list)
-        for rel in self.implication_relations:
-            impl_index[rel[-1]].append(rel)
-
-        possible_deductions = {}
-        for v in self.variables:
-            possible_deductions[v] = [[v]]
-            for rel in sym_index.get(v, []):
-                temp = rel.copy()
-                temp.remove(v)
-                possible_deductions[v].append(temp)
-            for rel in impl_index.get(v, []):
-                temp = rel.copy()
-                temp.remove(v)
-                possible_deductions[v].append(temp)
-        return possible_deductions
-
-    def generate_objective_function(self):
-        """
-        This method generates the objective function of the MILP problem
-        """
-        _known_set = set(self.known_variables)
-        if self.direction == 'max':
-            objective_function = 'Maximize\n'
-            final_state = [step_var(v, self.max_steps)
-                           for v in self.target_variables]
-            objective_function += ' + '.join(final_state)
-        elif self.direction == 'min':
-            objective_function = 'Minimize\n'
-            unknown_init_state_vars = [v for v in self.variables if v not in _known_set]
-            if self.target_weights != None:
-                wights = [self.target_weights.get(v, 1) for v in unknown_init_state_vars]
-                weighted_init_state = zip(wights, unknown_init_state_vars)
-                objective_list = ['%d %s' % (w, step_var(v, 0)) for (w, v) in weighted_init_state]                
-            else:
-                objective_list = [step_var(v, 0) for v in unknown_init_state_vars]
-            objective_function += ' + '.join(objective_list)
-        objective_function += '\n'
-        return objective_function
-
-    def generate_initial_conditions(self):
-        """
-        This method generates the initial constraints consisting of 
-        constrains corresponding to the maximum number of guessed variables, and 
-        number of known variables in the initial state
+        LP identifier of the given integer id of the compiled system
         """
-
-        initial_constraints = 'Subject To\n'
-        _known_set = set(self.known_variables)
-        unknown_vars = ['%s' % v for v in self.variables if v not in _known_set]
-        unknown_init_state_vars = [step_var(v, 0) for v in unknown_vars]
-        if self.target_weights != None:
-            LHS1 = ['%d %s' % (self.target_weights[v], step_var(v, 0)) for v in unknown_vars]
-            LHS1 = ' + '.join(LHS1)
-        else:
-            LHS1 = ' + '.join(unknown_init_state_vars)
-        RHS1 = self.max_guess
-        final_state_target_vars = [step_var(
-            v, self.max_steps) for v in self.target_variables]
-        LHS2 = ' + '.join(final_state_target_vars)
-        RHS2 = len(final_state_target_vars)
-
-        if self.direction == 'max':
-            # initial_constraints += '%s = %d\n' % (LHS1, RHS1)
-            initial_constraints += '%s <= %d\n' % (LHS1, RHS1)
-        elif self.direction == 'min':
-            initial_constraints += '%s <= %d\n' % (LHS1, RHS1)
-            initial_constraints += '%s = %d\n' % (LHS2, RHS2)          
-
-        for v in self.known_variables:
-            if v != '':
-                initial_constraints += '%s = 1\n' % step_var(v, 0)
-
-        # Limit the notguessed variables to be equal to 0 in the first step of knowledge propagation
-        for v in self.notguessed_variables:
-            if v != '':                
-                initial_constraints += '%s = 0;\n' % step_var(v, 0)        
-        return initial_constraints
-    
-
-    def generate_milp_constraints(self):
-        """
-        This method generates the milp constraints corresponding to the 
-        obtained deductions.
-        """
-
-        _lines = []
-        for step in range(self.max_steps):
-            for v in self.variables:
-                v_old = step_var(v, step)
-                v_new = step_var(v, step + 1)
-                tau = len(self.deductions[v])
-                v_path_variables = [path_var(
-                                    v, step + 1, i) for i in range(tau)]
-                self.milp_variables.extend([v_new] + v_path_variables)
-                #####################################-State variable constraints-#####################################
-                ######################################################################################################
-                ######################################################################################################
-                LHS = ' + '.join(v_path_variables)
-                _lines.append('\\ Constraints corresponding to the state variable %s:\n' % v_new)
-                if tau == 1:
-                    _lines.append('%s - %s = 0\n' % (v_new, LHS))
-                else:
-                    _lines.append('-2 %s + %s >= -1\n' % (v_new, LHS))
-                    _lines.append('%d %s - %s >= 0\n' % (
-                        tau, v_new, LHS.replace('+', '-')))
-                #####################################-Path variable constraints-######################################
-                ######################################################################################################
-                ######################################################################################################
-                for i in range(tau // 2):
-                    v_connected_variables = [step_var(
-                        var, step) for var in self.deductions[v][i]]
-                    LHS = ' - '.join(v_connected_variables)
-                    kapa = len(v_connected_variables)
-                    _lines.append('\\ Constraints corresponding to the path variable %s:\n' % v_path_variables[i])
-                    if kapa == 1:
-                        _lines.append('%s - %s = 0\n' % (
-                            v_path_variables[i], LHS))
-                    else:
-                        _lines.append('%s - %s >= %d\n' % (
-                            v_path_variables[i], LHS, 1 - kapa))
-                        _lines.append('-%d %s + %s >= 0\n' % (
-                            kapa, v_path_variables[i], LHS.replace('-', '+')))
-                #####################################-Path variable constraints-######################################
-                ######################################################################################################
-                ######################################################################################################
-                for i in range(tau // 2, tau):
-                    v_connected_variables = [step_var(
-                        var, step) for var in self.deductions[v][i]]
-                    LHS = ' - '.join(v_connected_variables)
-                    kapa = len(v_connected_variables)
-                    _lines.append('\\ Constraints corresponding to the path variable %s:\n' % v_path_variables[i])
-                    if kapa == 1:
-                        _lines.append('%s - %s = 0\n' % (
-                            v_path_variables[i], LHS))
-                    else:
-                        _lines.append('%s - %s >= %d\n' % (
-                            v_path_variables[i], LHS, 1 - kapa))
-                        _lines.append('-%d %s + %s >= 0\n' % (
-                            kapa, v_path_variables[i], LHS.replace('-', '+')))
-                ######################################################################################################
-                ######################################################################################################
-                ######################################################################################################
-                # Given that the order of putting constraints into an LP file have a great impact on the performance of
-                # Gurobi (and other CP solvers), user may want to change the order of constraints inside the generated
-                # LP file in order to find a more suitable ordering. It is not known which odering might be the best from
-                # the theoretical point of view in general. However, according to my experiences it may be better to put the connected
-                # relations closer to each other. For example, change the order of the above blocks to see what impact it has
-                # on the performance.
-        return ''.join(_lines)
-
-    def declare_binary_variables(self):
-        """
-        This function declares the binary variables into the generated LP file
-        """
-
-        return 'Binary\n' + ''.join('%s\n' % v for v in self.milp_variables)
+        return 'b%d' % var_id
 
     def make_model(self):
         """
-        This method makes the MILP model, and then write it into an LP file
+        This method makes the MILP model in memory with the matrix API of
+        gurobipy.  When log == 1, it is also written into an LP file
         """
 
         print('Generating the MILP model ...')
+        if self.cone.prune:
+            print(self.cone.summary())
+        if self.warm_start is not None:
+            print(self.warm_start.summary())
         start_time = time.time()
-        lp_str = self.generate_objective_function()
-        lp_str += self.generate_initial_conditions()
-        lp_str += self.generate_milp_constraints()
-        lp_str += self.declare_binary_variables()
-        lp_str += 'End\n'
-        lp_file_path = os.path.join(TEMP_DIR, self.lpfile_name)
+        matrix = MILPMatrix(self.system, self.cone, self.max_guess, self.max_steps, self.direction)
+        self.milp_matrix = matrix
+        self.milp_model = Model(self.problem_name)
+        if self.direction == 'max':
+            self.milp_model.ModelSense = GRB.MAXIMIZE
+        else:
+            self.milp_model.ModelSense = GRB.MINIMIZE
+        self.milp_vars = self.milp_model.addMVar(matrix.num_of_columns, vtype=GRB.BINARY, obj=matrix.objective)
+        self.milp_model.addMConstr(matrix.A, self.milp_vars, matrix.sense, matrix.rhs)
+        # Handles of the state variables of every step, in the order of matrix.state_cols
+        self.state_vars = [self.milp_vars[s] for s in matrix.state_slices]
+        if self.warm_start is not None:
+            self.milp_vars.Start = self.warm_start.values(matrix.column_ids).astype(float)
+        self.milp_model.update()
         elapsed_time = time.time() - start_time
-        with open(lp_file_path, 'w') as lpfile:
-                lpfile.write(lp_str) 
+        print('MILP model: %d binary variables, %d constraints' % (matrix.num_of_columns, matrix.num_of_rows))
         if self.log == 1:
+            # Name the columns after their integer ids, as in the former LP files
+            self.milp_model.setAttr('VarName', self.milp_vars.tolist(),
+                                    [self.lp_name(i) for i in matrix.column_ids.tolist()])
+            lp_file_path = os.path.join(TEMP_DIR, self.lpfile_name)
+            self.milp_model.write(lp_file_path)
             print('MILP model was generated, and written into %s after %0.2f seconds' % (
                 lp_file_path, elapsed_time))
         else:
@@ -382,12 +241,10 @@ class ReduceGDtoMILP:
 
     def solve_model(self):
         """
-        This method uses Gurobi to solve the obtained MILP problem
+        This method uses Gurobi to solve the obtained MILP problem.
+        Returns True if a solution was found, False if the model is
+        infeasible, and None otherwise
         """
-        lpfile_path = os.path.join(TEMP_DIR, self.lpfile_name)
-        self.milp_model = read(lpfile_path)
-        if self.log == 0:
-            os.remove(lpfile_path)
         if self.time_limit != -1:
             self.milp_model.params.TimeLimit = self.time_limit
         # 0 (default: Gurobi strikes a balance between finding feasible solution and proving the optimality)
@@ -413,12 +270,15 @@ class ReduceGDtoMILP:
                     'No solution found! Perhaps, I need more time to solve this problem.')
                 return
             self.objval = self.milp_model.objval
-            self.solutions = [0]*(self.max_steps + 1)
-            for step in range(self.max_steps + 1):
-                state_vars = [step_var(v, step) for v in self.variables]
-                state_values = list(
-                    map(lambda x: int(self.milp_model.getVarByName(x).Xn), state_vars))
-                self.solutions[step] = dict(zip(state_vars, state_values))
+            system = self.system
+            # One query for the whole initial state; pruned variables read as 0
+            initial_values = [0] * system.num_of_vars
+            initial_cols = self.milp_matrix.state_cols[0]
+            live = np.flatnonzero(initial_cols >= 0)
+            values = self.milp_model.getAttr('X', self.state_vars[0].tolist())
+            for v, x in zip(live.tolist(), values):
+                initial_values[v] = int(round(x))
+            self.solutions = system.solution_from_initial(self.cone.initial_values(initial_values), self.max_steps)
             if self.milp_model.SolCount == 0:
                 print('Sorry! There is no solution to be parsed.\nTry again please.')
                 return
@@ -433,7 +293,9 @@ class ReduceGDtoMILP:
                 if self.draw_graph:
                     draw_graph(self.vertices, self.edges, self.known_variables, self.guessed_vars,\
                         self.output_dir, self.tikz, self.dglayout)
+                return True
         elif self.milp_model.Status == GRB.INFEASIBLE:
             print('The obtained milp model is infeasible')
+            return False
         else:
-            print('Unknown error!')        
+            print('Unknown error!')
@@ -20,21 +20,21 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 In case you use this tool please include the above copyright informations (name, contact, license)
 '''
 
-from logging import root
 import os
 import time
 from pysat import solvers
 from pysat import formula
 from pysat import card
 from pysat import pb
-from aiger import and_gate, or_gate
 import random
-from .inputparser import read_relation_file
+import numpy as np
+from .compiledsystem import compile_relation_system
+from .warmstart import WarmStart
+from .propagate import PropagationEngine
 from threading import Timer
 from .parsesolution import parse_solver_solution
 from .graphdrawer import draw_graph
 from autoguess.config import TEMP_DIR
-from .varnames import step_var, path_var
 
 class ReduceGDtoSAT:
     """
@@ -48,12 +48,20 @@ class ReduceGDtoSAT:
     inputfile_name: The name of a text file containing the relations
     max_guess:  The maximum number of guessed variables
     max_steps:  Number of state copies
+    stream:     If True (default), clauses are added to the live SAT solver
+                as they are generated and no CNF object is kept in memory.
+                Otherwise they are collected in self.cnf_formula.
+    prune:      If True (default), only the cone of influence of the target
+                variables is encoded (see ConeOfInfluence)
+    hint:       A guess basis (see WarmStart) whose assignment is set as the
+                preferred phases of the SAT solver
     """
 
     count = 0
 
     def __init__(self, inputfile_name=None, outputfile_name='output', max_guess=0, max_steps=0, sat_solver='cadical153',\
-        tikz=0, preprocess=1, D=2, dglayout="dot", drawgraph=True, log=0, extra_known=None):
+        tikz=0, preprocess=1, D=2, dglayout="dot", drawgraph=True, log=0, extra_known=None, system=None, stream=True, prune=True,
+        hint=None):
         ReduceGDtoSAT.count += 1
         self.inputfile_name = inputfile_name
         self.output_dir = outputfile_name
@@ -68,26 +76,35 @@ class ReduceGDtoSAT:
         self.dglayout = dglayout
         self.log = log
         ###############################
-        # Read and parse the input file
-        parsed_data = read_relation_file(self.inputfile_name, preprocess=preprocess, D=D, log=self.log, extra_known=extra_known)
-        self.problem_name = parsed_data['problem_name']
-        self.variables = parsed_data['variables']
-        self.known_variables = parsed_data['known_variables']
-        self.target_variables = parsed_data['target_variables']
-        self.target_weights = parsed_data['target_weights']
-        self.notguessed_variables = parsed_data['notguessed_variables']
-        self.symmetric_relations = parsed_data['symmetric_relations']
-        self.implication_relations = parsed_data['implication_relations']
-        self.dummy_mapping = parsed_data.get('dummy_mapping', {})
-        self.num_of_relations = len(
-            self.symmetric_relations) + len(self.implication_relations)
-        self.num_of_vars = len(self.variables)
+        # Read, parse and compile the input file (unless a compiled system is shared)
+        if system is None:
+            system = compile_relation_system(self.inputfile_name, preprocess=preprocess, D=D, log=self.log, extra_known=extra_known)
+        self.system = system
+        self.problem_name = system.problem_name
+        self.variables = system.variables
+        self.known_variables = system.known_variables
+        self.target_variables = system.target_variables
+        self.target_weights = system.target_weights
+        self.notguessed_variables = system.notguessed_variables
+        self.symmetric_relations = system.symmetric_relations
+        self.implication_relations = system.implication_relations
+        self.dummy_mapping = system.dummy_mapping
+        self.num_of_relations = system.num_of_relations
+        self.num_of_vars = system.num_of_vars
         ###############################
-        self.variables_dictionary = dict()
-        self.top_variable_identifier_so_far = 0
-        self.deductions = self.generate_possible_deductions()
-        self.cnf_formula = formula.CNF()
-        self.solver = solvers.Solver(name=self.sat_solver_name)
+        self.cone = system.cone_of_influence(self.max_steps, prune=prune)
+        self.top_variable_identifier_so_far = system.top_id(self.max_steps)
+        self.warm_start = WarmStart(system, self.cone, hint, self.max_steps) if hint else None
+        self.stream = stream
+        if self.stream:
+            self.sat_solver = solvers.Solver(name=self.sat_solver_name)
+            self.cnf_formula = None
+        else:
+            self.sat_solver = None
+            self.cnf_formula = formula.CNF()
+        # Opened by make_model when log == 1
+        self.cnf_file = None
+        self.num_of_clauses = 0
         self.time_limit = -1
         self.tikz = tikz
 
@@ -100,56 +117,20 @@ class ReduceGDtoSAT:
         seen_add = seen.add
         return [x for x in seq if not (x in seen or seen_add(x))]
 
-    def generate_possible_deductions(self):
-        """
-        This method generates all possible deductions 
-
-        Core idea of information propagation: 
-            If there is a relation in which all terms are known except one, 
-            then the value of the last term can be determined as well. 
-        """
-        
-        # Build inverted indices for O(1) lookup instead of O(|R|) scan per variable
-        from collections import defaultdict
-        sym_index = defaultdict(list)
-        for rel in self.symmetric_relations:
-            for v in rel:
-                sym_index[v].append(rel)
-        impl_index = defaultdict(list)
-        for rel in self.implication_relations:
-            impl_index[rel[-1]].append(rel)
-
-        possible_deductions = {}
-        for v in self.variables:
-            possible_deductions[v] = [[v]]
-            _seen = set()
-            for rel in sym_index.get(v, []):
-                temp = rel.copy()
-                temp.remove(v)
-                temp.sort()
-                key = tuple(temp)
-                if key not in _seen:
-                    _seen.add(key)
-                    possible_deductions[v].append(temp)
-            for rel in impl_index.get(v, []):
-                temp = rel.copy()
-                temp.remove(v)
-                temp.sort()
-                key = tuple(temp)
-                if key not in _seen:
-                    _seen.add(key)
-                    possible_deductions[v].append(temp)
-        return possible_deductions
-
-    def update_variables_dictionary(self, new_vars):
-        """
-        This method is used to update variables' dictionary
-        """
-        for nv in new_vars:
-            if nv not in self.variables_dictionary.keys():
-                self.top_variable_identifier_so_far += 1
-                self.variables_dictionary[nv] = self.variables_dictionary.get(
-                    nv, self.top_variable_identifier_so_far)
+    def add_clauses(self, clauses):
+        """
+        Send a list of clauses to the live solver (streaming mode) or to
+        self.cnf_formula, and to the DIMACS file if one is being written
+        """
+
+        if self.sat_solver is not None:
+            self.sat_solver.append_formula(clauses)
+        else:
+            self.cnf_formula.clauses.extend(clauses)
+            self.cnf_formula.nv = max(self.cnf_formula.nv, self.top_variable_identifier_so_far)
+        if self.cnf_file is not None:
+            self.cnf_file.writelines(' '.join(map(str, cl)) + ' 0\n' for cl in clauses)
+        self.num_of_clauses += len(clauses)
 
     def generate_boundary_conditions(self):
         """
@@ -158,31 +139,15 @@ class ReduceGDtoSAT:
         corresponding to the maximum number of guessed variables     
         """
 
-        final_state_target_vars = [step_var(
-            v, self.max_steps) for v in self.target_variables]
-        self.update_variables_dictionary(final_state_target_vars)
-        self.cnf_formula.extend([[self.variables_dictionary[fsv]]
-                                 for fsv in final_state_target_vars])
-        for v in self.known_variables:
-            if v != '':
-                known_variable_at_state0 = step_var(v, 0)
-                self.update_variables_dictionary([known_variable_at_state0])
-                self.cnf_formula.append(
-                    [self.variables_dictionary[known_variable_at_state0]])
-        for v in self.notguessed_variables:
-            if v != '':
-                temp = step_var(v, 0)
-                self.update_variables_dictionary([temp])
-                self.cnf_formula.append([-self.variables_dictionary[temp]])
-        # Cardinality constraint
-        _known_set = set(self.known_variables)
-        unknown_init_state_vars = [v for v in self.variables if v not in _known_set]
-        initial_state_vars = [step_var(v, 0) for v in unknown_init_state_vars]
-        if self.target_weights != None:
-            weights = [self.target_weights.get(v, 1) for v in unknown_init_state_vars]
-        else:
-            weights = None
-        self.update_variables_dictionary(initial_state_vars)
+        self.generate_boundary_no_cardinality()
+        self.generate_cardinality_constraint()
+
+    def generate_cardinality_constraint(self):
+        """
+        Limit the number of guessed variables in the initial state to max_guess
+        """
+
+        lits, weights = self.get_cardinality_lits()
         # The default value of encoding is card.Enctype.seqcounter
         # pairwise    = 0
         # seqcounter  = 1 *
@@ -194,105 +159,169 @@ class ReduceGDtoSAT:
         # mtotalizer  = 7
         # kmtotalizer = 8
         # native      = 9        
-        # card_constraint = card.CardEnc.atmost(lits=[self.variables_dictionary[v] for v in initial_state_vars],
+        # card_constraint = card.CardEnc.atmost(lits=lits,
         #                                       bound=self.max_guess,
         #                                       top_id=self.top_variable_identifier_so_far,
         #                                       encoding=card.EncType.sortnetwrk)
         # Using PyPBLib
-        card_constraint = pb.PBEnc.leq(lits=[self.variables_dictionary[v] for v in initial_state_vars],
+        card_constraint = pb.PBEnc.leq(lits=lits,
                                              weights=weights,
                                              bound=self.max_guess,
                                              top_id=self.top_variable_identifier_so_far,
                                              encoding=pb.EncType.binmerge)
-        card_clauses = card_constraint.clauses
-        self.cnf_formula.extend(card_clauses)
+        self.top_variable_identifier_so_far = max(self.top_variable_identifier_so_far, card_constraint.nv)
+        self.add_clauses(card_constraint.clauses)
 
     def generate_boundary_no_cardinality(self):
         """
         Generate boundary conditions (target/known/notguessed) WITHOUT
         the cardinality constraint.  Used by incremental findmin.
         """
-        final_state_target_vars = [step_var(
-            v, self.max_steps) for v in self.target_variables]
-        self.update_variables_dictionary(final_state_target_vars)
-        self.cnf_formula.extend([[self.variables_dictionary[fsv]]
-                                 for fsv in final_state_target_vars])
-        for v in self.known_variables:
-            if v != '':
-                known_variable_at_state0 = step_var(v, 0)
-                self.update_variables_dictionary([known_variable_at_state0])
-                self.cnf_formula.append(
-                    [self.variables_dictionary[known_variable_at_state0]])
-        for v in self.notguessed_variables:
-            if v != '':
-                temp = step_var(v, 0)
-                self.update_variables_dictionary([temp])
-                self.cnf_formula.append([-self.variables_dictionary[temp]])
-        # Register initial-state unknown variables (needed for external cardinality)
-        _known_set = set(self.known_variables)
-        unknown_init_state_vars = [v for v in self.variables if v not in _known_set]
-        initial_state_vars = [step_var(v, 0) for v in unknown_init_state_vars]
-        self.update_variables_dictionary(initial_state_vars)
+        self.generate_target_conditions()
+        self.generate_initial_conditions()
+
+    def generate_target_conditions(self):
+        """
+        Force the target variables to be known in the final state
+        """
+        system = self.system
+        self.add_clauses([[system.state_id(v, self.max_steps)] for v in system.targets])
+        # Targets outside of the cone can never be known (the model is UNSAT)
+        self.add_clauses([[-system.state_id(v, self.max_steps)] for v in self.cone.unreachable_targets])
+
+    def generate_initial_conditions(self):
+        """
+        Fix the known and notguessed variables in the initial state
+        """
+        system = self.system
+        cone = self.cone
+        self.add_clauses([[system.state_id(v, 0)] for v in system.known if cone.state_live(v, 0)])
+        self.add_clauses([[-system.state_id(v, 0)] for v in system.notguessed if cone.state_live(v, 0)])
 
     def get_cardinality_lits(self):
         """
         Return (lits, weights) for the cardinality constraint on
         initial-state unknown variables.
-        Must be called after generate_boundary_no_cardinality().
-        """
-        _known_set = set(self.known_variables)
-        unknown_init_state_vars = [v for v in self.variables if v not in _known_set]
-        initial_state_vars = [step_var(v, 0) for v in unknown_init_state_vars]
-        lits = [self.variables_dictionary[v] for v in initial_state_vars]
-        if self.target_weights is not None:
-            weights = [self.target_weights.get(v, 1) for v in unknown_init_state_vars]
+        """
+        system = self.system
+        candidates = self.cone.guess_candidates
+        lits = [system.state_id(v, 0) for v in candidates]
+        if system.weights is not None:
+            weights = [system.weights[v] for v in candidates]
         else:
             weights = None
         return lits, weights
 
+    def build_step_template(self, var_mask=None, ded_mask=None):
+        """
+        Build the clauses of one step layer (step 0 -> step 1) as NumPy int32
+        arrays.  Every other layer is the same template with all variable ids
+        shifted by step * layer_size, see CompiledSystem.
+
+        var_mask and ded_mask select the state and path variables of the new
+        step that are kept (see ConeOfInfluence.masks); by default all are.
+
+        Returns (lits, ptr): clause i is lits[ptr[i]:ptr[i + 1]].
+        """
+
+        system = self.system
+        n = system.num_of_vars
+        m = system.num_of_deductions
+        L = system.layer_size
+        ded_ptr = np.frombuffer(system.ded_ptr, dtype=np.int32)
+        dep_ptr = np.frombuffer(system.dep_ptr, dtype=np.int32)
+        dep_idx = np.frombuffer(system.dep_idx, dtype=np.int32)
+        owner = np.frombuffer(system.ded_owner, dtype=np.int32)
+        E = len(dep_idx)
+        vars_ = np.arange(n, dtype=np.int32)
+        deds = np.arange(m, dtype=np.int32)
+        v_new = L + vars_ + 1                       # state variables at step 1
+        v_path = n + deds + 1                       # path variables at step 1
+        k = np.diff(dep_ptr)                        # number of variables in each deduction
+        dep_of = np.repeat(deds, k)                 # deduction owning each entry of dep_idx
+        #####################################-State variable constraints-#####################################
+        # v_new = Or(v_path_variables):  [-v_new, p_0, ..., p_tau-1]  and  [-p_i, v_new]
+        or_lits = np.empty(n + m, dtype=np.int32)
+        or_lits[ded_ptr[:-1] + vars_] = -v_new
+        or_lits[deds + owner + 1] = v_path
+        or_cid = np.repeat(vars_, np.diff(ded_ptr) + 1)
+        imp_lits = np.column_stack((-v_path, v_new[owner])).ravel()
+        imp_cid = np.repeat(n + deds, 2)
+        #####################################-Path variable constraints-######################################
+        # p = And(v_connected_variables):  [-p, vc]  and  [p, -vc_0, ..., -vc_k-1]
+        dep_lits = np.column_stack((-v_path[dep_of], dep_idx + 1)).ravel()
+        dep_cid = np.repeat(n + m + np.arange(E, dtype=np.int32), 2)
+        and_lits = np.empty(m + E, dtype=np.int32)
+        and_lits[dep_ptr[:-1] + deds] = v_path
+        and_lits[np.arange(E, dtype=np.int32) + dep_of + 1] = -(dep_idx + 1)
+        and_cid = np.repeat(n + m + E + deds, k + 1)
+        ######################################################################################################
+        lits = np.concatenate((or_lits, imp_lits, dep_lits, and_lits))
+        cid = np.concatenate((or_cid, imp_cid, dep_cid, and_cid))
+        if var_mask is not None:
+            # Drop the clauses of pruned variables, and pruned paths from the Or clauses
+            or_keep = np.empty(n + m, dtype=bool)
+            or_keep[ded_ptr[:-1] + vars_] = var_mask
+            or_keep[deds + owner + 1] = ded_mask
+            keep = np.concatenate((or_keep, np.repeat(ded_mask, 2),
+                                   np.repeat(ded_mask[dep_of], 2), np.repeat(ded_mask, k + 1)))
+            lits = lits[keep]
+            cid = cid[keep]
+        starts = np.flatnonzero(np.diff(cid)) + 1
+        ptr = np.concatenate(([0], starts, [len(lits)]))
+        return lits, ptr
+
+    def iter_step_clauses(self, first_step=0, last_step=None, cone=None):
+        """
+        Yield the clauses of the step layers first_step..last_step-1 in chunks
+        (lists of lists), replicating the step template with a vectorized
+        offset instead of rebuilding every layer in Python.  Consecutive
+        layers with the same cone of influence share one template.
+        """
+
+        if last_step is None:
+            last_step = self.max_steps
+        if cone is None:
+            cone = self.cone
+        step = first_step
+        while step < last_step:
+            # Layer 'step' defines the variables of step + 1
+            var_mask, ded_mask = cone.masks(step + 1)
+            end = step + 1
+            while end < last_step:
+                next_var_mask, next_ded_mask = cone.masks(end + 1)
+                if not (np.array_equal(var_mask, next_var_mask) and np.array_equal(ded_mask, next_ded_mask)):
+                    break
+                end += 1
+            yield from self._replicate(*self.build_step_template(var_mask, ded_mask), step, end)
+            step = end
+
+    def _replicate(self, lits, ptr, first_step, last_step):
+        if len(lits) == 0:
+            return
+        sign = np.sign(lits)
+        L = self.system.layer_size
+        bounds = list(zip(ptr[:-1].tolist(), ptr[1:].tolist()))
+        # Bound the size of the replicated block to about 64k literals
+        chunk = max(1, (1 << 16) // len(lits))
+        for start in range(first_step, last_step, chunk):
+            steps = np.arange(start, min(start + chunk, last_step), dtype=np.int64)
+            block = (lits + sign * (steps[:, None] * L)).tolist()
+            yield [layer[a:b] for layer in block for a, b in bounds]
+
     def generate_sat_constraints(self):
         """
         This method generates the smt constraints corresponding to the 
         obtained deductions
         """
 
-        for step in range(self.max_steps):
-            for v in self.variables:
-                v_new = step_var(v, step + 1)
-                self.update_variables_dictionary([v_new])
-                tau = len(self.deductions[v])
-                v_path_variables = [path_var(
-                                    v, step + 1, i) for i in range(tau)]
-                self.update_variables_dictionary(v_path_variables)
-                #####################################-State variable constraints-#####################################
-                ######################################################################################################
-                ######################################################################################################
-                # v_new = Or(v_path_variables)
-                self.cnf_formula.append([-self.variables_dictionary[v_new]] + [
-                                        self.variables_dictionary[vp] for vp in v_path_variables])
-                for vp in v_path_variables:
-                    self.cnf_formula.append(
-                        [-self.variables_dictionary[vp], self.variables_dictionary[v_new]])
-                #####################################-Path variable constraints-######################################
-                ######################################################################################################
-                ######################################################################################################
-                for i in range(0, tau):
-                    # v_path_variables[i] = And(v_connected_variables)
-                    v_connected_variables = [step_var(
-                        var, step) for var in self.deductions[v][i]]
-                    self.update_variables_dictionary(v_connected_variables)
-                    for vc in v_connected_variables:
-                        self.cnf_formula.append(
-                            [-self.variables_dictionary[v_path_variables[i]], self.variables_dictionary[vc]])
-                    self.cnf_formula.append([self.variables_dictionary[v_path_variables[i]]] +
-                                            [-self.variables_dictionary[vc] for vc in v_connected_variables])
-                ######################################################################################################
-                ######################################################################################################
-                ######################################################################################################
+        for chunk in self.iter_step_clauses():
+            self.add_clauses(chunk)
 
     def make_model(self):
         """
-        This method makes the SAT model and then write it into a CNF file in DIMACS format
+        This method makes the SAT model.  When log == 1, it is also written
+        into a CNF file in DIMACS format while the clauses are generated
         """
 
         print('=' * 60)
@@ -301,21 +330,121 @@ class ReduceGDtoSAT:
         print('Variables: %d | Relations: %d' % (self.num_of_vars, self.num_of_relations))
         print('Max guess: %d | Max steps: %d' % (self.max_guess, self.max_steps))
         print('Solver: %s' % self.sat_solver_name)
+        if self.cone.prune:
+            print(self.cone.summary())
+        if self.warm_start is not None:
+            print(self.warm_start.summary())
         print('-' * 60)
         print('MODEL GENERATION')
         print('-' * 60)
         start_time = time.time()
-        self.generate_sat_constraints()
-        self.generate_boundary_conditions()
         self.cnf_file_path = os.path.join(TEMP_DIR, 'cnf_mg%d_ms%d_%s.cnf' % (
-            self.max_guess, self.max_steps, self.rnd_string_tmp))        
+            self.max_guess, self.max_steps, self.rnd_string_tmp))
+        if self.log == 1:
+            self.cnf_file = open(self.cnf_file_path, 'w')
+            # The header is only known at the end; reserve a fixed-width line for it
+            self.cnf_file.write(' ' * 64 + '\n')
+        try:
+            self.generate_sat_constraints()
+            self.generate_boundary_conditions()
+        finally:
+            if self.cnf_file is not None:
+                self.cnf_file.seek(0)
+                self.cnf_file.write(('p cnf %d %d' % (self.top_variable_identifier_so_far, self.num_of_clauses)).ljust(64))
+                self.cnf_file.close()
+                self.cnf_file = None
         elapsed_time = time.time() - start_time
+        print('SAT model generated in %0.2f seconds' % elapsed_time)
+        print('Clauses: %d | SAT variables: %d' % (self.num_of_clauses, self.top_variable_identifier_so_far))
         if self.log == 1:
-            self.cnf_formula.to_file(self.cnf_file_path)
-            print('SAT model generated in %0.2f seconds' % elapsed_time)
             print('Written to: %s' % self.cnf_file_path)
-        else:
-            print('SAT model generated in %0.2f seconds' % elapsed_time)
+
+    def extract_solution(self, model):
+        """
+        Materialise the state variables' names and values from a SAT model
+        (only the initial state is read, the other steps are recomputed)
+        """
+        n = self.num_of_vars
+        values = [int(x > 0) for x in model[:n]]
+        values += [0] * (n - len(values))
+        self.solutions = self.system.solution_from_initial(self.cone.initial_values(values), self.max_steps)
+
+    def apply_hint(self, sat_solver):
+        """
+        Make the SAT solver try the hinted assignment first
+        """
+
+        if self.warm_start is not None:
+            sat_solver.set_phases(self.warm_start.literals(self.cone))
+
+    def enumerate_bases(self, limit=None, block_supersets=False, deadline=None):
+        """
+        Generator of the guess bases of the model built by make_model, all
+        found by the same incremental SAT solver: after each solution, a
+        blocking clause over the step-0 literals of the guess candidates is
+        added, and the solver is called again.
+
+        block_supersets=False:  the guess set of every solution is blocked
+                    as it is, so every set of at most max_guess variables
+                    that determines the targets within max_steps is
+                    yielded exactly once (supersets of a basis included)
+        block_supersets=True:   every solution is first shrunk to an
+                    inclusion-minimal basis with the propagation engine, and
+                    all the supersets of that basis are blocked, so distinct
+                    inclusion-minimal bases are yielded
+
+        The enumeration stops after limit bases (None: no limit), when no
+        basis is left, or at the deadline (time.time(), None: no deadline);
+        self.enumeration_status is then 'limit', 'complete' or 'timeout'.
+        Yields the lists of the names of the guessed variables.
+        """
+
+        system = self.system
+        sat_solver = self.sat_solver
+        if sat_solver is None:
+            sat_solver = solvers.Solver(name=self.sat_solver_name, bootstrap_with=self.cnf_formula)
+            self.sat_solver = sat_solver
+        self.apply_hint(sat_solver)
+        candidates = list(self.cone.guess_candidates)
+        lits = [system.state_id(v, 0) for v in candidates]
+        if block_supersets:
+            engine = PropagationEngine(system.variables, system.symmetric_relations, system.implication_relations)
+
+            def is_basis(basis):
+                level = engine.state(system.known + basis, record=False).level
+                return all(0 <= level[v] <= self.max_steps for v in system.targets)
+        count = 0
+        self.enumeration_status = 'complete'
+        while limit is None or count < limit:
+            time_limit = -1 if deadline is None else deadline - time.time()
+            if deadline is not None and time_limit <= 0:
+                self.enumeration_status = 'timeout'
+                return
+            result = self._solve_limited(sat_solver, time_limit=time_limit)
+            if result is None:
+                self.enumeration_status = 'timeout'
+                return
+            if not result:
+                return
+            model = sat_solver.get_model()
+            basis = [v for v, lit in zip(candidates, lits) if model[lit - 1] > 0]
+            if block_supersets:
+                for v in list(basis):
+                    rest = [u for u in basis if u != v]
+                    if is_basis(rest):
+                        basis = rest
+                chosen = set(basis)
+                blocking_clause = [-system.state_id(v, 0) for v in basis]
+            else:
+                chosen = set(basis)
+                blocking_clause = [-lit if v in chosen else lit for v, lit in zip(candidates, lits)]
+            count += 1
+            yield [system.variables[v] for v in candidates if v in chosen]
+            if not blocking_clause:
+                # Nothing else can be blocked (e.g., no guess is needed)
+                return
+            sat_solver.add_clause(blocking_clause)
+        self.enumeration_status = 'limit'
 
     def interrupt(self, s):
         s.interrupt()
@@ -326,43 +455,58 @@ class ReduceGDtoSAT:
         solve the derived CNF formula
         """
 
-        if self.sat_solver_name in solvers.SolverNames.__dict__.keys():
-            sat_solver = solvers.Solver(name=self.sat_solver_name)
+        if self.sat_solver is not None:
+            sat_solver = self.sat_solver
         else:
-            print('Choose a solver from the following list please: %s' %
-                  ', '.join(self.supported_sat_solvers))
-            return
-        sat_solver.append_formula(self.cnf_formula)
+            sat_solver = solvers.Solver(name=self.sat_solver_name, bootstrap_with=self.cnf_formula)
+        try:
+            return self._solve(sat_solver)
+        finally:
+            sat_solver.delete()
+            self.sat_solver = None
+
+    def supports_time_limit(self):
+        """
+        Regarding time_limit: Note that only MiniSat-like solvers support this
+        functionality (e.g. Cadical and Lingeling do not support it).
+        """
+
+        no_timelimit_solvers = set()
+        for name in ('cadical103', 'cadical153', 'cadical195', 'lingeling'):
+            no_timelimit_solvers.update(getattr(solvers.SolverNames, name, ()))
+        return self.sat_solver_name not in no_timelimit_solvers
+
+    def _solve_limited(self, sat_solver, assumptions=[], time_limit=-1):
+        """
+        Solve under the given assumptions, interrupting the solver after
+        time_limit seconds (-1: no limit).  Returns True, False or None.
+        """
+
+        if time_limit != -1:
+            if not self.supports_time_limit():
+                print('time_limit is not supported for the chosen sat solver ... ')
+                return sat_solver.solve(assumptions=assumptions)
+            timer = Timer(time_limit, self.interrupt, [sat_solver])
+            timer.start()
+            try:
+                return sat_solver.solve_limited(assumptions=assumptions, expect_interrupt=True)
+            finally:
+                timer.cancel()
+                sat_solver.clear_interrupt()
+        return sat_solver.solve(assumptions=assumptions)
+
+    def _solve(self, sat_solver):
         print('-' * 60)
         print('SOLVING')
         print('-' * 60)
+        self.apply_hint(sat_solver)
         start_time = time.time()
-        # Regarding time_limit: Note that only MiniSat-like solvers support this functionality (e.g. Cadical and Lingeling do not
-        # support it).
-        _no_timelimit_solvers = set()
-        for _sn in ('cadical103', 'cadical153', 'cadical195', 'lingeling'):
-            _no_timelimit_solvers.update(getattr(solvers.SolverNames, _sn, ()))
-        if self.time_limit != -1:
-            if self.sat_solver_name in _no_timelimit_solvers:
-                print('time_limit is not supported for the chosen sat solver ... ')
-                result = sat_solver.solve()
-            else:
-                timer = Timer(self.time_limit, self.interrupt, [sat_solver])
-                timer.start()
-                result = sat_solver.solve_limited(expect_interrupt=True)
-        else:
-            result = sat_solver.solve()
+        result = self._solve_limited(sat_solver, time_limit=self.time_limit)
         elapsed_time = time.time() - start_time
         print('Solving finished in %0.2f seconds' % elapsed_time)
         if result == True:
             self.satsolver_solution = sat_solver.get_model()
-            self.solutions = [0]*(self.max_steps + 1)
-            for step in range(self.max_steps + 1):
-                state_vars = [step_var(v, step) for v in self.variables]
-                state_values = list(
-                    map(lambda x: int(self.satsolver_solution[self.variables_dictionary[x] - 1] > 0),
-                        [st_var for st_var in state_vars]))
-                self.solutions[step] = dict(zip(state_vars, state_values))
+            self.extract_solution(self.satsolver_solution)
             parse_solver_solution(self)
             if self.draw_graph:
                 draw_graph(self.vertices, self.edges, self.known_variables, self.guessed_vars,\
@@ -381,4 +525,87 @@ class ReduceGDtoSAT:
             print('The solver was interrupted before finding any solution.')
             print('=' * 60)
             return None
-        sat_solver.delete()
+
+    def deepen(self):
+        """
+        Incremental bounded model checking over the number of steps.
+
+        The step layers are added one at a time to a single SAT solver, and
+        the target variables being known at the current depth is passed as
+        assumptions, so that the clauses learned at smaller depths are kept.
+        max_steps is only an upper bound here: the smallest depth at which
+        max_guess guesses suffice is returned (None if there is none, or
+        on timeout), and self.max_steps is set to it.
+        """
+
+        system = self.system
+        upper_bound = self.max_steps
+        # The targets of a given depth are assumptions, so only the forward
+        # part of the cone of influence is valid for all depths
+        self.cone = system.cone_of_influence(upper_bound, prune=self.cone.prune, backward=False)
+        print('=' * 60)
+        print('SAT SOLVER (deepening) — %s' % self.problem_name)
+        print('=' * 60)
+        print('Variables: %d | Relations: %d' % (self.num_of_vars, self.num_of_relations))
+        print('Max guess: %d | Max steps: at most %d' % (self.max_guess, upper_bound))
+        print('Solver: %s' % self.sat_solver_name)
+        if self.warm_start is not None:
+            print(self.warm_start.summary())
+        print('-' * 60)
+        sat_solver = self.sat_solver
+        if sat_solver is None:
+            sat_solver = solvers.Solver(name=self.sat_solver_name, bootstrap_with=self.cnf_formula)
+        self.sat_solver = sat_solver
+        self.apply_hint(sat_solver)
+        # The target conditions are replaced by assumptions
+        self.generate_initial_conditions()
+        self.generate_cardinality_constraint()
+        start_time = time.time()
+        deadline = start_time + self.time_limit if self.time_limit != -1 else None
+        result = False
+        depth = max([self.cone.first[v] for v in system.targets], default=0)
+        print('Smallest depth allowed by the relations: %d' % depth)
+        if depth > 0:
+            for chunk in self.iter_step_clauses(0, min(depth, upper_bound)):
+                self.add_clauses(chunk)
+        try:
+            while depth <= upper_bound:
+                assumptions = [system.state_id(v, depth) for v in system.targets]
+                time_limit = -1 if deadline is None else max(0, deadline - time.time())
+                iter_start = time.time()
+                result = self._solve_limited(sat_solver, assumptions, time_limit)
+                print('  max_steps = %3d:  %s  (%0.2fs)' % (
+                    depth, {True: 'SAT', False: 'UNSAT', None: 'TIMEOUT'}[result], time.time() - iter_start))
+                if result is not False or depth == upper_bound:
+                    break
+                # Add the next layer
+                for chunk in self.iter_step_clauses(depth, depth + 1):
+                    self.add_clauses(chunk)
+                depth += 1
+            elapsed_time = time.time() - start_time
+            print('Deepening finished in %0.2f seconds' % elapsed_time)
+            if result is True:
+                self.max_steps = depth
+                print('\n' + '#' * 60)
+                print('DEEPEN RESULT: smallest number of steps = %d' % depth)
+                print('#' * 60)
+                self.satsolver_solution = sat_solver.get_model()
+                self.extract_solution(self.satsolver_solution)
+                parse_solver_solution(self)
+                if self.draw_graph:
+                    draw_graph(self.vertices, self.edges, self.known_variables, self.guessed_vars,\
+                        self.output_dir, self.tikz, self.dglayout)
+                return depth
+            print('\n' + '=' * 60)
+            if result is False:
+                print('RESULT: UNSATISFIABLE')
+                print('max_guess = %d is not enough for up to %d steps.' % (self.max_guess, upper_bound))
+                print('Increase max_guess or max_steps and try again.')
+            else:
+                print('RESULT: TIMEOUT')
+                print('The solver was interrupted at max_steps = %d.' % depth)
+            print('=' * 60)
+            return None
+        finally:
+            sat_solver.delete()
+            self.sat_solver = None
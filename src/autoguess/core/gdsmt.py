@@ -24,6 +24,7 @@ from autoguess.config import TEMP_DIR
 import os
 import time
 import random
+from threading import Timer
 
 # Compatibility shim: newer pyboolector (>=3.2.4) moved BTOR_OPT_*
 # constants into BtorOption enum, but pySMT still references them as
@@ -37,12 +38,12 @@ try:
 except ImportError:
     pass  # pyboolector not installed; btor solver simply won't be available
 
-from pysmt.shortcuts import TRUE, Symbol, BVAdd, BVAnd, BVOr, BVMul, BVULE, BVZExt, Solver, types, BV, Equals, write_smtlib
+from pysmt.shortcuts import TRUE, Symbol, Implies, BVAdd, BVAnd, BVOr, BVMul, BVULE, BVZExt, Solver, types, BV, Equals, write_smtlib
+from pysmt.exceptions import SolverReturnedUnknownResultError
 from math import ceil, log2
-from .inputparser import read_relation_file
+from .compiledsystem import compile_relation_system
 from .parsesolution import parse_solver_solution
 from .graphdrawer import draw_graph
-from .varnames import step_var, path_var
 
 class ReduceGDtoSMT:
     """
@@ -56,12 +57,14 @@ class ReduceGDtoSMT:
     inputfile_name: The name of a text file containing the relations
     max_guess:  The maximum number of guessed variables
     max_steps:  Number of state copies
+    prune:      If True (default), only the cone of influence of the target
+                variables is encoded (see ConeOfInfluence)
     """
 
     count = 0
 
     def __init__(self, inputfile_name=None, outputfile_name='output', max_guess=0, max_steps=0, smt_solver_name='z3',\
-        tikz=0, preprocess=1, D=1, dglayout="dot", drawgraph=True, log=0, extra_known=None):
+        tikz=0, preprocess=1, D=1, dglayout="dot", drawgraph=True, log=0, extra_known=None, system=None, prune=True):
         self.inputfile_name = inputfile_name
         self.output_dir = outputfile_name
         self.rnd_string_tmp = '%030x' % random.randrange(16**30)
@@ -88,28 +91,32 @@ class ReduceGDtoSMT:
         self.smt_solver = Solver(name=smt_solver_name, logic='QF_BV')
         self.smt_formula = TRUE()
         ###############################
-        # Read and parse the input file
-        parsed_data = read_relation_file(self.inputfile_name, preprocess=preprocess, D=D, log=self.log, extra_known=extra_known)
-        self.problem_name = parsed_data['problem_name']
-        self.variables = parsed_data['variables']
-        self.known_variables = parsed_data['known_variables']
-        self.target_variables = parsed_data['target_variables']
-        self.notguessed_variables = parsed_data['notguessed_variables']
-        self.symmetric_relations = parsed_data['symmetric_relations']
-        self.implication_relations = parsed_data['implication_relations']
-        self.dummy_mapping = parsed_data.get('dummy_mapping', {})
-        self.num_of_relations = len(
-            self.symmetric_relations) + len(self.implication_relations)
-        self.num_of_vars = len(self.variables)
+        # Read, parse and compile the input file (unless a compiled system is shared)
+        if system is None:
+            system = compile_relation_system(self.inputfile_name, preprocess=preprocess, D=D, log=self.log, extra_known=extra_known)
+        self.system = system
+        self.problem_name = system.problem_name
+        self.variables = system.variables
+        self.known_variables = system.known_variables
+        self.target_variables = system.target_variables
+        self.notguessed_variables = system.notguessed_variables
+        self.symmetric_relations = system.symmetric_relations
+        self.implication_relations = system.implication_relations
+        self.dummy_mapping = system.dummy_mapping
+        self.num_of_relations = system.num_of_relations
+        self.num_of_vars = system.num_of_vars
+        self.cone = system.cone_of_influence(self.max_steps, prune=prune)
         ###############################        
         if self.max_guess > self.num_of_vars:
             self.max_guess = self.num_of_vars
             print('Number of guessed variables is at most: %d' %
                   self.num_of_vars)
-        self.deductions = self.generate_possible_deductions()
+        # Symbols are keyed by the integer ids of the compiled system
         self.variables_dictionary = dict()
         self.time_limit = -1
         self.tikz = tikz
+        # Selector literal of each bound given to solve_with_bound
+        self.bound_selectors = dict()
 
     def ordered_set(self, seq):
         """
@@ -120,42 +127,15 @@ class ReduceGDtoSMT:
         seen_add = seen.add
         return [x for x in seq if not (x in seen or seen_add(x))]
 
-    def generate_possible_deductions(self):
+    def symbol(self, var_id):
         """
-        This method generates all possible deductions 
-
-        Core idea of information propagation: 
-            If there is a relation in which all terms are known except one, 
-            then the value of the last term can be determined as well. 
+        Return the BV1 symbol of the given integer id, creating it on first use
         """
-        # Build inverted indices for O(1) lookup instead of O(|R|) scan per variable
-        from collections import defaultdict
-        sym_index = defaultdict(list)
-        for rel in self.symmetric_relations:
-            for v in rel:
-                sym_index[v].append(rel)
-        impl_index = defaultdict(list)
-        for rel in self.implication_relations:
-            impl_index[rel[-1]].append(rel)
-
-        possible_deductions = {}
-        for v in self.variables:
-            possible_deductions[v] = [[v]]
-            for rel in sym_index.get(v, []):
-                temp = rel.copy()
-                temp.remove(v)
-                possible_deductions[v].append(temp)
-            for rel in impl_index.get(v, []):
-                temp = rel.copy()
-                temp.remove(v)
-                possible_deductions[v].append(temp)
-        return possible_deductions
-
-    def update_variables_dictionary(self, varlist):
-        for v in varlist:
-            if v not in self.variables_dictionary.keys():
-                self.variables_dictionary[v] = Symbol(
-                    name=v, typename=types.BV1)
+        sym = self.variables_dictionary.get(var_id)
+        if sym is None:
+            sym = Symbol(name='b%d' % var_id, typename=types.BV1)
+            self.variables_dictionary[var_id] = sym
+        return sym
 
     def generate_initial_conditions(self):
         """
@@ -164,39 +144,64 @@ class ReduceGDtoSMT:
         known variables in the initial state
         """
 
-        _known_set = set(self.known_variables)
-        initial_state_vars = [step_var(
-            v, 0) for v in self.variables if v not in _known_set]
-        if initial_state_vars != []:
-            self.update_variables_dictionary(initial_state_vars)
-            bv_length = ceil(log2(len(initial_state_vars))) + 1
-            sum = BV(0, width=bv_length)
-            for iv in initial_state_vars:
-                sum = BVAdd(sum, BVZExt(
-                    self.variables_dictionary[iv], bv_length - 1))
-            clause = BVULE(sum, BV(self.max_guess, width=bv_length))
+        self.generate_cardinality_constraint()
+        self.generate_boundary_conditions()
+
+    def guess_bound(self, bound):
+        """
+        Return the assertion sum(guessed variables at step 0) <= bound, or
+        None if it holds anyway
+        """
+
+        system = self.system
+        initial_state_vars = [self.symbol(system.state_id(v, 0)) for v in self.cone.guess_candidates]
+        if bound >= len(initial_state_vars):
+            return None
+        bv_length = ceil(log2(len(initial_state_vars))) + 1
+        sum = BV(0, width=bv_length)
+        for iv in initial_state_vars:
+            sum = BVAdd(sum, BVZExt(iv, bv_length - 1))
+        return BVULE(sum, BV(bound, width=bv_length))
+
+    def generate_cardinality_constraint(self):
+        """
+        At most max_guess variables are guessed in the initial state
+        """
+
+        clause = self.guess_bound(self.max_guess)
+        if clause is not None:
             self.smt_solver.add_assertion(clause)
             # self.smt_formula = self.smt_formula.And(clause)
 
-        final_state_target_vars = [step_var(
-            v, self.max_steps) for v in self.target_variables]
-        for fv in final_state_target_vars:
-            clause = Equals(self.variables_dictionary[fv], BV(1, width=1))
+    def generate_boundary_conditions(self):
+        """
+        Targets at the last step, and known/not-guessed variables at step 0
+        """
+
+        system = self.system
+        cone = self.cone
+        for v in system.targets:
+            clause = Equals(self.symbol(system.state_id(v, self.max_steps)), BV(1, width=1))
             self.smt_solver.add_assertion(clause)
             # self.smt_formula = self.smt_formula.And(clause)
 
-        for v in self.known_variables:
-            if v != '':
-                LHS = self.variables_dictionary[step_var(v, 0)]
-                clause = Equals(LHS, BV(1, width=1))
-                self.smt_solver.add_assertion(clause)
-                # self.smt_formula = self.smt_formula.And(clause)
+        # Targets outside of the cone can never be known (the model is UNSAT)
+        for v in cone.unreachable_targets:
+            clause = Equals(self.symbol(system.state_id(v, self.max_steps)), BV(0, width=1))
+            self.smt_solver.add_assertion(clause)
+
+        for v in system.known:
+            if not cone.state_live(v, 0):
+                continue
+            clause = Equals(self.symbol(system.state_id(v, 0)), BV(1, width=1))
+            self.smt_solver.add_assertion(clause)
+            # self.smt_formula = self.smt_formula.And(clause)
             
-        for v in self.notguessed_variables:
-            if v != '':
-                LHS = self.variables_dictionary[step_var(v, 0)]
-                clause = Equals(LHS, BV(0, width=1))
-                self.smt_solver.add_assertion(clause)
+        for v in system.notguessed:
+            if not cone.state_live(v, 0):
+                continue
+            clause = Equals(self.symbol(system.state_id(v, 0)), BV(0, width=1))
+            self.smt_solver.add_assertion(clause)
 
     def generate_smt_constraints(self):
         """
@@ -204,35 +209,32 @@ class ReduceGDtoSMT:
         obtained deductions
         """
 
+        system = self.system
+        cone = self.cone
         for step in range(self.max_steps):
-            for v in self.variables:
-                v_new = step_var(v, step + 1)
-                tau = len(self.deductions[v])
-                v_path_variables = [path_var(
-                                    v, step + 1, i) for i in range(tau)]
-                self.update_variables_dictionary([v_new] + v_path_variables)
+            for v in range(system.num_of_vars):
+                if not cone.state_live(v, step + 1):
+                    continue
+                v_new = self.symbol(system.state_id(v, step + 1))
+                v_deductions = cone.live_deductions(v, step + 1)
+                v_path_variables = [self.symbol(system.path_id(d, step + 1)) for d in v_deductions]
                 #####################################-State variable constraints-#####################################
                 ######################################################################################################
                 ######################################################################################################
                 LHS = BV(0, width=1)
                 for pv in v_path_variables:
-                    LHS = BVOr(LHS, self.variables_dictionary[pv])
-                RHS = self.variables_dictionary[v_new]
-                clause = Equals(LHS, RHS)
+                    LHS = BVOr(LHS, pv)
+                clause = Equals(LHS, v_new)
                 self.smt_solver.add_assertion(clause)
                 # self.smt_formula = self.smt_formula.And(clause)
                 #####################################-Path variable constraints-######################################
                 ######################################################################################################
                 ######################################################################################################
-                for i in range(0, tau):
-                    v_connected_variables = [step_var(
-                        var, step) for var in self.deductions[v][i]]
-                    self.update_variables_dictionary(v_connected_variables)
+                for d, pv in zip(v_deductions, v_path_variables):
                     LHS = BV(1, width=1)
-                    for vc in v_connected_variables:
-                        LHS = BVAnd(LHS, self.variables_dictionary[vc])
-                    RHS = self.variables_dictionary[v_path_variables[i]]
-                    clause = Equals(LHS, RHS)
+                    for u in system.deps(d):
+                        LHS = BVAnd(LHS, self.symbol(system.state_id(u, step)))
+                    clause = Equals(LHS, pv)
                     self.smt_solver.add_assertion(clause)
                     # self.smt_formula = self.smt_formula.And(clause)
                 ######################################################################################################
@@ -249,6 +251,8 @@ class ReduceGDtoSMT:
         print('Variables: %d | Relations: %d' % (self.num_of_vars, self.num_of_relations))
         print('Max guess: %d | Max steps: %d' % (self.max_guess, self.max_steps))
         print('Solver: %s' % self.smt_solver_name)
+        if self.cone.prune:
+            print(self.cone.summary())
         print('-' * 60)
         print('MODEL GENERATION')
         print('-' * 60)
@@ -263,6 +267,81 @@ class ReduceGDtoSMT:
         # write_smtlib(self.smt_formula, self.smt_file_path)
         print('SMT model generated in %0.2f seconds' % elapsed_time)
 
+    def make_incremental_model(self):
+        """
+        Assert everything but the bound on the number of guesses, which is
+        given to each call of solve_with_bound instead.  The solver, and the
+        lemmas it has learned, are shared by all the bounds.
+        """
+
+        self.generate_smt_constraints()
+        self.generate_boundary_conditions()
+
+    def bound_selector(self, bound):
+        """
+        Return a Boolean selector implying the bound
+        sum(guessed variables) <= bound, or None if the bound holds anyway.
+        The implication is asserted once per bound; the selector itself is
+        only ever assumed.
+        """
+
+        if bound not in self.bound_selectors:
+            clause = self.guess_bound(bound)
+            selector = None
+            if clause is not None:
+                selector = Symbol('guess_bound_%d' % bound)
+                self.smt_solver.add_assertion(Implies(selector, clause))
+            self.bound_selectors[bound] = selector
+        return self.bound_selectors[bound]
+
+    def solve_with_bound(self, bound, time_limit=-1):
+        """
+        Check the model of make_incremental_model under the bound
+        sum(guessed variables) <= bound, given as an assumed selector literal
+        so that nothing has to be retracted afterwards.  Returns (result,
+        number of guessed variables in the model, or None), where result is
+        None if the solver was interrupted after time_limit seconds
+        """
+
+        # pySMT hands literal assumptions straight to the solver, whereas a
+        # bit-vector term would be pushed and popped around the check
+        selector = self.bound_selector(bound)
+        result = self._solve_limited([selector] if selector is not None else [], time_limit)
+        n_guessed = None
+        if result:
+            system = self.system
+            # One model for all the lookups (the solver's get_py_value asks
+            # Z3 for a fresh model on every call)
+            model = self.smt_solver.get_model()
+            n_guessed = sum(model.get_py_value(self.symbol(system.state_id(v, 0)))
+                            for v in self.cone.guess_candidates)
+        return result, n_guessed
+
+    def interrupt(self, s):
+        s.interrupt()
+
+    def _solve_limited(self, assumptions=[], time_limit=-1):
+        """
+        Solve under the given assumptions, interrupting the solver after
+        time_limit seconds (-1: no limit).  Returns True, False or None.
+        """
+
+        if time_limit != -1:
+            # Only Z3 exposes an interrupt through pySMT
+            native_solver = getattr(self.smt_solver, 'z3', None)
+            if native_solver is None:
+                print('time_limit is not supported for the chosen smt solver ... ')
+                return self.smt_solver.solve(assumptions)
+            timer = Timer(time_limit, self.interrupt, [native_solver])
+            timer.start()
+            try:
+                return self.smt_solver.solve(assumptions)
+            except SolverReturnedUnknownResultError:
+                return None
+            finally:
+                timer.cancel()
+        return self.smt_solver.solve(assumptions)
+
     def solve_via_smtsolver(self):
         """
         This method the chosen SMT solver to solve the generated SMT problem
@@ -278,11 +357,7 @@ class ReduceGDtoSMT:
         start_time = time.time()
         ##########################
         ##########################
-        if self.time_limit != -1:
-            print('Time limit is not currently supported by PySMT.')
-            result = self.smt_solver.check_sat()
-        else:
-            result = self.smt_solver.check_sat()
+        result = self._solve_limited(time_limit=self.time_limit)
         #temp = read_smtlib(self.smt_file_path)
         #result = is_sat(temp)
         ##########################
@@ -294,15 +369,11 @@ class ReduceGDtoSMT:
         if result == True:
             # Extract the solution
             self.smt_solver_model = self.smt_solver.get_model()
-            self.solutions = [0]*(self.max_steps + 1)
-            for step in range(self.max_steps + 1):
-                state_vars = [step_var(v, step) for v in self.variables]
-                temp = list(
-                    map(lambda vx: self.variables_dictionary[vx], state_vars))
-                state_values = list(
-                    map(lambda vx: self.smt_solver.get_py_value(vx), temp))
-                # state_values = list(map(lambda vx: self.smt_solver_model.get_py_value(vx), temp))
-                self.solutions[step] = dict(zip(state_vars, state_values))
+            system = self.system
+            cone = self.cone
+            initial_values = [self.smt_solver_model.get_py_value(self.symbol(system.state_id(v, 0)))
+                              if cone.state_live(v, 0) else 0 for v in range(system.num_of_vars)]
+            self.solutions = system.solution_from_initial(cone.initial_values(initial_values), self.max_steps)
             parse_solver_solution(self)
             if self.draw_graph:
                 draw_graph(self.vertices, self.edges, self.known_variables, self.guessed_vars,\
@@ -25,13 +25,12 @@ import time
 from pysat import solvers
 from pysat import formula
 import random
-from .inputparser import read_relation_file
+from .compiledsystem import compile_relation_system
 from threading import Timer
 import z3
 from .parsesolution import parse_solver_solution
 from .graphdrawer import draw_graph
 from autoguess.config import TEMP_DIR
-from .varnames import step_var, path_var
 
 
 class ReduceGDtoZ3SMT:
@@ -50,7 +49,7 @@ class ReduceGDtoZ3SMT:
     count = 0
 
     def __init__(self, inputfile_name=None, outputfile_name='output', max_guess=0, max_steps=0, sat_solver='cadical',\
-        tikz=0, preprocess=1, D=2, dglayout="dot", drawgraph=True, log=0, extra_known=None):
+        tikz=0, preprocess=1, D=2, dglayout="dot", drawgraph=True, log=0, extra_known=None, system=None):
         self.inputfile_name = inputfile_name
         self.output_dir = outputfile_name
         self.rnd_string_tmp = '%030x' % random.randrange(16**30)
@@ -64,21 +63,21 @@ class ReduceGDtoZ3SMT:
         self.draw_graph = drawgraph
         self.log = log
         ###############################
-        # Read and parse the input file
-        parsed_data = read_relation_file(self.inputfile_name, preprocess=preprocess, D=D, log=self.log, extra_known=extra_known)
-        self.problem_name = parsed_data['problem_name']
-        self.variables = parsed_data['variables']
-        self.known_variables = parsed_data['known_variables']
-        self.target_variables = parsed_data['target_variables']
-        self.notguessed_variables = parsed_data['notguessed_variables']
-        self.symmetric_relations = parsed_data['symmetric_relations']
-        self.implication_relations = parsed_data['implication_relations']
-        self.dummy_mapping = parsed_data.get('dummy_mapping', {})
-        self.num_of_relations = len(
-            self.symmetric_relations) + len(self.implication_relations)
-        self.num_of_vars = len(self.variables)
+        # Read, parse and compile the input file (unless a compiled system is shared)
+        if system is None:
+            system = compile_relation_system(self.inputfile_name, preprocess=preprocess, D=D, log=self.log, extra_known=extra_known)
+        self.system = system
+        self.problem_name = system.problem_name
+        self.variables = system.variables
+        self.known_variables = system.known_variables
+        self.target_variables = system.target_variables
+        self.notguessed_variables = system.notguessed_variables
+        self.symmetric_relations = system.symmetric_relations
+        self.implication_relations = system.implication_relations
+        self.dummy_mapping = system.dummy_mapping
+        self.num_of_relations = system.num_of_relations
+        self.num_of_vars = system.num_of_vars
         ###############################
-        self.deductions = self.generate_possible_deductions()
         self.solver = z3.Solver()
         self.time_limit = -1
         self.tikz = tikz
@@ -92,36 +91,12 @@ class ReduceGDtoZ3SMT:
         seen_add = seen.add
         return [x for x in seq if not (x in seen or seen_add(x))]
 
-    def generate_possible_deductions(self):
+    @staticmethod
+    def z3_name(var_id):
         """
-        This method generates all possible deductions 
-
-        Core idea of information propagation: 
-            If there is a relation in which all terms are known except one, 
-            then the value of the last term can be determined as well. 
+        Z3 identifier of the given integer id of the compiled system
         """
-        # Build inverted indices for O(1) lookup instead of O(|R|) scan per variable
-        from collections import defaultdict
-        sym_index = defaultdict(list)
-        for rel in self.symmetric_relations:
-            for v in rel:
-                sym_index[v].append(rel)
-        impl_index = defaultdict(list)
-        for rel in self.implication_relations:
-            impl_index[rel[-1]].append(rel)
-
-        possible_deductions = {}
-        for v in self.variables:
-            possible_deductions[v] = [[v]]
-            for rel in sym_index.get(v, []):
-                temp = rel.copy()
-                temp.remove(v)
-                possible_deductions[v].append(temp)
-            for rel in impl_index.get(v, []):
-                temp = rel.copy()
-                temp.remove(v)
-                possible_deductions[v].append(temp)
-        return possible_deductions
+        return 'b%d' % var_id
 
     def generate_initial_conditions(self):
         """
@@ -129,53 +104,39 @@ class ReduceGDtoZ3SMT:
         constrains corresponding to the maximum number of guessed, and 
         known variables in the initial state
         """
-        # initial_state_vars = list(map(z3.Bool, ['%s_%d' % (
-        #     v, 0) for v in self.variables if v not in self.known_variables]))
-        # self.solver.add(z3.Sum([z3.If(initial_state_vars[i], 1, 0)
-        #                     for i in range(len(initial_state_vars))]) <= self.max_guess)
-        _known_set = set(self.known_variables)
-        initial_state_vars = list(map(lambda x: (z3.Bool(x), 1), [step_var(
-            v, 0) for v in self.variables if v not in _known_set]))
+        system = self.system
+        initial_state_vars = [(z3.Bool(self.z3_name(system.state_id(v, 0))), 1) for v in system.unknown_init]
         if initial_state_vars != []:
-            self.solver.add(z3.PbLe([initial_state_vars[i] for i in range(
-                len(initial_state_vars))], self.max_guess))
+            self.solver.add(z3.PbLe(initial_state_vars, self.max_guess))
 
-        final_state_target_vars = list(
-            map(z3.Bool, [step_var(v, self.max_steps) for v in self.target_variables]))
+        final_state_target_vars = [z3.Bool(self.z3_name(system.state_id(v, self.max_steps))) for v in system.targets]
         self.solver.add(z3.And(final_state_target_vars) == True)
-        for v in self.known_variables:
-            if v != '':
-                self.solver.add(z3.Bool(step_var(v, 0)) == True)
-        for v in self.notguessed_variables:
-            if v != '':
-                self.solver.add(z3.Bool(step_var(v, 0)) == False)
+        for v in system.known:
+            self.solver.add(z3.Bool(self.z3_name(system.state_id(v, 0))) == True)
+        for v in system.notguessed:
+            self.solver.add(z3.Bool(self.z3_name(system.state_id(v, 0))) == False)
 
     def generate_smt_constraints(self):
         """
         This method generates the smt constraints corresponding to the 
         obtained deductions
         """
+        system = self.system
         for step in range(self.max_steps):
-            for v in self.variables:
-                v_new = step_var(v, step + 1)
-                tau = len(self.deductions[v])
-                v_path_variables = [path_var(
-                                    v, step + 1, i) for i in range(tau)]
+            for v in range(system.num_of_vars):
+                v_new = z3.Bool(self.z3_name(system.state_id(v, step + 1)))
+                v_deductions = system.deductions_of(v)
+                v_path_variables = [z3.Bool(self.z3_name(system.path_id(d, step + 1))) for d in v_deductions]
                 #####################################-State variable constraints-#####################################
                 ######################################################################################################
                 ######################################################################################################
-                LHS = z3.Or(list(map(z3.Bool, v_path_variables)))
-                RHS = z3.Bool(v_new)
-                self.solver.add(LHS == RHS)
+                self.solver.add(z3.Or(v_path_variables) == v_new)
                 #####################################-Path variable constraints-######################################
                 ######################################################################################################
                 ######################################################################################################
-                for i in range(0, tau):
-                    v_connected_variables = list(
-                        map(z3.Bool, [step_var(var, step) for var in self.deductions[v][i]]))
-                    LHS = z3.And(v_connected_variables)
-                    RHS = z3.Bool(v_path_variables[i])
-                    self.solver.add(LHS == RHS)
+                for d, pv in zip(v_deductions, v_path_variables):
+                    v_connected_variables = [z3.Bool(self.z3_name(system.state_id(u, step))) for u in system.deps(d)]
+                    self.solver.add(z3.And(v_connected_variables) == pv)
                 ######################################################################################################
                 ######################################################################################################
                 ######################################################################################################
@@ -302,13 +263,11 @@ class ReduceGDtoZ3SMT:
         print('Time used by SAT solver: %0.2f seconds' % elapsed_time)
         if result == True:
             self.satsolver_solution = sat_solver.get_model()
-            self.solutions = [0]*(self.max_steps + 1)
-            for step in range(self.max_steps + 1):
-                state_vars = [step_var(v, step) for v in self.variables]
-                state_values = list(
-                    map(lambda x: int(self.satsolver_solution[self.dimacs_vars_dict[x] - 1] > 0),
-                        [st_var for st_var in state_vars]))
-                self.solutions[step] = dict(zip(state_vars, state_values))
+            system = self.system
+            self.solutions = system.solution_from_values(
+                lambda step: [int(self.satsolver_solution[self.dimacs_vars_dict[self.z3_name(system.state_id(v, step))] - 1] > 0)
+                              for v in range(system.num_of_vars)],
+                self.max_steps)
             parse_solver_solution(self)
             if self.draw_graph:
                 draw_graph(self.vertices, self.edges, self.known_variables, self.guessed_vars,\
@@ -352,14 +311,11 @@ class ReduceGDtoZ3SMT:
             # self.solution = self.solver.model()
             # Extract the solution
             self.solver_model = self.solver.model()
-            self.solutions = [0]*(self.max_steps + 1)
-            for step in range(self.max_steps + 1):
-                state_vars = [step_var(v, step) for v in self.variables]
-                z3_state_vars = list(
-                    map(z3.Bool, [step_var(v, step) for v in self.variables]))
-                state_values = list(
-                    map(int, [z3.is_true(self.solver_model[st_var]) for st_var in z3_state_vars]))
-                self.solutions[step] = dict(zip(state_vars, state_values))
+            system = self.system
+            self.solutions = system.solution_from_values(
+                lambda step: [int(z3.is_true(self.solver_model[z3.Bool(self.z3_name(system.state_id(v, step)))]))
+                              for v in range(system.num_of_vars)],
+                self.max_steps)
             parse_solver_solution(self)
             if self.draw_graph:
                 draw_graph(self.vertices, self.edges, self.known_variables, self.guessed_vars,\
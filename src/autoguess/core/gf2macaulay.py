@@ -0,0 +1,586 @@
+'''
+Created on Oct 18, 2026
+
+@author: Hosein Hadipour
+@contact: hsn.hadipour@gmail.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+In case you use this tool please include the above copyright informations (name, contact, license)
+
+Macaulay matrix preprocessing over GF(2) with NumPy, for systems without Sage
+'''
+
+import itertools
+import math
+import sys
+import time
+from datetime import datetime
+from argparse import ArgumentParser, RawTextHelpFormatter
+import numpy as np
+from autoguess.config import MACAULAY_MEMORY_LIMIT
+
+# Number of nonzero entries of the Macaulay matrix per chunk of rows
+CHUNK_SIZE = 1 << 20
+# Below this density, structured elimination is faster than M4RI on the
+# whole matrix (the sparse pivots cause little fill-in)
+SPARSE_DENSITY = 0.005
+
+
+def parse_polynomial(string_polynomial, var_index):
+    """
+    Parses a Boolean polynomial given in string format, e.g. 'x1*x2 + x3 + 1',
+    into the set of its monomials.  A monomial is encoded as an integer whose
+    bit i is set if the i-th variable divides it (so 0 is the constant 1), and
+    var_index maps the variable names to their indices (new names are added
+    to it).  Terms which appear an even number of times cancel out, and
+    x^2 = x as in the Boolean polynomial ring.
+    """
+
+    monomials = set()
+    for term in string_polynomial.replace('-', '+').split('+'):
+        term = term.strip()
+        if term == '':
+            continue
+        monomial = 0
+        coefficient = 1
+        for factor in term.split('*'):
+            factor = factor.strip()
+            if factor == '':
+                # The exponent of x**2 (or x^2) is irrelevant over GF(2)
+                continue
+            factor = factor.split('^')[0].strip()
+            if factor.isdigit():
+                coefficient *= int(factor)
+                continue
+            if factor not in var_index:
+                var_index[factor] = len(var_index)
+            monomial |= 1 << var_index[factor]
+        if coefficient % 2 == 1:
+            monomials ^= {monomial}
+    return monomials
+
+
+def monomial_degree(monomial):
+    return bin(monomial).count('1')
+
+
+def polynomial_degree(polynomial):
+    return max(map(monomial_degree, polynomial)) if polynomial else -1
+
+
+class Macaulay:
+    """
+    Macaulay
+    A Sage-free implementation of the Macaulay preprocessing over GF(2), with
+    the same interface and output as the class of macaulay.py.  Given a set
+    of Boolean polynomials, a positive integer D and a monomial ordering:
+    1- The rows of the Macaulay matrix of degree D are generated in chunks
+       and stored sparsely.  Duplicated rows are removed on the fly, and the
+       rows which are linear combinations of other rows by one of the
+       identities f*f = f and f_i*f_j = f_j*f_i of the Boolean ring (the
+       F5 criteria) are not generated at all
+    2- Its reduced row echelon form is computed by the method of four
+       Russians (M4RI) on a bit-packed copy (one bit per monomial, 64
+       monomials per uint64 word), unless the matrix is very sparse or does
+       not fit into the memory budget.  Then structured elimination is used:
+       the rows with distinct leading monomials are used as sparse pivots
+       first, and only the remaining rows (the dense core) are bit-packed
+       and reduced by M4RI
+
+    The columns are sorted in decreasing order of the monomials, so that the
+    derived polynomials are the same as the ones of Sage, up to the order of
+    the variables (which are sorted by name here).
+
+    memory_limit:   Memory budget of the elimination in bytes (by default
+                    $AUTOGUESS_MACAULAY_MEMORY_MB)
+    """
+
+    count = 0
+
+    def __init__(self, inputfile=None, outputfile=None, D=2, term_ordering='deglex', polynomials=None,
+                 memory_limit=None):
+        Macaulay.count += 1
+        self.inputfile = inputfile
+        self.outputfile = outputfile
+        self.D = D
+        if term_ordering not in ['deglex', 'degrevlex']:
+            raise ValueError('Unsupported term ordering: %s' % term_ordering)
+        self.term_ordering = term_ordering
+        self.memory_limit = memory_limit if memory_limit is not None else MACAULAY_MEMORY_LIMIT
+        self.algebrize_input_polynomials(polynomials)
+
+    def algebrize_input_polynomials(self, string_polynomials=None):
+        """
+        Converts the given polynomials in string format to sets of monomials
+        """
+        if string_polynomials is None:
+            try:
+                with open(self.inputfile, 'r') as equations_file:
+                    string_polynomials = equations_file.read().splitlines()
+            except IOError:
+                print('%s is not accessible!' % self.inputfile)
+                sys.exit()
+        var_index = {}
+        polynomials = [parse_polynomial(poly, var_index) for poly in string_polynomials if poly.strip()]
+        # Renumber the variables in the order of their names
+        self.variables = sorted(var_index)
+        renumber = [0] * len(var_index)
+        for i, name in enumerate(self.variables):
+            renumber[var_index[name]] = i
+        self.polynomial_sequence = []
+        for poly in polynomials:
+            renumbered = set()
+            for monomial in poly:
+                new_monomial = 0
+                while monomial:
+                    low = monomial & -monomial
+                    new_monomial |= 1 << renumber[low.bit_length() - 1]
+                    monomial ^= low
+                renumbered.add(new_monomial)
+            if renumbered:
+                self.polynomial_sequence.append(renumbered)
+
+    def monomial_key(self, monomial):
+        """
+        Sorting key of the monomials: a larger key means a larger monomial
+        with respect to the term ordering
+        """
+        nvars = len(self.variables)
+        if self.term_ordering == 'deglex':
+            # Lexicographic on the exponent vectors, the first variable being the most significant
+            reversed_bits = int(format(monomial, '0%db' % nvars)[::-1], 2) if nvars else 0
+            return (monomial_degree(monomial), reversed_bits)
+        # degrevlex: the smaller exponent of the last differing variable wins
+        return (monomial_degree(monomial), -monomial)
+
+    def multiplier_monomials(self, degree):
+        """
+        All monomials of degree at most degree, to multiply the polynomials with
+        """
+        nvars = len(self.variables)
+        for e in range(min(degree, nvars) + 1):
+            for subset in itertools.combinations(range(nvars), e):
+                yield sum(1 << i for i in subset)
+
+    def macaulay_rows(self, multiply):
+        """
+        Generates the rows of the Macaulay matrix as sets of monomials.  With
+        multiply, every polynomial f of degree d < D is multiplied by the
+        monomials of degree at most D - d, except the monomials m for which
+        m*f is a linear combination of rows with smaller signatures:
+        - m is divisible by the leading monomial of f, since then m*f = m*f*f
+          (f*f = f over GF(2))
+        - m is divisible by the leading monomial of a previous polynomial g,
+          since then m*f is rewritten by the Koszul syzygy f*g = g*f
+        The rows are deduplicated later, so that the row space (and thus the
+        reduced row echelon form) is exactly the one of Sage.
+        """
+        self.dropped_rows = 0
+        if not multiply:
+            yield from self.polynomial_sequence
+            return
+        degree_spectrum = sorted(set([polynomial_degree(f) for f in self.polynomial_sequence]))
+        print('Number of algebraic equations: %d' % len(self.polynomial_sequence))
+        print('Number of algebraic variables: %d' % len(self.variables))
+        print('Number of algebraic monomials: %d' % len(set().union(*self.polynomial_sequence)))
+        print('Spectrum of degrees: %s' % degree_spectrum)
+        leading_monomials = set()
+        for f in self.polynomial_sequence:
+            d = polynomial_degree(f)
+            lead = max(f, key=self.monomial_key)
+            if lead != 0:
+                leading_monomials.add(lead)
+            for m in self.multiplier_monomials(max(self.D - d, 0)):
+                if m and divisible_by_any(m, leading_monomials):
+                    self.dropped_rows += 1
+                    continue
+                product = set()
+                for monomial in f:
+                    product ^= {monomial | m}
+                if product:
+                    yield product
+
+    def build_macaulay_polynomials(self, multiply=True):
+        """
+        Constructs the (deduplicated) Macaulay polynomials with degree at most
+        D as a sparse matrix in CSR format.  The monomials get numbers in the
+        order of appearance, and the rows are stored in chunks of numpy
+        arrays, so that only one chunk is held as Python objects at a time
+        """
+        monomial_id = {}
+        seen = set()
+        indptr_chunks, ids_chunks = [], []
+        lengths, ids = [], []
+        self.generated_rows = 0
+        self.duplicated_rows = 0
+        nnz = 0
+        for product in self.macaulay_rows(multiply):
+            self.generated_rows += 1
+            row = sorted(monomial_id.setdefault(monomial, len(monomial_id)) for monomial in product)
+            key = np.array(row, dtype=np.int32).tobytes()
+            if key in seen:
+                self.duplicated_rows += 1
+                continue
+            seen.add(key)
+            lengths.append(len(row))
+            ids.extend(row)
+            if len(ids) >= CHUNK_SIZE:
+                nnz += len(ids)
+                indptr_chunks.append(np.array(lengths, dtype=np.int64))
+                ids_chunks.append(np.array(ids, dtype=np.int32))
+                lengths, ids = [], []
+                # Rows (twice: stored and deduplication keys) and monomials
+                used_memory = 8 * nnz + 100 * len(monomial_id)
+                if used_memory > self.memory_limit:
+                    raise MemoryError('The Macaulay matrix needs more than %0.1f MB (%d rows and %d monomials so far); '
+                                      'decrease D or increase $AUTOGUESS_MACAULAY_MEMORY_MB'
+                                      % (self.memory_limit / 2**20, len(seen), len(monomial_id)))
+        del seen
+        indptr_chunks.append(np.array(lengths, dtype=np.int64))
+        ids_chunks.append(np.array(ids, dtype=np.int32))
+        self.indptr = np.concatenate([[0], np.cumsum(np.concatenate(indptr_chunks))]).astype(np.int64)
+        self.ids = np.concatenate(ids_chunks)
+        self.monomials = list(monomial_id)
+        if multiply:
+            print('Macaulay rows: %d generated, %d skipped by the F5 criteria, %d duplicated' %
+                  (self.generated_rows + self.dropped_rows, self.dropped_rows, self.duplicated_rows))
+
+    def build_macaulay_matrix(self):
+        """
+        Generates the Macaulay matrix and reports its size before the elimination
+        """
+        multiply = bool(self.polynomial_sequence) and max(map(polynomial_degree, self.polynomial_sequence)) > 1
+        if multiply:
+            minimum_degree = min([polynomial_degree(f) for f in self.polynomial_sequence])
+            if self.D < minimum_degree:
+                self.D = minimum_degree
+        self.build_macaulay_polynomials(multiply)
+        # Columns in decreasing order of the monomials
+        order = sorted(range(len(self.monomials)), key=lambda i: self.monomial_key(self.monomials[i]), reverse=True)
+        self.macaulay_vars = [self.monomials[i] for i in order]
+        column_of_id = np.empty(len(order), dtype=np.int32)
+        column_of_id[order] = np.arange(len(order), dtype=np.int32)
+        self.nrows = len(self.indptr) - 1
+        self.ncols = len(order)
+        row_of_entry = np.repeat(np.arange(self.nrows, dtype=np.int64), np.diff(self.indptr))
+        columns = column_of_id[self.ids] if len(self.ids) else self.ids
+        entries = np.lexsort((columns, row_of_entry))
+        self.columns = columns[entries]
+        del self.ids
+        nnz = len(self.columns)
+        density = nnz / max(self.nrows * self.ncols, 1)
+        dense_memory = self.nrows * ((self.ncols + 63) // 64) * 8
+        print('Macaulay matrix: %d x %d, %d nonzero entries (density %0.4f%%), %0.1f MB if bit-packed' %
+              (self.nrows, self.ncols, nnz, 100 * density, dense_memory / 2**20))
+        self.structured = dense_memory > self.memory_limit or density < SPARSE_DENSITY
+        if not self.structured:
+            nwords = max((self.ncols + 63) // 64, 1)
+            self.macaulay_matrix = np.zeros((self.nrows, nwords), dtype=np.uint64)
+            cols = self.columns.astype(np.int64)
+            np.bitwise_or.at(self.macaulay_matrix, (row_of_entry, cols >> 6),
+                             np.left_shift(np.uint64(1), (cols & 63).astype(np.uint64)))
+            print('Macaulay matrix was generated in %d x %d bit-packed matrix over GF(2)' % (self.nrows, self.ncols))
+        else:
+            print('Macaulay matrix was generated in %d x %d sparse matrix over GF(2) '
+                  '(structured elimination)' % (self.nrows, self.ncols))
+
+    def gaussian_elimination(self):
+        """
+        Applies Gaussian elimination to compute the row reduced echelon form of the derived Macaulay matrix
+        """
+        print('Gaussian elimination was started - %s' % datetime.now())
+        start_time = time.time()
+        if self.structured:
+            self.reduced_rows, self.pivots = structured_echelonize(self.indptr, self.columns, self.memory_limit)
+            self.rank = len(self.pivots)
+        else:
+            self.rank, self.pivots = m4ri_echelonize(self.macaulay_matrix, self.ncols)
+            self.reduced_rows = None
+        elapsed_time = time.time() - start_time
+        pivots = set(self.pivots)
+        self.dependent_vars = [self.macaulay_vars[j] for j in self.pivots if self.macaulay_vars[j] != 0]
+        self.free_vars = [self.macaulay_vars[j] for j in range(self.ncols) if j not in pivots and self.macaulay_vars[j] != 0]
+        print('#Dependent variables: %d' % len(self.dependent_vars))
+        print('#Free variables: %d' % len(self.free_vars))
+        print('Gaussian elimination was finished after %0.2f seconds' % elapsed_time)
+
+    def monomial_to_string(self, monomial):
+        if monomial == 0:
+            return '1'
+        names = []
+        while monomial:
+            low = monomial & -monomial
+            names.append(self.variables[low.bit_length() - 1])
+            monomial ^= low
+        return '*'.join(names)
+
+    def reduced_polynomials(self):
+        """
+        Returns the derived polynomials (the nonzero rows of the reduced
+        Macaulay matrix) in string format
+        """
+        names = [self.monomial_to_string(monomial) for monomial in self.macaulay_vars]
+        if self.reduced_rows is not None:
+            return [" + ".join([names[j] for j in row]) for row in self.reduced_rows]
+        # Only the nonzero words are unpacked, since the reduced matrix is sparse
+        rows, words = np.nonzero(self.macaulay_matrix[:self.rank])
+        values = self.macaulay_matrix[rows, words].astype('<u8')
+        bits = np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+        entries, positions = np.nonzero(bits)
+        rows = rows[entries]
+        cols = (words[entries] * 64 + positions).tolist()
+        bounds = np.searchsorted(rows, np.arange(self.rank + 1)).tolist()
+        return [" + ".join([names[j] for j in cols[bounds[i]:bounds[i + 1]]]) for i in range(self.rank)]
+
+    def write_result(self):
+        """
+        Writes the derived polynomials into the output file
+        """
+        print('Writing the results into the %s - %s' % (self.outputfile, datetime.now()))
+        starting_time = time.time()
+        with open(self.outputfile, 'w') as outputfile:
+            outputfile.writelines(output + "\n" for output in self.reduced_polynomials())
+        elapsed_time = time.time() - starting_time
+        print('Result was written into %s after %0.02f seconds' % (self.outputfile, elapsed_time))
+
+
+def divisible_by_any(monomial, divisors):
+    """
+    Whether one of the monomials in divisors divides the given monomial; the
+    divisors are looked up among the (few) submonomials of the monomial
+    """
+    sub = monomial
+    while sub:
+        if sub in divisors:
+            return True
+        sub = (sub - 1) & monomial
+    return False
+
+
+def structured_echelonize(indptr, columns, memory_limit):
+    """
+    Computes the reduced row echelon form of the sparse matrix given in CSR
+    format (the columns of every row in increasing order), in the manner of
+    Faugere-Lachartre:
+    1- For every leading column, the sparsest row with it becomes a pivot,
+       and the pivot rows are reduced by each other (back substitution)
+    2- The other rows are reduced by the pivots, which leaves them without
+       entries in the pivot columns: they form the dense core
+    3- The core is bit-packed on its own columns and reduced by M4RI, and
+       its pivots finally reduce the pivot rows of step 1
+    Returns the rows (lists of columns) and the pivot columns, in the order
+    of the pivot columns.  Raises MemoryError if the dense core does not fit
+    into memory_limit bytes.
+    """
+    nrows = len(indptr) - 1
+    columns = columns.tolist()
+    indptr = indptr.tolist()
+    best = {}
+    for i in range(nrows):
+        start, end = indptr[i], indptr[i + 1]
+        lead = columns[start]
+        if lead not in best or end - start < indptr[best[lead] + 1] - indptr[best[lead]]:
+            best[lead] = i
+    pivot_rows = set(best.values())
+    # 1- Back substitution, from the last pivot column to the first one: the
+    # reduced pivot rows have no entries in the other pivot columns
+    reduced = {}
+    for lead in sorted(best, reverse=True):
+        i = best[lead]
+        row = set(columns[indptr[i]:indptr[i + 1]])
+        for c in [c for c in row if c in reduced]:
+            row ^= reduced[c]
+        reduced[lead] = row
+    # 2- Reduction of the other rows to the non-pivot columns
+    core = []
+    for i in range(nrows):
+        if i in pivot_rows:
+            continue
+        row_columns = columns[indptr[i]:indptr[i + 1]]
+        row = set(row_columns)
+        for c in row_columns:
+            if c in reduced:
+                row ^= reduced[c]
+        if row:
+            core.append(row)
+    # 3- Dense core
+    core_columns = sorted(set().union(*core))
+    nwords = max((len(core_columns) + 63) // 64, 1)
+    core_memory = len(core) * nwords * 8
+    print('Structured elimination: %d sparse pivots, dense core of %d x %d (%0.1f MB)' %
+          (len(reduced), len(core), len(core_columns), core_memory / 2**20))
+    if core_memory > memory_limit:
+        raise MemoryError('The dense core of the Macaulay matrix needs %0.1f MB, more than the budget of %0.1f MB; '
+                          'decrease D or increase $AUTOGUESS_MACAULAY_MEMORY_MB'
+                          % (core_memory / 2**20, memory_limit / 2**20))
+    core_pivots = {}
+    if core:
+        ncore = len(core)
+        local = {c: j for j, c in enumerate(core_columns)}
+        row_of_entry = np.fromiter(itertools.chain.from_iterable([i] * len(row) for i, row in enumerate(core)),
+                                   dtype=np.int64)
+        local_columns = np.fromiter((local[c] for row in core for c in row), dtype=np.int64)
+        del core
+        matrix = np.zeros((ncore, nwords), dtype=np.uint64)
+        np.bitwise_or.at(matrix, (row_of_entry, local_columns >> 6),
+                         np.left_shift(np.uint64(1), (local_columns & 63).astype(np.uint64)))
+        rank, pivots = m4ri_echelonize(matrix, len(core_columns))
+        rows, words = np.nonzero(matrix[:rank])
+        values = matrix[rows, words].astype('<u8')
+        bits = np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+        entries, positions = np.nonzero(bits)
+        rows = rows[entries].tolist()
+        cols = (words[entries] * 64 + positions).tolist()
+        for i, j in zip(rows, cols):
+            core_pivots.setdefault(core_columns[pivots[i]], set()).add(core_columns[j])
+    # The core rows have no entries in the pivot columns of step 1
+    for row in reduced.values():
+        for c in [c for c in row if c in core_pivots]:
+            row ^= core_pivots[c]
+    reduced.update(core_pivots)
+    pivots = sorted(reduced)
+    return [sorted(reduced[c]) for c in pivots], pivots
+
+
+def m4ri_echelonize(matrix, ncols, k=None):
+    """
+    Transforms the bit-packed matrix (in place) into its reduced row echelon
+    form over GF(2) by the method of four Russians, and returns the rank and
+    the pivot columns.  Column j is bit j % 64 of word j // 64.
+    """
+    nrows = matrix.shape[0]
+    if k is None:
+        k = min(8, max(1, int(0.75 * math.log2(max(nrows, 2)))))
+    pivots = []
+    r = 0
+    c = 0
+    while c < ncols and r < nrows:
+        # The blocks do not cross word boundaries, so that the bits of a
+        # block are read from a single word of every row
+        word, shift = c >> 6, c & 63
+        width = min(k, ncols - c, 64 - shift)
+        mask = np.uint64((1 << width) - 1)
+        # 1- Choose the pivots of the block [c, c + width) among the rows r:,
+        # using their bits in the block only
+        work = (matrix[r:, word] >> np.uint64(shift)) & mask
+        available = np.ones(len(work), dtype=bool)
+        chosen = []
+        offsets = []
+        for t in range(width):
+            bit = np.uint64(1 << t)
+            has_bit = (work & bit) != 0
+            candidates = np.flatnonzero(has_bit & available)
+            if len(candidates) == 0:
+                continue
+            i = candidates[0]
+            chosen.append(int(i))
+            offsets.append(t)
+            available[i] = False
+            has_bit[i] = False
+            work[has_bit] ^= work[i]
+        c += width
+        if not chosen:
+            continue
+        p = len(chosen)
+        # 2- Move the chosen rows to r, ..., r + p - 1 and bring them into
+        # reduced echelon form on the pivot columns of the block
+        chosen_set = set(chosen)
+        displaced = [i for i in range(p) if i not in chosen_set]
+        vacated = [i for i in chosen if i >= p]
+        sources = r + np.array(chosen + displaced, dtype=np.int64)
+        targets = r + np.array(list(range(p)) + vacated, dtype=np.int64)
+        matrix[targets] = matrix[sources]
+        pivot_rows = matrix[r:r + p]
+        for t, offset in enumerate(offsets):
+            has_bit = ((pivot_rows[:, word] >> np.uint64(shift + offset)) & np.uint64(1)) != 0
+            if not has_bit[t]:
+                s = t + int(np.flatnonzero(has_bit[t:])[0])
+                pivot_rows[[t, s]] = pivot_rows[[s, t]]
+                has_bit[[t, s]] = has_bit[[s, t]]
+            has_bit[t] = False
+            pivot_rows[has_bit] ^= pivot_rows[t]
+        # 3- Table of the 2^p combinations of the pivot rows (the rows r: are
+        # zero before column c, so only the words from the current one on
+        # matter), indexed through the bits of the block
+        table = np.zeros((1 << p, matrix.shape[1] - word), dtype=np.uint64)
+        for t in range(p):
+            table[1 << t:1 << (t + 1)] = table[:1 << t] ^ pivot_rows[t, word:]
+        patterns = np.arange(1 << width, dtype=np.int64)
+        combination = np.zeros(1 << width, dtype=np.int64)
+        for t, offset in enumerate(offsets):
+            combination |= ((patterns >> offset) & 1) << t
+        # 4- Reduce every other row with one table lookup
+        index = combination[((matrix[:, word] >> np.uint64(shift)) & mask).astype(np.int64)]
+        index[r:r + p] = 0
+        rows = np.flatnonzero(index)
+        if len(rows):
+            matrix[rows, word:] ^= table[index[rows]]
+        pivots.extend(c - width + offset for offset in offsets)
+        r += p
+    return r, pivots
+
+
+def loadparameters(args):
+    """
+    Get parameters from the argument list and inputfile.
+    """
+    params = {"inputfile": "example2.txt",
+              "outputfile": "macaulay_basis.txt",
+              "D": 2,
+              "term_ordering": 'deglex'}
+
+    if args.inputfile:
+        params["inputfile"] = args.inputfile[0]
+    if args.outputfile:
+        params["outputfile"] = args.outputfile[0]
+    if args.D:
+        params["D"] = args.D[0]
+    if args.term_ordering:
+        params["term_ordering"] = args.term_ordering[0]
+
+    return params
+
+def reduce_polynomials(polynomials, D=2, term_ordering='deglex'):
+    """
+    Computes the reduced Macaulay matrix of the given polynomials (a list of
+    strings) in memory and returns the derived polynomials as strings
+    """
+    macaulay = Macaulay(D=D, term_ordering=term_ordering, polynomials=polynomials)
+    macaulay.build_macaulay_matrix()
+    macaulay.gaussian_elimination()
+    return macaulay.reduced_polynomials()
+
+def main():
+    """
+    Parse the arguments and start the request functionality with the provided parameters.
+    """
+    parser = ArgumentParser(description="This tool computes the Macaulay matrix with degree D,"
+                                        " given a system of boolean polynomials and"
+                                        " a positive integer D, without Sage",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument('-i', '--inputfile', nargs=1, help="Use an input file in plaintext format to read the relations from.")
+    parser.add_argument('-o', '--outputfile', nargs=1, help="Use an output file to write the output into it.")
+    parser.add_argument('-D', '--D', nargs=1, type=int, help="A positive integer as the degree of Macaulay matrix.")
+    parser.add_argument('-t', '--term_ordering', nargs=1, type=str, help="A term ordering such as deglex or degrevlex.")
+
+    args = parser.parse_args()
+    params = loadparameters(args)
+    macaulay = Macaulay(inputfile=params['inputfile'], outputfile=params['outputfile'], D=params['D'], term_ordering=params['term_ordering'])
+    macaulay.build_macaulay_matrix()
+    macaulay.gaussian_elimination()
+    macaulay.write_result()
+
+if __name__ == '__main__':
+    main()
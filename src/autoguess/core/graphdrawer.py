@@ -21,8 +21,6 @@ In case you use this tool please include the above copyright informations (name,
 '''
 
 from random import random
-from graphviz import Digraph
-import dot2tex
 import os
 
 def draw_graph(vertices, edges, known_variables, guessed_vars, output_dir, tikz, dglayout):
@@ -31,6 +29,10 @@ def draw_graph(vertices, edges, known_variables, guessed_vars, output_dir, tikz,
     directed graph representing the determination flow
     """
 
+    # Imported here so that runs with --nograph never load Graphviz/dot2tex
+    from graphviz import Digraph
+    import dot2tex
+
     vertices = list(set(vertices))
     edges = list(set(edges))
     directed_graph = Digraph(name='DataFlow', node_attr={'shape': 'circle'})
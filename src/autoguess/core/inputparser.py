@@ -26,10 +26,9 @@ import sys
 import string
 import random
 from collections import namedtuple
-import subprocess
-from autoguess.config import PATH_SAGE, SAGE_IMPORTABLE
+from .sageworker import macaulay_basis
 from autoguess.config import TEMP_DIR
-import pathlib
+from . import relationcache
 import time
 from datetime import datetime
 
@@ -47,7 +46,10 @@ def ordered_set(seq):
 
 def read_relation_file(path, preprocess=1, D=2, log=0, extra_known=None):
     """
-    Reads a relation file in GD format and parses it into a systems of connection relations
+    Reads a relation file in GD format and parses it into a systems of connection relations.
+    Unless log != 0 (the intermediate files are wanted) or the cache is
+    disabled (--no-cache), the result is looked up in and stored into the
+    cache of relationcache, keyed by the contents of the file and the options.
     """
 
     rnd_string_tmp = '%030x' % random.randrange(16**30)
@@ -62,43 +64,41 @@ def read_relation_file(path, preprocess=1, D=2, log=0, extra_known=None):
     if contents is None:
         raise ValueError(f"File at {path} could not be read or is empty.")
     contents = contents.strip()
+    term_ordering = 'degrevlex'
+    cache_key = None
+    if log == 0 and relationcache.is_enabled():
+        cache_key = relationcache.cache_key(contents, preprocess=preprocess,
+                                            D=D if preprocess == 1 else None,
+                                            term_ordering=term_ordering if preprocess == 1 else None,
+                                            extra_known=list(extra_known or []))
+        cached = relationcache.load(cache_key)
+        if cached is not None:
+            if cached['preprocessed']:
+                print('Preprocessing (Macaulay matrix) results loaded from the cache')
+            return cached['parsed_data']
     problem_name = find_problem_name(contents)
     sections = split_contents_by_sections(remove_comments(contents))
 
     dummy_mapping = {}
     connection_relations = sections.get('connection relations', '')
     algebraic_relations = sections.get('algebraic relations', '')
-    algebraic_equations_file = os.path.join(TEMP_DIR, 'algebraic_equations_%s.txt' % rnd_string_tmp)
-    if algebraic_relations != '' and preprocess == 1:   
-        with open(algebraic_equations_file, 'w') as equations_file:
-            equations_file.write(algebraic_relations)
+    if algebraic_relations != '' and preprocess == 1:
         starting_time = time.time()
         print('-' * 60)
         print('PREPROCESSING (Macaulay matrix)')
         print('-' * 60)
-        macaulay_basis_file = os.path.join(TEMP_DIR, 'macaulay_basis_%s.txt' % rnd_string_tmp)
-        _macaulay_args = ["-i", algebraic_equations_file,
-                          "-o", macaulay_basis_file,
-                          "-t", "degrevlex",
-                          "-D", str(D)]
-        if SAGE_IMPORTABLE:
-            _macaulay_cmd = [sys.executable, "-m", "autoguess.core.macaulay"] + _macaulay_args
-        elif PATH_SAGE:
-            _macaulay_path = str(pathlib.Path(__file__).parent / "macaulay.py")
-            _macaulay_cmd = [PATH_SAGE, "-python3", _macaulay_path] + _macaulay_args
-        else:
-            print("ERROR: Preprocessing requires passagemath (pip install 'autoguess[groebner]') "
-                  "or a system SageMath installation, but neither was found.")
+        try:
+            groebner_basis = '\n'.join(macaulay_basis(algebraic_relations.split('\n'), D=D, term_ordering=term_ordering))
+        except MemoryError as error:
+            print('ERROR: %s' % error)
             sys.exit(1)
-        subprocess.call(_macaulay_cmd)
         elapsed_time = time.time() - starting_time
         print('Preprocessing finished in %0.4f seconds' % elapsed_time)
-        try:
-            with open(macaulay_basis_file, 'r') as groebner_basis_file:
-                groebner_basis = groebner_basis_file.read()
-        except IOError:
-            print(macaulay_basis_file + ' is not accessible!')
-            sys.exit()
+        if log != 0:
+            with open(os.path.join(TEMP_DIR, 'algebraic_equations_%s.txt' % rnd_string_tmp), 'w') as equations_file:
+                equations_file.write(algebraic_relations + '\n')
+            with open(os.path.join(TEMP_DIR, 'macaulay_basis_%s.txt' % rnd_string_tmp), 'w') as groebner_basis_file:
+                groebner_basis_file.write(groebner_basis + '\n')
         algebraic_relations += '\n' + groebner_basis
         # algebraic_relations = groebner_basis
         if connection_relations == '':
@@ -148,10 +148,7 @@ def read_relation_file(path, preprocess=1, D=2, log=0, extra_known=None):
                    'symmetric_relations': symmetric_relations,
                    'implication_relations': implication_relations,
                    'dummy_mapping': dummy_mapping}
-    if log == 0 and algebraic_relations != '' and preprocess == 1:
-        os.remove(algebraic_equations_file)
-        os.remove(macaulay_basis_file)
-    elif log != 0 and algebraic_relations != '' and preprocess == 1:
+    if log != 0 and algebraic_relations != '' and preprocess == 1:
         implication_relations_file = os.path.join(TEMP_DIR, f'extended_relations{rnd_string_tmp}.txt')
         with open(implication_relations_file, 'w') as file:
             file.write('--' * 20 + '\n')
@@ -175,6 +172,9 @@ def read_relation_file(path, preprocess=1, D=2, log=0, extra_known=None):
                 file.write('target weights:\n')
                 for var, weight in target_weights.items():
                     file.write(f"{var} {weight}\n")
+    if cache_key is not None:
+        relationcache.store(cache_key, {'parsed_data': parsed_data,
+                                        'preprocessed': algebraic_relations != '' and preprocess == 1})
     return parsed_data
 
 
@@ -0,0 +1,302 @@
+'''
+Created on Oct 18, 2026
+
+@author: Hosein Hadipour
+@contact: hsn.hadipour@gmail.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+In case you use this tool please include the above copyright informations (name, contact, license)
+'''
+
+import math
+import multiprocessing
+import os
+import queue
+import random
+import time
+from .compiledsystem import compile_relation_system
+from .propagate import PropagationEngine, _quickxplain
+from .parsesolution import parse_solver_solution
+from .graphdrawer import draw_graph
+
+# Used when no time limit is given: local search never proves optimality,
+# so it has to be stopped at some point
+DEFAULT_TIME_LIMIT = 10
+
+
+class LocalSearch:
+    """
+    LocalSearch
+    This class searches for small guess bases by simulated annealing over
+    the sets of guessed variables, with the closure of PropagationEngine as
+    the fitness oracle:
+
+        fitness(S) = cost(S) + penalty * (number of target variables not
+                     determined by the known variables and S)
+
+    where cost(S) is the number of guessed variables (or their total weight
+    when the input file has a weights section).  Every restart begins with
+    a random inclusion-minimal guess basis (QuickXplain over a shuffled
+    order), and a move flips a single variable: adding a variable only
+    extends the current closure incrementally, while dropping one
+    recomputes it.  Several restarts run in parallel processes, and the
+    output file is rewritten whenever the best basis improves.
+
+    Local search gives upper bounds quickly, but it can neither prove that
+    a basis is minimal nor that no basis exists.
+
+    max_steps:  The targets must be determined within max_steps steps of
+                propagation
+    threads:    Number of parallel restarts (0 = one per core)
+    """
+
+    count = 0
+
+    def __init__(self, inputfile_name=None, outputfile_name='output', max_guess=0, max_steps=0,\
+        tikz=0, preprocess=1, D=2, dglayout="dot", drawgraph=True, log=0, threads=0, extra_known=None, system=None,
+        prune=True, seed=None):
+        self.inputfile_name = inputfile_name
+        self.output_dir = outputfile_name
+        self.max_guess = max_guess
+        self.max_steps = max_steps
+        self.dglayout = dglayout
+        self.draw_graph = drawgraph
+        self.log = log
+        self.nthreads = threads if threads > 0 else (os.cpu_count() or 1)
+        self.seed = seed
+        ###############################
+        # Read, parse and compile the input file (unless a compiled system is shared)
+        if system is None:
+            system = compile_relation_system(self.inputfile_name, preprocess=preprocess, D=D, log=self.log, extra_known=extra_known)
+        self.system = system
+        self.problem_name = system.problem_name
+        self.variables = system.variables
+        self.known_variables = system.known_variables
+        self.target_variables = system.target_variables
+        self.notguessed_variables = system.notguessed_variables
+        self.symmetric_relations = system.symmetric_relations
+        self.implication_relations = system.implication_relations
+        self.dummy_mapping = system.dummy_mapping
+        self.num_of_relations = system.num_of_relations
+        self.num_of_vars = system.num_of_vars
+        ###############################
+        self.engine = None
+        self.time_limit = -1
+        self.tikz = tikz
+
+    def make_model(self):
+        """
+        This method builds the propagation engine used as the fitness oracle
+        """
+
+        system = self.system
+        print('=' * 60)
+        print('LOCAL SEARCH — %s' % self.problem_name)
+        print('=' * 60)
+        print('Variables: %d | Relations: %d' % (self.num_of_vars, self.num_of_relations))
+        print('Max steps: %d' % self.max_steps)
+        print('Method: simulated annealing (%d parallel restarts)' % self.nthreads)
+        self.engine = PropagationEngine(system.variables, system.symmetric_relations, system.implication_relations)
+        notguessed = set(system.notguessed)
+        self.candidates = [v for v in system.unknown_init if v not in notguessed]
+        self.weights = system.weights if system.weights is not None else [1] * self.num_of_vars
+        self.targets = list(system.targets)
+        # A missing target costs more than any single guess
+        self.penalty = 2 * max([self.weights[v] for v in self.candidates] + [1])
+
+    def uncovered(self, state):
+        """Number of target variables which are not known in the closure state"""
+
+        level = state.level
+        return sum(1 for v in self.targets if level[v] == -1)
+
+    def depth(self, basis):
+        """
+        Number of propagation steps needed by the basis to determine all
+        target variables, or None if it does not determine them all
+        """
+
+        level = self.engine.state(self.system.known + list(basis), record=False).level
+        if any(level[v] == -1 for v in self.targets):
+            return None
+        return max([level[v] for v in self.targets] + [0])
+
+    def is_basis(self, basis):
+        depth = self.depth(basis)
+        return depth is not None and depth <= self.max_steps
+
+    def random_basis(self, rng):
+        """A random inclusion-minimal guess basis"""
+
+        order = self.candidates[:]
+        rng.shuffle(order)
+        if self.is_basis([]):
+            return []
+        return _quickxplain(self.is_basis, [], False, order)
+
+    def anneal(self, rng, deadline, report):
+        """
+        Run restarts of simulated annealing until the deadline; report(cost,
+        basis) is called whenever the best basis of this run improves
+        """
+
+        engine = self.engine
+        known = self.system.known
+        weights = self.weights
+        penalty = self.penalty
+        best_cost = math.inf
+        iterations = max(1000, 50 * len(self.candidates))
+        while time.time() < deadline:
+            basis = set(self.random_basis(rng))
+            cost = sum(weights[v] for v in basis)
+            if cost < best_cost:
+                best_cost = cost
+                report(cost, sorted(basis))
+            state = engine.state(known + list(basis), record=False)
+            fitness = cost
+            temperature = 0.5 * penalty
+            cooling = (0.01 / temperature) ** (1.0 / iterations)
+            for it in range(iterations):
+                if it % 100 == 0 and time.time() >= deadline:
+                    break
+                level = state.level
+                if basis and rng.random() < 0.5:
+                    # Drop a guessed variable: the closure is recomputed
+                    v = rng.choice(tuple(basis))
+                    new_basis = basis - {v}
+                    new_state = engine.state(known + list(new_basis), record=False)
+                    new_cost = cost - weights[v]
+                else:
+                    # Guess one more unknown variable: the closure is extended
+                    unknown = [v for v in self.candidates if level[v] == -1]
+                    if not unknown:
+                        continue
+                    v = rng.choice(unknown)
+                    new_basis = basis | {v}
+                    new_state = state.copy()
+                    new_state.add(v)
+                    new_cost = cost + weights[v]
+                uncovered = self.uncovered(new_state)
+                new_fitness = new_cost + penalty * uncovered
+                delta = new_fitness - fitness
+                if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                    basis, state, cost, fitness = new_basis, new_state, new_cost, new_fitness
+                    if uncovered == 0 and cost < best_cost and self.is_basis(basis):
+                        best_cost = cost
+                        report(cost, sorted(basis))
+                temperature *= cooling
+
+    def write_basis(self, basis, cost, elapsed_time):
+        """
+        Write the current best basis into the output file, so that it is
+        available before the search ends
+        """
+
+        guessed = [self.variables[v] for v in basis]
+        with open(self.output_dir, 'w') as outputfile:
+            outputfile.write('Best guess basis found so far by local search (%0.2f seconds)\n' % elapsed_time)
+            outputfile.write('Number of guessed variables: %d\n' % len(guessed))
+            if self.system.weights is not None:
+                outputfile.write('Weighted number of guessed variables: %d\n' % cost)
+            outputfile.write('The following %d variable(s) are guessed:\n%s\n' % (len(guessed), ', '.join(guessed)))
+
+    def solve_via_localsearch(self):
+        """
+        This method runs the local search until the time limit.  Returns
+        True if a guess basis was found, False if the target variables
+        cannot be determined within max_steps even when every variable is
+        guessed, and None otherwise
+        """
+
+        time_limit = self.time_limit if self.time_limit != -1 else DEFAULT_TIME_LIMIT
+        print('-' * 60)
+        print('SOLVING (time limit: %d seconds)' % time_limit)
+        print('-' * 60)
+        start_time = time.time()
+        if not self.is_basis(self.candidates):
+            print('\n' + '=' * 60)
+            print('RESULT: UNSATISFIABLE')
+            print('The target variables cannot be determined within max_steps.')
+            print('Increase max_steps and try again.')
+            print('=' * 60)
+            return False
+        deadline = start_time + time_limit
+        seed = self.seed if self.seed is not None else random.randrange(1 << 30)
+        best = [math.inf, None]
+
+        def improve(cost, basis, worker):
+            if cost < best[0]:
+                best[0], best[1] = cost, basis
+                elapsed_time = time.time() - start_time
+                print('  Worker %d: %d guessed variable(s), cost %d  (%0.2fs)' % (worker, len(basis), cost, elapsed_time), flush=True)
+                self.write_basis(basis, cost, elapsed_time)
+
+        if self.nthreads > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+            results = context.Queue()
+            workers = [context.Process(target=_worker, args=(self, i, seed + i, deadline, results), daemon=True)
+                       for i in range(self.nthreads)]
+            for process in workers:
+                process.start()
+            try:
+                while any(p.is_alive() for p in workers) or not results.empty():
+                    try:
+                        worker, cost, basis = results.get(timeout=max(0.05, min(0.5, deadline + 1 - time.time())))
+                    except queue.Empty:
+                        if time.time() > deadline + 1:
+                            break
+                        continue
+                    improve(cost, basis, worker)
+            finally:
+                for process in workers:
+                    if process.is_alive():
+                        process.terminate()
+                    process.join()
+                results.close()
+        else:
+            self.anneal(random.Random(seed), deadline, lambda cost, basis: improve(cost, basis, 0))
+        elapsed_time = time.time() - start_time
+        print('Local search finished in %0.2f seconds' % elapsed_time)
+        if best[1] is None:
+            print('\n' + '=' * 60)
+            print('RESULT: TIMEOUT')
+            print('No guess basis was found within the time limit.')
+            print('=' * 60)
+            return None
+        basis = best[1]
+        initial_values = [0] * self.num_of_vars
+        for v in self.system.known + basis:
+            initial_values[v] = 1
+        if self.max_guess is None:
+            self.max_guess = best[0]
+        # The determination flow is printed up to the depth actually needed
+        self.max_steps = self.depth(basis)
+        self.solutions = self.system.solution_from_initial(initial_values, self.max_steps)
+        parse_solver_solution(self)
+        if self.system.weights is not None:
+            print('Weighted number of guesses: %d' % best[0])
+        print('The basis is not proven to be minimal (local search)')
+        if self.draw_graph:
+            draw_graph(self.vertices, self.edges, self.known_variables, self.guessed_vars,
+                       self.output_dir, self.tikz, self.dglayout)
+        return True
+
+
+def _worker(search, worker, seed, deadline, results):
+    """
+    One restart chain of the local search, run in a forked process
+    """
+
+    search.anneal(random.Random(seed), deadline, lambda cost, basis: results.put((worker, cost, basis)))
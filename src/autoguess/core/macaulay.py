@@ -39,28 +39,33 @@ class Macaulay:
     this class performs two main tasks:
     1- Constructing the Macaulay matrix of degree D
     2- Computing the reduced row echelon form of the derived Macaulay matrix
+
+    The polynomials are read from inputfile, unless they are given directly
+    (as a list of strings) in polynomials.
     """
 
     count = 0
 
-    def __init__(self, inputfile, outputfile, D=2, term_ordering='deglex'):
+    def __init__(self, inputfile=None, outputfile=None, D=2, term_ordering='deglex', polynomials=None):
         Macaulay.count += 1
         self.inputfile = inputfile
         self.outputfile = outputfile
         self.D = D
         self.term_ordering = term_ordering
-        self.algebrize_input_polynomials()
+        self.algebrize_input_polynomials(polynomials)
 
-    def algebrize_input_polynomials(self):
+    def algebrize_input_polynomials(self, string_polynomials=None):
         """
         Converts the given polynomials in string format to a list of boolean polynomials of type PolynomialSequence
         """
-        try:
-            with open(self.inputfile, 'r') as equations_file:
-                string_polynomials = equations_file.read().splitlines()
-        except IOError:
-            print('%s is not accessible!' % self.inputfile)
-            sys.exit()
+        if string_polynomials is None:
+            try:
+                with open(self.inputfile, 'r') as equations_file:
+                    string_polynomials = equations_file.read().splitlines()
+            except IOError:
+                print('%s is not accessible!' % self.inputfile)
+                sys.exit()
+        string_polynomials = [poly for poly in string_polynomials if poly.strip()]
         symbolic_polynomials = list(map(symbolic_expression, string_polynomials))
         symbolic_variables = list(set(flatten([list(eq.variables()) for eq in symbolic_polynomials])))
         self.PolyRing = BooleanPolynomialRing(len(symbolic_variables), names=symbolic_variables, order=self.term_ordering)
@@ -86,8 +91,15 @@ class Macaulay:
                 multiplied_monomials[d] = monomials
             else:
                 multiplied_monomials[d] = [1]
+        # Zero and duplicated products are dropped as soon as they are generated
+        seen = set()
         for f in self.polynomial_sequence:
-            self.macaulay_polynomials.extend([m * f for m in multiplied_monomials[f.degree()]])
+            for m in multiplied_monomials[f.degree()]:
+                product = m * f
+                if product != 0 and product not in seen:
+                    seen.add(product)
+                    self.macaulay_polynomials.append(product)
+        del seen
         self.macaulay_polynomials = PolynomialSequence(self.macaulay_polynomials)
 
     def build_macaulay_matrix(self):
@@ -108,6 +120,8 @@ class Macaulay:
         """
         Applies Gaussian elimination to compute the row reduced echelon form of the derived Macaulay matrix
         """
+        print('Macaulay matrix: %d x %d (density %0.4f%%)' % (self.macaulay_matrix.nrows(), self.macaulay_matrix.ncols(),
+                                                             100 * float(self.macaulay_matrix.density())))
         print('Gaussian elimination was started - %s' % datetime.now())
         start_time = time.time()
         self.macaulay_matrix.echelonize()
@@ -118,18 +132,26 @@ class Macaulay:
         print('#Free variables: %d' % len(self.free_vars))
         print('Gaussian elimination was finished after %0.2f seconds' % elapsed_time)
 
+    def reduced_polynomials(self):
+        """
+        Returns the derived polynomials (the nonzero rows of the reduced
+        Macaulay matrix) in string format
+        """
+        polynomials = []
+        for i in range(self.macaulay_matrix.nrows()):
+            output = " + ".join([str(self.macaulay_vars[j]) for j in self.macaulay_matrix.nonzero_positions_in_row(i)])
+            if output:
+                polynomials.append(output)
+        return polynomials
+
     def write_result(self):
         """
         Writes the derived polynomials into the output file
         """
-        nrows = self.macaulay_matrix.nrows()
         print('Writing the results into the %s - %s' % (self.outputfile, datetime.now()))
         starting_time = time.time()
         with open(self.outputfile, 'w') as outputfile:
-            for i in range(nrows):
-                output = " + ".join([str(self.macaulay_vars[j]) for j in self.macaulay_matrix.nonzero_positions_in_row(i)])
-                if output:
-                    outputfile.write(output + "\n")
+            outputfile.writelines(output + "\n" for output in self.reduced_polynomials())
         elapsed_time = time.time() - starting_time
         print('Result was written into %s after %0.02f seconds' % (self.outputfile, elapsed_time))
 
@@ -153,6 +175,16 @@ def loadparameters(args):
 
     return params
 
+def reduce_polynomials(polynomials, D=2, term_ordering='deglex'):
+    """
+    Computes the reduced Macaulay matrix of the given polynomials (a list of
+    strings) in memory and returns the derived polynomials as strings
+    """
+    macaulay = Macaulay(D=D, term_ordering=term_ordering, polynomials=polynomials)
+    macaulay.build_macaulay_matrix()
+    macaulay.gaussian_elimination()
+    return macaulay.reduced_polynomials()
+
 def main():
     """
     Parse the arguments and start the request functionality with the provided parameters.
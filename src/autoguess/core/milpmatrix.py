@@ -0,0 +1,258 @@
+'''
+Created on Oct 18, 2026
+
+@author: Hosein Hadipour
+@contact: hsn.hadipour@gmail.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+In case you use this tool please include the above copyright informations (name, contact, license)
+'''
+
+import numpy as np
+import scipy.sparse
+
+
+class SparseRows:
+    """
+    Rows of a sparse linear system collected block by block in COO format,
+    together with their senses ('<', '>' or '=') and right-hand sides
+    """
+
+    def __init__(self):
+        self.row_blocks = []
+        self.col_blocks = []
+        self.val_blocks = []
+        self.sense_blocks = []
+        self.rhs_blocks = []
+        self.num_of_rows = 0
+
+    def add_block(self, nrows, row_lists, col_lists, val_lists, sense, rhs):
+        """
+        Add nrows rows; entry k of row_lists[i] (numbered from 0 within the
+        block) has the column col_lists[i][k] and the value val_lists[i][k]
+        """
+        for r, c, v in zip(row_lists, col_lists, val_lists):
+            self.row_blocks.append(np.asarray(r, dtype=np.int64) + self.num_of_rows)
+            self.col_blocks.append(np.asarray(c, dtype=np.int64))
+            self.val_blocks.append(np.asarray(v, dtype=float))
+        self.sense_blocks.append(np.broadcast_to(np.asarray(sense, dtype='U1'), (nrows,)))
+        self.rhs_blocks.append(np.broadcast_to(np.asarray(rhs, dtype=float), (nrows,)))
+        self.num_of_rows += nrows
+
+    def add(self, col_lists, val_lists, sense, rhs):
+        """Add a single row"""
+        self.add_block(1, [np.zeros(len(c), dtype=np.int64) for c in col_lists], col_lists, val_lists, sense, rhs)
+
+    def add_unit(self, cols, sense, rhs):
+        """Add one row 'x[col] sense rhs' per given column"""
+        self.add_block(len(cols), [np.arange(len(cols))], [cols], [np.ones(len(cols))], sense, rhs)
+
+    def matrix(self, num_of_columns):
+        """Return the CSR matrix, the senses and the right-hand sides"""
+        A = scipy.sparse.csr_matrix((np.concatenate(self.val_blocks + [np.empty(0)]),
+                                     (np.concatenate(self.row_blocks + [np.empty(0, dtype=np.int64)]),
+                                      np.concatenate(self.col_blocks + [np.empty(0, dtype=np.int64)]))),
+                                    shape=(self.num_of_rows, num_of_columns))
+        sense = np.concatenate(self.sense_blocks + [np.empty(0, dtype='U1')])
+        rhs = np.concatenate(self.rhs_blocks + [np.empty(0)])
+        return A, sense, rhs
+
+
+class MILPMatrix:
+    """
+    The MILP model of ReduceGDtoMILP in matrix form, built from the CSR
+    arrays of the compiled system and the masks of its cone of influence,
+    so that it can be handed to any solver with a matrix API:
+
+        objective   objective coefficients (one per column)
+        A, sense, rhs   the constraints A x (sense) rhs
+        state_cols  state_cols[s][v] is the column of the state variable
+                    (v, s), or -1 if it is pruned
+        path_cols   path_cols[s][d] is the column of the path variable
+                    (d, s >= 1), or -1 if it is pruned
+        state_slices    the columns of the state variables of step s are
+                    state_slices[s], in the order of state_cols[s]
+        column_ids  integer id of every column in the compiled system
+
+    direction 'min' minimizes the (weighted) number of guesses subject to
+    max_guess and the targets being known after max_steps, and direction
+    'max' maximizes the number of known targets subject to max_guess.
+    """
+
+    def __init__(self, system, cone, max_guess, max_steps, direction='min'):
+        self.system = system
+        self.cone = cone
+        self.max_guess = max_guess
+        self.max_steps = max_steps
+        self.direction = direction
+        self.generate_columns()
+        self.objective = self.generate_objective_function()
+        rows = SparseRows()
+        self.generate_initial_conditions(rows)
+        self.generate_milp_constraints(rows)
+        self.A, self.sense, self.rhs = rows.matrix(self.num_of_columns)
+
+    @property
+    def num_of_rows(self):
+        return len(self.rhs)
+
+    def generate_columns(self):
+        """
+        This method lays out the binary variables of the MILP model: only the
+        state and path variables kept by the cone of influence get a column.
+        The columns of one step are contiguous (states of step 0, then the
+        paths and the states of every next step), and state_cols[s][v]
+        (path_cols[s][d]) is the column of (v, s) ((d, s)), or -1 if pruned.
+        """
+
+        system = self.system
+        n, m = system.num_of_vars, system.num_of_deductions
+        self.state_cols = []
+        self.path_cols = [None]
+        self.state_slices = []
+        ids = []
+        ncols = 0
+        for step in range(self.max_steps + 1):
+            var_mask, ded_mask = self.cone.masks(step)
+            if step > 0:
+                live = np.flatnonzero(ded_mask)
+                cols = np.full(m, -1, dtype=np.int64)
+                cols[live] = np.arange(ncols, ncols + len(live))
+                self.path_cols.append(cols)
+                ids.append((step - 1) * system.layer_size + n + live + 1)
+                ncols += len(live)
+            live = np.flatnonzero(var_mask)
+            cols = np.full(n, -1, dtype=np.int64)
+            cols[live] = np.arange(ncols, ncols + len(live))
+            self.state_cols.append(cols)
+            self.state_slices.append(slice(ncols, ncols + len(live)))
+            ids.append(step * system.layer_size + live + 1)
+            ncols += len(live)
+        self.num_of_columns = ncols
+        # The integer ids of the columns are only needed to name them in the LP file
+        self.column_ids = np.concatenate(ids)
+
+    def generate_objective_function(self):
+        """
+        This method generates the objective coefficients of the MILP problem
+        """
+
+        system = self.system
+        objective = np.zeros(self.num_of_columns)
+        if self.direction == 'max':
+            cols = self.state_cols[self.max_steps][system.targets]
+            objective[cols[cols >= 0]] = 1
+        elif self.direction == 'min':
+            candidates = np.array(self.cone.guess_candidates, dtype=np.int64)
+            objective[self.state_cols[0][candidates]] = self.guess_weights(candidates)
+        return objective
+
+    def guess_weights(self, candidates):
+        if self.system.weights is not None:
+            return np.array(self.system.weights, dtype=float)[candidates]
+        return np.ones(len(candidates))
+
+    def generate_initial_conditions(self, rows):
+        """
+        This method generates the initial constraints consisting of 
+        constrains corresponding to the maximum number of guessed variables, and 
+        number of known variables in the initial state
+        """
+
+        system = self.system
+        cone = self.cone
+        initial_cols = self.state_cols[0]
+        candidates = np.array(cone.guess_candidates, dtype=np.int64)
+        rows.add([initial_cols[candidates]], [self.guess_weights(candidates)], '<', self.max_guess)
+        if self.direction == 'min':
+            # Targets outside of the cone can never be known: they get no
+            # column, so that the right-hand side cannot be reached
+            cols = self.state_cols[self.max_steps][system.targets]
+            cols = cols[cols >= 0]
+            rows.add([cols], [np.ones(len(cols))], '=', len(system.targets))
+        known = [initial_cols[v] for v in system.known if cone.state_live(v, 0)]
+        rows.add_unit(known, '=', 1)
+        # Limit the notguessed variables to be equal to 0 in the first step of knowledge propagation
+        notguessed = [initial_cols[v] for v in system.notguessed if cone.state_live(v, 0)]
+        rows.add_unit(notguessed, '=', 0)
+
+    def generate_milp_constraints(self, rows):
+        """
+        This method generates the milp constraints corresponding to the 
+        obtained deductions.  The constraints of one step are generated at
+        once from the CSR arrays of the compiled system:
+
+            state variable v with tau paths:   v = path (tau = 1), or
+                                               -2 v + sum(paths) >= -1 and tau v - sum(paths) >= 0
+            path variable p with kapa deps:    p = dep (kapa = 1), or
+                                               p - sum(deps) >= 1 - kapa and -kapa p + sum(deps) >= 0
+        """
+
+        system = self.system
+        n, m = system.num_of_vars, system.num_of_deductions
+        owner = np.frombuffer(system.ded_owner, dtype=np.int32)
+        dep_ptr = np.frombuffer(system.dep_ptr, dtype=np.int32)
+        dep_idx = np.frombuffer(system.dep_idx, dtype=np.int32)
+        dep_count = np.diff(dep_ptr)
+        for step in range(1, self.max_steps + 1):
+            state_cols = self.state_cols[step]
+            path_cols = self.path_cols[step]
+            previous_cols = self.state_cols[step - 1]
+            paths = np.flatnonzero(path_cols >= 0)
+            states = np.flatnonzero(state_cols >= 0)
+            #####################################-State variable constraints-#####################################
+            # Row i of the block is the state variable states[i]; the paths of a
+            # live state are live deductions of the same owner
+            tau = np.bincount(owner[paths], minlength=n)[states]
+            row_of_state = np.full(n, -1, dtype=np.int64)
+            row_of_state[states] = np.arange(len(states))
+            path_rows = row_of_state[owner[paths]]
+            single = tau == 1
+            rows.add_block(len(states),
+                           [np.arange(len(states)), path_rows],
+                           [state_cols[states], path_cols[paths]],
+                           [np.where(single, -1.0, -2.0), np.ones(len(paths))],
+                           np.where(single, '=', '>'), np.where(single, 0, -1))
+            multiple = np.flatnonzero(~single)
+            row_of_state[:] = -1
+            row_of_state[states[multiple]] = np.arange(len(multiple))
+            keep = row_of_state[owner[paths]] >= 0
+            rows.add_block(len(multiple),
+                           [np.arange(len(multiple)), row_of_state[owner[paths[keep]]]],
+                           [state_cols[states[multiple]], path_cols[paths[keep]]],
+                           [tau[multiple].astype(float), -np.ones(int(keep.sum()))],
+                           '>', 0)
+            #####################################-Path variable constraints-######################################
+            # Row i of the block is the path variable paths[i]
+            kapa = dep_count[paths]
+            dep_rows = np.repeat(np.arange(len(paths)), kapa)
+            # Positions of the deps of the live paths in dep_idx
+            block_start = np.cumsum(kapa) - kapa
+            deps = dep_idx[np.arange(len(dep_rows)) - block_start[dep_rows] + dep_ptr[paths][dep_rows]]
+            single = kapa == 1
+            rows.add_block(len(paths),
+                           [np.arange(len(paths)), dep_rows],
+                           [path_cols[paths], previous_cols[deps]],
+                           [np.ones(len(paths)), -np.ones(len(deps))],
+                           np.where(single, '=', '>'), np.where(single, 0, 1 - kapa))
+            multiple = np.flatnonzero(~single)
+            row_of_path = np.full(len(paths), -1, dtype=np.int64)
+            row_of_path[multiple] = np.arange(len(multiple))
+            keep = row_of_path[dep_rows] >= 0
+            rows.add_block(len(multiple),
+                           [np.arange(len(multiple)), row_of_path[dep_rows[keep]]],
+                           [path_cols[paths[multiple]], previous_cols[deps[keep]]],
+                           [-kapa[multiple].astype(float), np.ones(int(keep.sum()))],
+                           '>', 0)
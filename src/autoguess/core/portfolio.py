@@ -0,0 +1,245 @@
+'''
+Created on Oct 18, 2026
+
+@author: Hosein Hadipour
+@contact: hsn.hadipour@gmail.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+In case you use this tool please include the above copyright informations (name, contact, license)
+
+Parallel portfolio: the same guess-and-determine instance is handed to
+several backends (CP, CP-SAT, MILP, SMT and a few PySAT solvers), each one in its
+own process.  All of them answer the same decision problem (is there a
+guess basis of size <= max_guess within max_steps?), so the first worker
+that either finds a basis or proves that none exists settles it, and the
+remaining workers are cancelled.  When the input file has a weights
+section, the size of a basis is its total weight, and only the backends
+which bound the weighted sum (SAT, CP-SAT and MILP) take part.
+'''
+
+import importlib.util
+import io
+import multiprocessing
+import os
+import queue
+import random
+import signal
+import sys
+import time
+from autoguess.config import TEMP_DIR, available_minizinc_solvers
+
+# SAT solvers raced by the portfolio, in order of preference.  Different CDCL
+# implementations complement each other well on these instances.
+PORTFOLIO_SAT_SOLVERS = ['cadical153', 'glucose4', 'maplechrono', 'minisat22', 'lingeling', 'cadical195']
+# The workers get the same time limit as the portfolio; this is how long the
+# parent waits beyond it for them to report back before cancelling them
+GRACE_PERIOD = 1
+
+
+def has_weights(inputfile):
+    """
+    Whether the given relation file has a (nonempty) weights section
+    """
+
+    from .inputparser import split_contents_by_sections, remove_comments
+    with open(inputfile, 'r') as fileobj:
+        contents = fileobj.read().strip()
+    return bool(split_contents_by_sections(remove_comments(contents)).get('weights'))
+
+
+def portfolio_members(parameters):
+    """
+    Return the list of (label, solver, overrides) tuples raced by the
+    portfolio.  Only the backends that are installed are included, and the
+    list is truncated to the number of worker processes.  CP (MiniZinc) and
+    SMT only bound the number of guesses, so they are left out when the
+    input file has a weights section.
+    """
+
+    from pysat import solvers
+    sat_solvers = [name for name in PORTFOLIO_SAT_SOLVERS if hasattr(solvers.SolverNames, name)]
+    if parameters['satsolver'] in sat_solvers:
+        sat_solvers.remove(parameters['satsolver'])
+    sat_solvers.insert(0, parameters['satsolver'])
+    sat_members = [('sat/%s' % name, 'sat', {'satsolver': name}) for name in sat_solvers]
+
+    other_members = []
+    weighted = has_weights(parameters['inputfile'])
+    cp_solvers = available_minizinc_solvers() if not weighted else []
+    if cp_solvers:
+        cpsolver = parameters['cpsolver']
+        if cpsolver not in cp_solvers:
+            cpsolver = next((s for s in ('cp-sat', 'gecode', 'chuffed') if s in cp_solvers), cp_solvers[0])
+        other_members.append(('cp/%s' % cpsolver, 'cp', {'cpsolver': cpsolver}))
+    if importlib.util.find_spec('ortools') is not None:
+        other_members.append(('cpsat/ortools', 'cpsat', {}))
+    if importlib.util.find_spec('gurobipy') is not None:
+        other_members.append(('milp/gurobi', 'milp', {'milpsolver': 'gurobi'}))
+    elif importlib.util.find_spec('scipy') is not None:
+        other_members.append(('milp/highs', 'milp', {'milpsolver': 'highs'}))
+    if importlib.util.find_spec('z3') is not None and not weighted:
+        other_members.append(('smt/z3', 'smt', {'smtsolver': 'z3'}))
+
+    # The first SAT solver goes first, then the other backends, then the
+    # remaining SAT solvers, so that small pools are as diverse as possible
+    members = sat_members[:1] + other_members + sat_members[1:]
+    number_of_workers = parameters.get('threads', 0) or os.cpu_count() or 1
+    return members[:max(1, number_of_workers)]
+
+
+def _worker(label, solver, parameters, results):
+    """
+    Run one backend and send its outcome to the parent through the results queue
+    """
+
+    # Own process group, so that the parent can also cancel the subprocesses
+    # started by the worker (e.g., MiniZinc)
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    from .search import _make_backend, _solve_backend
+    buffer = io.StringIO()
+    sys.stdout = buffer
+    message = {'label': label, 'result': None, 'error': None}
+    try:
+        gd = _make_backend(solver, parameters)
+        message['result'] = _solve_backend(solver, gd, parameters)
+        if message['result'] is True:
+            message['guessed_vars'] = gd.guessed_vars
+            message['known_variables'] = gd.known_variables
+            message['vertices'] = gd.vertices
+            message['edges'] = gd.edges
+    except Exception as exc:
+        message['error'] = '%s: %s' % (type(exc).__name__, exc)
+    finally:
+        sys.stdout = sys.__stdout__
+    message['log'] = buffer.getvalue()
+    results.put(message)
+
+
+def _cancel(process):
+    """
+    Stop a worker together with every process it has started
+    """
+
+    if process.is_alive():
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(process.pid, signal.SIGTERM)
+            else:
+                process.terminate()
+        except (ProcessLookupError, PermissionError):
+            process.terminate()
+    process.join(timeout=2)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+def run_portfolio(parameters):
+    """
+    Race the backends returned by portfolio_members and report the first
+    decisive answer.  Returns True/False like the single backends, or None
+    if no worker could decide the problem before the deadline.
+    """
+
+    members = portfolio_members(parameters)
+    time_limit = parameters['timelimit']
+    print('=' * 60)
+    print('PORTFOLIO')
+    print('=' * 60)
+    print('Workers: %s' % ', '.join(label for label, _, _ in members))
+    if time_limit != -1:
+        print('Shared deadline: %d seconds' % time_limit)
+    cpu_count = os.cpu_count() or 1
+    tag = '%x' % random.randrange(1 << 32)
+    results = multiprocessing.Queue()
+    processes = {}
+    output_files = {}
+    start_time = time.time()
+    for label, solver, overrides in members:
+        worker_parameters = dict(parameters)
+        worker_parameters.update(overrides)
+        output_files[label] = os.path.join(TEMP_DIR, 'portfolio_%s_%s' % (tag, label.replace('/', '_')))
+        worker_parameters.update({'solver': solver,
+                                  'outputfile': output_files[label],
+                                  'drawgraph': False,
+                                  'findmin': False,
+                                  'deepen': False,
+                                  'threads': max(1, cpu_count // len(members))})
+        process = multiprocessing.Process(target=_worker, args=(label, solver, worker_parameters, results), daemon=True)
+        process.start()
+        processes[label] = process
+
+    deadline = None if time_limit == -1 else start_time + time_limit + GRACE_PERIOD
+    winner = None
+    reports = []
+    print('-' * 60)
+    try:
+        while winner is None and len(reports) < len(processes):
+            wait = 1.0 if deadline is None else min(1.0, deadline - time.time())
+            if wait <= 0:
+                break
+            try:
+                message = results.get(timeout=wait)
+            except queue.Empty:
+                if not any(p.is_alive() for p in processes.values()) and results.empty():
+                    break
+                continue
+            message['elapsed'] = time.time() - start_time
+            reports.append(message)
+            status = {True: 'SAT', False: 'UNSAT', None: 'UNKNOWN'}[message['result']]
+            if message['error'] is not None:
+                status = 'ERROR (%s)' % message['error']
+            print('  %-22s %s  (%0.2fs)' % (message['label'], status, message['elapsed']))
+            if message['error'] is None and message['result'] in (True, False):
+                winner = message
+    finally:
+        for process in processes.values():
+            _cancel(process)
+        results.close()
+    elapsed_time = time.time() - start_time
+
+    if winner is None:
+        print('\n' + '=' * 60)
+        if reports and len(reports) == len(processes):
+            print('PORTFOLIO RESULT: no worker could decide the problem')
+        else:
+            print('PORTFOLIO RESULT: TIMEOUT after %0.2f seconds' % elapsed_time)
+        print('=' * 60)
+        _remove_output_files(output_files)
+        return None
+
+    sys.stdout.write(winner['log'])
+    label = winner['label']
+    if winner['result'] is True:
+        os.replace(output_files.pop(label), parameters['outputfile'])
+        with open(parameters['outputfile'], 'a') as outputfile:
+            outputfile.write('Portfolio winner: %s (%0.2f seconds)\n' % (label, winner['elapsed']))
+        if parameters.get('drawgraph', True):
+            from .graphdrawer import draw_graph
+            draw_graph(winner['vertices'], winner['edges'], winner['known_variables'], winner['guessed_vars'],
+                       parameters['outputfile'], parameters['tikz'], parameters['dglayout'])
+    _remove_output_files(output_files)
+    print('\n' + '=' * 60)
+    print('Portfolio winner: %s after %0.2f seconds (%d workers cancelled)' %
+          (label, winner['elapsed'], len(processes) - len(reports)))
+    print('=' * 60)
+    return winner['result']
+
+
+def _remove_output_files(output_files):
+    for path in output_files.values():
+        if os.path.exists(path):
+            os.remove(path)
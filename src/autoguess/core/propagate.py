@@ -19,9 +19,314 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 In case you use this tool please include the above copyright informations (name, contact, license)
 """
 
+import os
 import time
+import multiprocessing
+from array import array
+from collections import deque
 from datetime import datetime
+from itertools import chain, combinations, islice
+import numpy as np
 from .inputparser import read_relation_file
+from .compiledsystem import compile_relation_system
+
+
+class PropagationEngine:
+    """
+    Linear-time knowledge propagation (in the style of the Dowling-Gallier
+    algorithm for Horn formulas).
+
+    Variables are interned to the integers 0..n-1 (in the order of
+    ``variables``), and every relation keeps a counter of its variables
+    that have not been processed yet: all variables of a symmetric
+    relation, and the premises of an implication relation.  A symmetric
+    relation also keeps the XOR of the ids of these variables,
+    so that when its counter drops to 1 the remaining variable is known
+    without scanning the relation.  Newly determined variables go through
+    a FIFO queue, hence every relation is touched O(|rel|) times per
+    closure, and the variables come out in the order of the iterations of
+    the naive fixed-point propagation:
+
+        iteration(v) = 0 for the initially known variables, and otherwise
+        1 + min over the relations determining v of the max iteration of
+        the other variables of the relation
+
+    The engine is built once per system of relations and can then compute
+    the closure of any number of sets of known variables.
+    """
+
+    def __init__(self, variables, symmetric_relations, implication_relations):
+        self.variables = list(variables)
+        self.var_index = {v: i for i, v in enumerate(self.variables)}
+        self.relations = list(symmetric_relations) + list(implication_relations)
+        self.num_of_symmetric = len(symmetric_relations)
+        n = len(self.variables)
+        index = self.var_index
+        # watch[v]: relations whose counter includes v
+        self.watch = [[] for _ in range(n)]
+        self.size = array('i')
+        self.xor_init = array('i')
+        self.conclusion = array('i')
+        # Relations which fire without any variable being known
+        self.ripe = []
+        for r, rel in enumerate(self.relations):
+            # A variable occurring twice in a symmetric relation is counted
+            # twice, so that it is never determined by that relation
+            if r < self.num_of_symmetric:
+                counted = [index[v] for v in rel]
+                conclusion = -1
+            else:
+                counted = [index[v] for v in rel[:-1]]
+                conclusion = index[rel[-1]]
+            x = 0
+            for v in counted:
+                self.watch[v].append(r)
+                x ^= v
+            self.size.append(len(counted))
+            self.xor_init.append(x)
+            self.conclusion.append(conclusion)
+            if (conclusion == -1 and len(counted) == 1) or (conclusion != -1 and not counted):
+                self.ripe.append(r)
+
+    def closure_ids(self, known_ids):
+        """
+        Return (level, derivation) for the given ids of initially known
+        variables, where level[v] is the iteration at which v is known (-1
+        if it cannot be determined) and derivation is the list of the
+        determined (variable id, relation id, iteration) in derivation order
+        """
+
+        state = self.state(known_ids)
+        return state.level, state.derivation
+
+    def state(self, known_ids, record=True):
+        """
+        Return the ClosureState of the given ids of initially known
+        variables; its derivation is only recorded if record is True
+        """
+
+        state = ClosureState(self, [-1] * len(self.variables), self.size.tolist(), self.xor_init.tolist(),
+                             [] if record else None)
+        queue = deque()
+        level = state.level
+        for v in known_ids:
+            if level[v] == -1:
+                level[v] = 0
+                queue.append(v)
+        for r in self.ripe:
+            u = state.xor[r] if r < self.num_of_symmetric else self.conclusion[r]
+            if level[u] == -1:
+                level[u] = 1
+                queue.append(u)
+                if record:
+                    state.derivation.append((u, r, 1))
+        state.propagate(queue)
+        return state
+
+    def closure(self, known_variables):
+        """
+        Return (known, derivation) for the given names of initially known
+        variables, where known is the set of the names of all known
+        variables after propagation, and derivation is the list of the
+        determined (variable, relation, iteration) in derivation order
+        """
+
+        index = self.var_index
+        level, derivation = self.closure_ids([index[v] for v in known_variables])
+        names = self.variables
+        known = {names[v] for v, lv in enumerate(level) if lv != -1}
+        return known, [(names[v], self.relations[r], lv) for v, r, lv in derivation]
+
+
+class ClosureState:
+    """
+    Closure of a set of known variables computed by a PropagationEngine,
+    together with the counters of its relations, so that it can be extended
+    incrementally: add(v) only processes what v newly determines.  The
+    variables added this way get the iteration 0, hence the iterations are
+    only exact for the initial closure.
+    """
+
+    __slots__ = ('engine', 'level', 'count', 'xor', 'derivation')
+
+    def __init__(self, engine, level, count, xor, derivation):
+        self.engine = engine
+        self.level = level
+        self.count = count
+        self.xor = xor
+        self.derivation = derivation
+
+    def copy(self):
+        derivation = None if self.derivation is None else self.derivation[:]
+        return ClosureState(self.engine, self.level[:], self.count[:], self.xor[:], derivation)
+
+    def add(self, v):
+        """
+        Make variable v known and propagate; return the list of the newly
+        known variables (v first), which is empty if v was already known
+        """
+
+        if self.level[v] != -1:
+            return []
+        self.level[v] = 0
+        return [v] + self.propagate(deque([v]))
+
+    def propagate(self, queue):
+        """Process the queued variables; return the newly determined ones"""
+
+        engine = self.engine
+        level, count, xor, derivation = self.level, self.count, self.xor, self.derivation
+        conclusion = engine.conclusion
+        num_of_symmetric = engine.num_of_symmetric
+        watch = engine.watch
+        learned = []
+        while queue:
+            v = queue.popleft()
+            next_level = level[v] + 1
+            for r in watch[v]:
+                count[r] -= 1
+                if r < num_of_symmetric:
+                    xor[r] ^= v
+                    if count[r] != 1:
+                        continue
+                    u = xor[r]
+                else:
+                    if count[r] != 0:
+                        continue
+                    u = conclusion[r]
+                if level[u] == -1:
+                    level[u] = next_level
+                    queue.append(u)
+                    learned.append(u)
+                    if derivation is not None:
+                        derivation.append((u, r, next_level))
+        return learned
+
+
+class BatchedClosure:
+    """
+    Bit-parallel closure of many sets of known variables (candidates) at once.
+
+    The candidates are packed into a matrix of uint64 words with one row
+    per variable and one bit (lane) per candidate, and the fixed point is
+    computed for all lanes together from the deductions of the compiled
+    system: in every sweep, a deduction holds in a lane if all of its
+    variables are known there (AND over the deduction), and a variable
+    becomes known if one of its deductions holds (OR over the deductions
+    of the variable).  Both reductions run over the CSR arrays of the
+    compiled system with numpy, so a sweep costs O(size of the deductions)
+    word operations for 64 candidates per word.
+
+    Batches of more than chunk_lanes candidates are split into chunks, which
+    are evaluated by a pool of worker processes when processes > 1 (0 means
+    one process per core) and the 'fork' start method is available.
+    """
+
+    def __init__(self, system, processes=1, chunk_lanes=1 << 14):
+        self.system = system
+        self.num_of_vars = system.num_of_vars
+        self.num_of_deductions = system.num_of_deductions
+        dep_ptr = np.frombuffer(system.dep_ptr, dtype=np.int32)
+        dep_count = np.diff(dep_ptr)
+        self.dep_idx = np.frombuffer(system.dep_idx, dtype=np.int32)
+        # reduceat cannot handle empty groups: deductions without any
+        # required variable are set apart (they always hold)
+        self.nonempty = np.flatnonzero(dep_count > 0)
+        self.empty = np.flatnonzero(dep_count == 0)
+        self.dep_starts = dep_ptr[:-1][self.nonempty]
+        self.ded_starts = np.frombuffer(system.ded_ptr, dtype=np.int32)[:-1]
+        self.targets = np.array(system.targets, dtype=np.int64)
+        self.processes = processes if processes > 0 else (os.cpu_count() or 1)
+        self.chunk_lanes = chunk_lanes
+        self._pool = None
+
+    def pack(self, candidates, fixed=()):
+        """
+        Pack the candidates (sequences of variable ids) into a bit matrix;
+        the fixed variables are known in every lane
+        """
+
+        num_of_lanes = len(candidates)
+        known = np.zeros((self.num_of_vars, (num_of_lanes + 63) // 64), dtype=np.uint64)
+        sizes = [len(c) for c in candidates]
+        lanes = np.repeat(np.arange(num_of_lanes, dtype=np.uint64), sizes)
+        variables = np.fromiter(chain.from_iterable(candidates), dtype=np.int64, count=len(lanes))
+        np.bitwise_or.at(known, (variables, (lanes >> np.uint64(6)).astype(np.int64)),
+                         np.left_shift(np.uint64(1), lanes & np.uint64(63)))
+        if len(fixed):
+            known[np.asarray(fixed, dtype=np.int64)] = ~np.uint64(0)
+        return known
+
+    def closure(self, known):
+        """Return the closure of a packed bit matrix (lane by lane)"""
+
+        holds = np.empty((self.num_of_deductions, known.shape[1]), dtype=np.uint64)
+        holds[self.empty] = ~np.uint64(0)
+        while True:
+            if len(self.nonempty):
+                holds[self.nonempty] = np.bitwise_and.reduceat(known[self.dep_idx], self.dep_starts, axis=0)
+            # The first deduction of every variable is the variable itself,
+            # so the new matrix contains the old one
+            new = np.bitwise_or.reduceat(holds, self.ded_starts, axis=0)
+            if np.array_equal(new, known):
+                return known
+            known = new
+
+    def _uncovered_chunk(self, candidates, fixed):
+        num_of_lanes = len(candidates)
+        if not len(self.targets):
+            return np.zeros(num_of_lanes, dtype=np.int64)
+        known = self.closure(self.pack(candidates, fixed))
+        # Lane b is bit b % 8 of byte b // 8 in the little-endian layout
+        target_words = known[self.targets].astype('<u8', copy=False)
+        bits = np.unpackbits(target_words.view(np.uint8), axis=1, bitorder='little')[:, :num_of_lanes]
+        return len(self.targets) - bits.sum(axis=0, dtype=np.int64)
+
+    def uncovered(self, candidates, fixed=()):
+        """
+        Return the number of target variables which are not known after
+        propagation, for every candidate (together with the fixed variables)
+        """
+
+        candidates = list(candidates)
+        fixed = list(fixed)
+        chunks = [candidates[i:i + self.chunk_lanes] for i in range(0, len(candidates), self.chunk_lanes)]
+        if len(chunks) > 1 and self.processes > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            if self._pool is None:
+                context = multiprocessing.get_context('fork')
+                self._pool = context.Pool(self.processes, initializer=_init_batch_worker, initargs=(self,))
+            results = self._pool.map(_uncovered_worker, [(chunk, fixed) for chunk in chunks])
+        else:
+            results = [self._uncovered_chunk(chunk, fixed) for chunk in chunks]
+        if not results:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(results)
+
+    def covers(self, candidates, fixed=()):
+        """Whether every candidate (with the fixed variables) determines all target variables"""
+
+        return self.uncovered(candidates, fixed) == 0
+
+    def close(self):
+        """Stop the worker processes, if any"""
+
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+
+_batch_worker_closure = None
+
+
+def _init_batch_worker(batched_closure):
+    global _batch_worker_closure
+    batched_closure._pool = None
+    _batch_worker_closure = batched_closure
+
+
+def _uncovered_worker(args):
+    return _batch_worker_closure._uncovered_chunk(*args)
 
 
 def propagate_knowledge(parsed_data, known_variables):
@@ -62,75 +367,20 @@ def propagate_knowledge(parsed_data, known_variables):
     print('  %s' % ', '.join(known_variables))
     print(separator)
 
-    known_set = set(known_variables)
-    iteration = 0
-
-    # Build inverted indices: variable -> list of relations containing it
-    from collections import defaultdict
-    sym_by_var = defaultdict(list)
-    for rel in symmetric_relations:
-        for v in rel:
-            sym_by_var[v].append(rel)
-    impl_by_var = defaultdict(list)   # index by premise variables only
-    for rel in implication_relations:
-        for v in rel[:-1]:
-            impl_by_var[v].append(rel)
-
-    # Initial frontier: all initially known variables
-    frontier = set(known_variables)
-
-    while frontier:
-        newly_learned = []
-        checked = set()  # relation ids already examined this iteration
-
-        for fvar in frontier:
-            # Symmetric relations: if exactly 1 unknown remains, it's determined
-            for rel in sym_by_var.get(fvar, []):
-                rid = id(rel)
-                if rid in checked:
-                    continue
-                checked.add(rid)
-                unknown = None
-                n_unknown = 0
-                for v in rel:
-                    if v not in known_set:
-                        n_unknown += 1
-                        unknown = v
-                        if n_unknown > 1:
-                            break
-                if n_unknown == 1:
-                    newly_learned.append((unknown, rel))
-
-            # Implication relations: if all premises known and conclusion unknown
-            for rel in impl_by_var.get(fvar, []):
-                rid = id(rel)
-                if rid in checked:
-                    continue
-                checked.add(rid)
-                target = rel[-1]
-                if target in known_set:
-                    continue
-                if all(v in known_set for v in rel[:-1]):
-                    newly_learned.append((target, rel))
-
-        if not newly_learned:
-            break
-
-        iteration += 1
-        # Deduplicate (a variable may be deducible from multiple relations)
-        seen = set()
-        unique_learned = []
-        for var, rel in newly_learned:
-            if var not in seen:
-                seen.add(var)
-                unique_learned.append((var, rel))
-
-        print('\nIteration %d: learned %d new variable(s)' % (iteration, len(unique_learned)))
-        for var, rel in unique_learned:
+    engine = PropagationEngine(all_variables, symmetric_relations, implication_relations)
+    known_set, derivation = engine.closure(known_variables)
+    iteration = derivation[-1][2] if derivation else 0
+
+    # The derivation is ordered by iteration
+    position = 0
+    for it in range(1, iteration + 1):
+        end = position
+        while end < len(derivation) and derivation[end][2] == it:
+            end += 1
+        print('\nIteration %d: learned %d new variable(s)' % (it, end - position))
+        for var, rel, _ in derivation[position:end]:
             print('  %s  <--  [%s]' % (var, ', '.join(rel)))
-
-        known_set.update(seen)
-        frontier = seen  # next iteration only re-checks relations touching new vars
+        position = end
 
     elapsed = time.time() - start_time
 
@@ -162,71 +412,116 @@ def _propagate_quiet(symmetric_relations, implication_relations, known_variables
     Run fixed-point propagation silently (no output).
     Returns the set of known variables after propagation.
     """
-    from collections import defaultdict
-
-    known_set = set(known_variables)
-
-    sym_by_var = defaultdict(list)
-    for rel in symmetric_relations:
-        for v in rel:
-            sym_by_var[v].append(rel)
-    impl_by_var = defaultdict(list)
-    for rel in implication_relations:
-        for v in rel[:-1]:
-            impl_by_var[v].append(rel)
-
-    frontier = set(known_variables)
-    while frontier:
-        newly_learned = set()
-        checked = set()
-        for fvar in frontier:
-            for rel in sym_by_var.get(fvar, []):
-                rid = id(rel)
-                if rid in checked:
-                    continue
-                checked.add(rid)
-                unknown = None
-                n_unknown = 0
-                for v in rel:
-                    if v not in known_set:
-                        n_unknown += 1
-                        unknown = v
-                        if n_unknown > 1:
-                            break
-                if n_unknown == 1:
-                    newly_learned.add(unknown)
-            for rel in impl_by_var.get(fvar, []):
-                rid = id(rel)
-                if rid in checked:
-                    continue
-                checked.add(rid)
-                target = rel[-1]
-                if target not in known_set and all(v in known_set for v in rel[:-1]):
-                    newly_learned.add(target)
-        newly_learned -= known_set
-        if not newly_learned:
-            break
-        known_set.update(newly_learned)
-        frontier = newly_learned
-    return known_set
+
+    engine = PropagationEngine(all_variables, symmetric_relations, implication_relations)
+    return engine.closure(known_variables)[0]
 
 
-def reduce_basis(parsed_data, basis_variables):
+def greedy_guess_basis(parsed_data, lookahead=16):
+    """
+    Find a guess basis quickly, with no optimality guarantee (it only serves
+    as a baseline and to bound max_guess and max_steps).
+
+    This is the idea of the marking algorithm (gdmark.Mark), run on the
+    propagation engine: the symmetric relations with the fewest unknown
+    variables are the cheapest to complete, since guessing all but one of
+    their unknown variables determines the rest.  At each step, up to
+    `lookahead` unknown variables of these relations are tried, and the one
+    whose guess determines the most variables (after propagation) is
+    guessed.  When all targets are known, the guesses which turned out to
+    be redundant are dropped again.
+
+    Returns (basis, depth), where depth is the number of propagation steps
+    the basis needs to determine all targets, or None if the targets
+    cannot be determined even by guessing every variable.
     """
-    Given a known guess basis, try to reduce it by testing subsets of
-    decreasing size via propagation.
 
-    Enumerates subsets starting from size |basis|-1, then |basis|-2, etc.
-    At each level, if at least one valid subset exists the search continues
-    to the next smaller size.  The search stops at the first level where NO
-    subset is a valid guess basis, and returns one of the valid subsets
-    from the previous (smallest successful) level.
+    variables = parsed_data["variables"]
+    engine = PropagationEngine(variables, parsed_data["symmetric_relations"], parsed_data["implication_relations"])
+    index = engine.var_index
+    known_ids = [index[v] for v in parsed_data.get("known_variables", [])]
+    targets = [index[v] for v in parsed_data.get("target_variables", variables)]
+    notguessed = {index[v] for v in parsed_data.get("notguessed_variables", [])}
+    guessable = [v not in notguessed for v in range(len(variables))]
+    relation_ids = [[index[v] for v in rel] for rel in engine.relations[:engine.num_of_symmetric]]
+
+    def depth(basis):
+        level = engine.state(known_ids + basis, record=False).level
+        if any(level[v] == -1 for v in targets):
+            return None
+        return max([level[v] for v in targets] + [0])
+
+    state = engine.state(known_ids, record=False)
+    basis = []
+    while any(state.level[v] == -1 for v in targets):
+        level, count = state.level, state.count
+        # Unknown guessable variables of the relations with the fewest unknowns
+        fewest = min((count[r] for r in range(len(relation_ids)) if count[r] >= 2
+                      and any(guessable[v] and level[v] == -1 for v in relation_ids[r])), default=None)
+        candidates = []
+        if fewest is not None:
+            for r in range(len(relation_ids)):
+                if count[r] == fewest:
+                    candidates.extend(v for v in relation_ids[r] if guessable[v] and level[v] == -1)
+            candidates = list(dict.fromkeys(candidates))[:lookahead]
+        if not candidates:
+            # No symmetric relation can be completed: guess an unknown target
+            # directly, or else any unknown variable (e.g., a premise of an
+            # implication relation)
+            candidates = [v for v in targets if guessable[v] and level[v] == -1][:1]
+            candidates = candidates or [v for v in range(len(variables)) if guessable[v] and level[v] == -1][:lookahead]
+        if not candidates:
+            return None
+        best_gain, best_state, best_v = -1, None, None
+        for v in candidates:
+            trial = state.copy()
+            gain = len(trial.add(v))
+            if gain > best_gain:
+                best_gain, best_state, best_v = gain, trial, v
+        basis.append(best_v)
+        state = best_state
+    # The early guesses are often implied by the later ones
+    for v in list(basis):
+        rest = [u for u in basis if u != v]
+        if depth(rest) is not None:
+            basis = rest
+    return [variables[v] for v in basis], depth(basis)
+
+
+REDUCTION_STRATEGIES = ['subsets', 'deletion', 'quickxplain', 'exact']
+
+
+def reduce_basis(parsed_data, basis_variables, processes=1, strategy='subsets', max_steps=None, sat_solver='cadical153'):
+    """
+    Given a known guess basis, try to reduce it to a smaller guess basis
+    made of some of its variables, via propagation.  Strategies:
+
+    subsets      Enumerate subsets starting from size |basis|-1, then
+                 |basis|-2, etc.  At each level, if at least one valid subset
+                 exists the search continues to the next smaller size.  The
+                 search stops at the first level where NO subset is a valid
+                 guess basis, and returns one of the valid subsets from the
+                 previous (smallest successful) level.  The result has the
+                 minimum size, but the number of subsets grows combinatorially.
+    deletion     Drop the variables one at a time and keep them out whenever
+                 the rest is still a guess basis: at most |basis| closures,
+                 and the result is inclusion-minimal (no variable can be
+                 dropped) but not necessarily of minimum size.
+    quickxplain  Inclusion-minimal as well, found by divide and conquer
+                 (QuickXplain), which needs O(k log(|basis|/k)) closures for
+                 a result of size k.
+    exact        Deletion first, then the SAT model of ReduceGDtoSAT with
+                 max_steps state copies, where the variables out of the basis
+                 are assumed not to be guessed, proves that no smaller subset
+                 exists or finds one (with an incremental totalizer bound
+                 on the number of guesses).  The result has the minimum size
+                 among the subsets which determine the targets within
+                 max_steps (default: the number of variables, which is
+                 always enough).
 
     Returns the reduced basis (list) or the original basis if no reduction
     is possible.
     """
-    from itertools import combinations
-    from math import comb
 
     all_variables = parsed_data["variables"]
     symmetric_relations = parsed_data["symmetric_relations"]
@@ -247,6 +542,9 @@ def reduce_basis(parsed_data, basis_variables):
     target_set = set(target_variables)
 
     # Validate
+    if strategy not in REDUCTION_STRATEGIES:
+        print("Error: unknown reduction strategy '%s'." % strategy)
+        return None
     for var in basis_variables:
         if var not in all_variables:
             print("Error: variable '%s' not found in the parsed data." % var)
@@ -267,11 +565,12 @@ def reduce_basis(parsed_data, basis_variables):
     if fixed_known:
         print('Fixed known (from file): %d  (%s)' % (len(fixed_known), ', '.join(fixed_known)))
     print('Initial basis to reduce (%d): %s' % (len(basis_variables), ', '.join(basis_variables)))
+    print('Strategy: %s' % strategy)
     print(separator)
 
     # First verify the full basis is indeed a guess basis
-    full_known = _propagate_quiet(symmetric_relations, implication_relations,
-                                  fixed_known + basis_variables, all_variables)
+    engine = PropagationEngine(all_variables, symmetric_relations, implication_relations)
+    full_known = engine.closure(fixed_known + basis_variables)[0]
     if not target_set.issubset(full_known):
         uncovered = sorted(target_set - full_known)
         print('\nERROR: The supplied basis is NOT a valid guess basis!')
@@ -282,39 +581,25 @@ def reduce_basis(parsed_data, basis_variables):
     print('\nFull basis (%d vars) verified — all targets covered.' % len(basis_variables))
 
     n = len(basis_variables)
-    best_basis = list(basis_variables)
-    total_checked = 0
-
-    for drop in range(1, n):
-        subset_size = n - drop
-        n_subsets = comb(n, subset_size)
-        print('\n--- Trying subsets of size %d  (%d candidates) ---' % (subset_size, n_subsets))
-
-        found_at_level = None          # first valid candidate at this level
-        for idx, subset in enumerate(combinations(basis_variables, subset_size), 1):
-            total_checked += 1
-            candidate = list(subset)
-            known_after = _propagate_quiet(symmetric_relations, implication_relations,
-                                           fixed_known + candidate, all_variables)
-            if target_set.issubset(known_after):
-                print('  [%d/%d] {%s}  =>  VALID guess basis!' % (idx, n_subsets, ', '.join(candidate)))
-                if found_at_level is None:
-                    found_at_level = candidate   # keep the first valid one
-                break                            # no need to check remaining subsets at this level
-            else:
-                if idx <= 20 or idx == n_subsets:
-                    uncov = len(target_set - known_after)
-                    print('  [%d/%d] {%s}  =>  %d target(s) uncovered' % (idx, n_subsets, ', '.join(candidate), uncov))
-                elif idx == 21:
-                    print('  ... (suppressing further output for this level) ...')
-
-        if found_at_level is not None:
-            best_basis = found_at_level
-            print('  ==> Size %d is feasible — continuing to smaller sizes ...' % subset_size)
+    if strategy == 'subsets':
+        best_basis, total_checked = _reduce_by_subsets(parsed_data, basis_variables, fixed_known, processes)
+    else:
+        is_basis = _BasisCheck(engine, fixed_known, target_variables)
+        if strategy == 'quickxplain':
+            print('\n--- QuickXplain ---')
+            best_basis = _reduce_by_quickxplain(is_basis, basis_variables)
         else:
-            # No valid subset at this level — stop and return the best we found
-            print('  ==> No valid guess basis of size %d.' % subset_size)
-            break
+            print('\n--- Deletion ---')
+            best_basis = _reduce_by_deletion(is_basis, basis_variables)
+        total_checked = is_basis.count
+        print('  ==> Inclusion-minimal guess basis of size %d' % len(best_basis))
+        if strategy == 'exact':
+            if max_steps is None:
+                max_steps = len(all_variables)
+            print('\n--- Exact minimization via SAT (max_steps = %d) ---' % max_steps)
+            best_basis = _reduce_exactly(parsed_data, fixed_known, basis_variables, best_basis,
+                                         max_steps, sat_solver, is_basis)
+            total_checked = is_basis.count
 
     elapsed = time.time() - start_time
     print('\n' + separator)
@@ -329,12 +614,191 @@ def reduce_basis(parsed_data, basis_variables):
     else:
         print('No smaller guess basis found via propagation.')
         print('The original basis of size %d is minimal (w.r.t. propagation).' % n)
-    print('Subsets tested:        %d' % total_checked)
+    print('%s %d' % ('Subsets tested:       ' if strategy == 'subsets' else 'Closures computed:    ', total_checked))
     print('Elapsed time:          %.4f seconds' % elapsed)
     print(separator)
     return best_basis
 
 
+
+
+class _BasisCheck:
+    """
+    Whether a subset of the basis (together with the fixed known variables)
+    determines all target variables; counts the closures computed
+    """
+
+    def __init__(self, engine, fixed_known, target_variables):
+        index = engine.var_index
+        self.engine = engine
+        self.fixed_ids = [index[v] for v in fixed_known]
+        self.target_ids = [index[v] for v in target_variables]
+        self.count = 0
+
+    def __call__(self, candidate):
+        self.count += 1
+        index = self.engine.var_index
+        level = self.engine.state(self.fixed_ids + [index[v] for v in candidate], record=False).level
+        return all(level[t] != -1 for t in self.target_ids)
+
+
+def _reduce_by_subsets(parsed_data, basis_variables, fixed_known, processes):
+    """
+    Level-wise enumeration of the subsets of decreasing size (see reduce_basis).
+    Returns (best basis, number of subsets tested)
+    """
+    from math import comb
+
+    n = len(basis_variables)
+    best_basis = list(basis_variables)
+    total_checked = 0
+
+    # The subsets of every level are scored in batches of growing size by
+    # the bit-parallel closure, so that a level with an early valid subset
+    # stays cheap
+    system = compile_relation_system(parsed_data=parsed_data)
+    batched = BatchedClosure(system, processes=processes)
+    index = system.var_index
+    fixed_ids = [index[v] for v in fixed_known]
+    max_batch = batched.chunk_lanes * batched.processes
+    try:
+        for drop in range(1, n):
+            subset_size = n - drop
+            n_subsets = comb(n, subset_size)
+            print('\n--- Trying subsets of size %d  (%d candidates) ---' % (subset_size, n_subsets))
+
+            found_at_level = None          # first valid candidate at this level
+            subsets = combinations(basis_variables, subset_size)
+            idx = 0
+            batch_size = 256
+            while found_at_level is None:
+                batch = list(islice(subsets, batch_size))
+                if not batch:
+                    break
+                uncovered = batched.uncovered([[index[v] for v in subset] for subset in batch], fixed_ids)
+                total_checked += len(batch)
+                for subset, uncov in zip(batch, uncovered.tolist()):
+                    idx += 1
+                    candidate = list(subset)
+                    if uncov == 0:
+                        print('  [%d/%d] {%s}  =>  VALID guess basis!' % (idx, n_subsets, ', '.join(candidate)))
+                        found_at_level = candidate   # keep the first valid one
+                        break                        # no need to check remaining subsets at this level
+                    if idx <= 20 or idx == n_subsets:
+                        print('  [%d/%d] {%s}  =>  %d target(s) uncovered' % (idx, n_subsets, ', '.join(candidate), uncov))
+                    elif idx == 21:
+                        print('  ... (suppressing further output for this level) ...')
+                batch_size = min(2 * batch_size, max_batch)
+
+            if found_at_level is not None:
+                best_basis = found_at_level
+                print('  ==> Size %d is feasible — continuing to smaller sizes ...' % subset_size)
+            else:
+                # No valid subset at this level — stop and return the best we found
+                print('  ==> No valid guess basis of size %d.' % subset_size)
+                break
+    finally:
+        batched.close()
+    return best_basis, total_checked
+
+
+def _reduce_by_deletion(is_basis, basis_variables):
+    """
+    Drop every variable of the basis in turn unless it is needed
+    """
+
+    current = list(basis_variables)
+    for v in basis_variables:
+        trial = [u for u in current if u != v]
+        if is_basis(trial):
+            current = trial
+            print('  drop %s  =>  still a guess basis (%d left)' % (v, len(current)))
+        else:
+            print('  keep %s' % v)
+    return current
+
+
+def _reduce_by_quickxplain(is_basis, basis_variables):
+    """
+    Inclusion-minimal subset of the basis by QuickXplain (divide and conquer)
+    """
+
+    if is_basis([]):
+        return []
+    found = set(_quickxplain(is_basis, [], False, list(basis_variables)))
+    return [v for v in basis_variables if v in found]
+
+
+def _quickxplain(is_basis, background, has_delta, candidates):
+    """
+    Return a minimal subset X of candidates such that background + X is a
+    guess basis, given that background + candidates is one
+    """
+
+    if has_delta and is_basis(background):
+        return []
+    if len(candidates) == 1:
+        return list(candidates)
+    half = len(candidates) // 2
+    first, second = candidates[:half], candidates[half:]
+    x2 = _quickxplain(is_basis, background + first, bool(first), second)
+    x1 = _quickxplain(is_basis, background + x2, bool(x2), first)
+    return x1 + x2
+
+
+def _reduce_exactly(parsed_data, fixed_known, basis_variables, upper_basis, max_steps, sat_solver, is_basis):
+    """
+    Search for a guess basis smaller than upper_basis among the subsets of
+    basis_variables with the incremental SAT model, until UNSAT
+    """
+    from pysat.card import ITotalizer
+    from .gdsat import ReduceGDtoSAT
+
+    if not upper_basis:
+        return upper_basis
+    # Only the fixed variables are known: the basis variables are the guesses
+    data = dict(parsed_data)
+    data['known_variables'] = list(fixed_known)
+    system = compile_relation_system(parsed_data=data)
+    sat_model = ReduceGDtoSAT(max_guess=len(upper_basis), max_steps=max_steps, sat_solver=sat_solver,
+                              drawgraph=False, system=system, stream=True)
+    sat_model.generate_sat_constraints()
+    sat_model.generate_boundary_no_cardinality()
+    cone = sat_model.cone
+    basis_ids = {system.var_index[v] for v in basis_variables}
+    # Basis variables which cannot influence the targets have no literal
+    basis_lits = {v: system.state_id(system.var_index[v], 0) for v in basis_variables
+                  if cone.state_live(system.var_index[v], 0)}
+    outside = [-system.state_id(v, 0) for v in cone.guess_candidates if v not in basis_ids]
+    itot = ITotalizer(lits=list(basis_lits.values()), ubound=len(upper_basis),
+                      top_id=sat_model.top_variable_identifier_so_far)
+    solver = sat_model.sat_solver
+    solver.append_formula(itot.cnf.clauses)
+    best_basis = list(upper_basis)
+    bound = len(best_basis) - 1
+    sat_calls = 0
+    while bound >= 0:
+        assumptions = outside + ([-itot.rhs[bound]] if bound < len(itot.rhs) else [])
+        iter_start = time.time()
+        sat_calls += 1
+        if not solver.solve(assumptions=assumptions):
+            print('  size <= %d:  UNSAT  (%0.2fs)' % (bound, time.time() - iter_start))
+            break
+        model = solver.get_model()
+        chosen = [v for v, lit in basis_lits.items() if model[lit - 1] > 0]
+        if not is_basis(chosen):
+            # Cannot happen: the SAT model is a bounded propagation
+            print('  size <= %d:  the SAT solution is not a guess basis, stopping' % bound)
+            break
+        print('  size <= %d:  SAT  — {%s}  (%0.2fs)' % (bound, ', '.join(chosen), time.time() - iter_start))
+        best_basis = chosen
+        bound = len(chosen) - 1
+    itot.delete()
+    solver.delete()
+    print('  ==> Minimum guess basis of size %d within %d steps (%d SAT calls)' % (len(best_basis), max_steps, sat_calls))
+    return best_basis
+
+
 if __name__ == '__main__':
     relation_file = "relationfile.txt"
     parsed_data = read_relation_file(relation_file, preprocess=0, D=2, log=0)
@@ -0,0 +1,139 @@
+'''
+Created on Oct 18, 2026
+
+@author: Hosein Hadipour
+@contact: hsn.hadipour@gmail.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+In case you use this tool please include the above copyright informations (name, contact, license)
+
+Persistent, content-addressed cache of parsed relation files.  Parsing is
+repeated by every run of a sweep, and with preprocess=1 it also runs the
+Macaulay preprocessing in Sage, which can take minutes on algebraic inputs.
+The entries are keyed by a hash of the contents of the file together with
+every option that changes the result, so editing the file (or changing D)
+simply misses the cache; the least recently used entries are evicted when
+the cache grows beyond CACHE_SIZE_LIMIT.
+'''
+
+import hashlib
+import os
+import pickle
+from autoguess.config import CACHE_DIR, CACHE_SIZE_LIMIT
+
+# Bumped whenever the layout of the parsed data changes
+CACHE_FORMAT = 1
+_enabled = os.environ.get("AUTOGUESS_NO_CACHE") is None
+
+
+def set_enabled(enabled):
+    """
+    Turn the cache on or off for this process (and the processes it forks)
+    """
+
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled():
+    return _enabled
+
+
+def cache_key(contents, **options):
+    """
+    Hash of the contents of a relation file and of the parsing options
+    """
+
+    digest = hashlib.sha256()
+    digest.update(('autoguess-cache-%d\n' % CACHE_FORMAT).encode())
+    for name in sorted(options):
+        digest.update(('%s=%r\n' % (name, options[name])).encode())
+    digest.update(contents.encode())
+    return digest.hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, key[:2], key + '.pickle')
+
+
+def load(key):
+    """
+    Return the cached object of the given key, or None on a miss
+    """
+
+    if not _enabled:
+        return None
+    path = _entry_path(key)
+    try:
+        with open(path, 'rb') as entry:
+            value = pickle.load(entry)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    try:
+        # Mark the entry as recently used
+        os.utime(path)
+    except OSError:
+        pass
+    return value
+
+
+def store(key, value):
+    """
+    Store an object under the given key, then evict the least recently used
+    entries beyond CACHE_SIZE_LIMIT.  Failing to write is not an error.
+    """
+
+    if not _enabled:
+        return
+    path = _entry_path(key)
+    temp_path = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, 'wb') as entry:
+            pickle.dump(value, entry, protocol=pickle.HIGHEST_PROTOCOL)
+        # Atomic, so that concurrent runs never read a partial entry
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return
+    evict(CACHE_SIZE_LIMIT)
+
+
+def evict(size_limit):
+    """
+    Remove the least recently used entries until the cache takes at most
+    size_limit bytes
+    """
+
+    entries = []
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if name.endswith('.pickle'):
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= size_limit:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
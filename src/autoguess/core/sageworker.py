@@ -0,0 +1,152 @@
+'''
+Created on Oct 18, 2026
+
+@author: Hosein Hadipour
+@contact: hsn.hadipour@gmail.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+In case you use this tool please include the above copyright informations (name, contact, license)
+
+Persistent Sage worker and entry point of the Macaulay preprocessing
+'''
+
+import atexit
+import json
+import os
+import subprocess
+import sys
+import threading
+
+
+class SageWorker:
+    """
+    SageWorker
+    A long-lived `sage -python3` process which runs the jobs sent to it over
+    a pipe.  Starting Sage takes several seconds, so one worker is kept for
+    the whole run and every preprocessing job reuses it: the polynomials are
+    sent to its stdin and the results are read back from its stdout, one
+    JSON document per line.  The log messages of the worker go to stderr.
+    """
+
+    def __init__(self, sage_path):
+        self.sage_path = sage_path
+        self.process = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.process = subprocess.Popen([self.sage_path, '-python3', os.path.abspath(__file__)],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        text=True, bufsize=1)
+
+    def run(self, job):
+        """
+        Send a job to the worker (which is started if needed) and return its
+        result
+        """
+
+        with self.lock:
+            if self.process is None or self.process.poll() is not None:
+                self.start()
+            try:
+                self.process.stdin.write(json.dumps(job) + '\n')
+                self.process.stdin.flush()
+                reply = self.process.stdout.readline()
+            except (BrokenPipeError, OSError):
+                reply = ''
+            if not reply:
+                self.process = None
+                raise RuntimeError('The Sage worker exited unexpectedly')
+        reply = json.loads(reply)
+        if 'error' in reply:
+            raise RuntimeError('The Sage worker failed: %s' % reply['error'])
+        return reply['result']
+
+    def close(self):
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+        self.process = None
+
+
+_worker = None
+
+
+def get_worker(sage_path):
+    """The shared SageWorker of this process"""
+
+    global _worker
+    if _worker is None:
+        _worker = SageWorker(sage_path)
+        atexit.register(_worker.close)
+    return _worker
+
+
+def macaulay_basis(polynomials, D=2, term_ordering='deglex'):
+    """
+    Run the Macaulay preprocessing on the given polynomials (a list of
+    strings) and return the derived polynomials as a list of strings.
+
+    The Macaulay class is called in-process when Sage (passagemath) is
+    importable, and otherwise inside the shared worker of the system Sage
+    installation.  Without Sage, the NumPy implementation of gf2macaulay.py
+    is used.
+    """
+
+    from autoguess.config import get_sage_importable, get_sage_path
+    if get_sage_importable():
+        from .macaulay import reduce_polynomials
+        return reduce_polynomials(polynomials, D=D, term_ordering=term_ordering)
+    if get_sage_path():
+        return get_worker(get_sage_path()).run({'task': 'macaulay', 'polynomials': polynomials,
+                                                'D': D, 'term_ordering': term_ordering})
+    print('Sage was not found: using the NumPy implementation of the Macaulay matrix')
+    from .gf2macaulay import reduce_polynomials
+    return reduce_polynomials(polynomials, D=D, term_ordering=term_ordering)
+
+
+def _run_job(job):
+    if job.get('task') == 'macaulay':
+        from macaulay import reduce_polynomials
+        return reduce_polynomials(job['polynomials'], D=job['D'], term_ordering=job['term_ordering'])
+    raise ValueError('unknown task %r' % job.get('task'))
+
+
+def serve():
+    """
+    Main loop of the worker, run by the Python interpreter of Sage: one job
+    per line of stdin, one reply per line of stdout
+    """
+
+    # macaulay.py is imported as a top-level module, since the package may
+    # not be installed in the Python environment of Sage
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    replies = sys.stdout
+    sys.stdout = sys.stderr
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            reply = {'result': _run_job(json.loads(line))}
+        except Exception as exc:
+            reply = {'error': '%s: %s' % (type(exc).__name__, exc)}
+        replies.write(json.dumps(reply) + '\n')
+        replies.flush()
+
+
+if __name__ == '__main__':
+    serve()
@@ -25,7 +25,7 @@ import subprocess
 import sys
 import io
 import time
-from autoguess.config import PATH_SAGE, SAGE_IMPORTABLE, TEMP_DIR
+from autoguess.config import get_sage_path, get_sage_importable, TEMP_DIR
 
 
 def _parse_extra_known(parameters):
@@ -43,8 +43,14 @@ def _findmin_descent(parameters, solver_type):
     the optimal value with full output.
 
     SAT uses incremental solving (ITotalizer + assumption-based bounds)
-    so the solver is created once and learned clauses are reused across
-    iterations.  SMT falls back to per-iteration construction.
+    and SMT passes the bound as an assumption to a single solver, so
+    in both cases the solver is created once and what it has learned is
+    reused across iterations.
+
+    Each search returns the interval [lower, upper] of the optimum that it
+    established (upper is None if no solution was found).  Unless lower
+    equals upper, a time limit stopped the search and upper is only the
+    best bound found.
     """
     if solver_type == 'sat':
         from .gdsat import ReduceGDtoSAT as SolverClass
@@ -67,7 +73,8 @@ def _findmin_descent(parameters, solver_type):
                 dglayout=parameters['dglayout'],
                 drawgraph=parameters.get('drawgraph', True),
                 log=parameters['log'],
-                extra_known=_ek)
+                extra_known=_ek,
+                prune=parameters.get('prune', True))
         else:
             solver = SolverClass(
                 inputfile_name=parameters['inputfile'],
@@ -81,7 +88,8 @@ def _findmin_descent(parameters, solver_type):
                 dglayout=parameters['dglayout'],
                 drawgraph=parameters.get('drawgraph', True),
                 log=parameters['log'],
-                extra_known=_ek)
+                extra_known=_ek,
+                prune=parameters.get('prune', True))
         if quiet:
             old_stdout = sys.stdout
             sys.stdout = io.StringIO()
@@ -105,33 +113,16 @@ def _findmin_descent(parameters, solver_type):
     total_start = time.time()
     _w = len(str(current_mg))  # width for aligned number columns
 
-    if solver_type == 'sat':
-        optimal = _findmin_sat_incremental(parameters, current_mg, _w)
+    if solver_type == 'sat' and (parameters.get('bisect', False) or parameters.get('probes', 1) > 1):
+        lower, upper = _findmin_sat_bisect(parameters, current_mg, _w)
+    elif solver_type == 'sat':
+        lower, upper = _findmin_sat_incremental(parameters, current_mg, _w)
     else:
-        # SMT: per-iteration construction (no incremental support yet)
-        optimal = None
-        while current_mg >= 0:
-            iter_start = time.time()
-            result, solver = _build_and_solve(current_mg, quiet=True)
-            iter_elapsed = time.time() - iter_start
-            if result is True:
-                n_guessed = len(solver.guessed_vars)
-                print(f'  max_guess = {current_mg:{_w}d}:  SAT  — a guess basis of size {n_guessed:{_w}d} exists  ({iter_elapsed:.2f}s)')
-                optimal = n_guessed
-                if n_guessed < current_mg:
-                    current_mg = n_guessed
-                else:
-                    current_mg -= 1
-            elif result is False:
-                print(f'  max_guess = {current_mg:{_w}d}:  UNSAT  ({iter_elapsed:.2f}s)')
-                break
-            else:
-                print(f'  max_guess = {current_mg:{_w}d}:  TIMEOUT  ({iter_elapsed:.2f}s)')
-                break
+        lower, upper = _findmin_smt_incremental(parameters, current_mg, _w)
 
     total_elapsed = time.time() - total_start
 
-    if optimal is None:
+    if upper is None and lower > current_mg:
         print('\n' + '#' * 60)
         print('FIND-MIN RESULT: no feasible solution found')
         print(f'Total findmin time: {total_elapsed:.2f}s')
@@ -139,47 +130,57 @@ def _findmin_descent(parameters, solver_type):
         print('#' * 60)
         return
 
-    if optimal == 0:
+    if upper is None:
+        print('\n' + '#' * 60)
+        print('FIND-MIN RESULT: TIMEOUT: no bound established')
+        print(f'Total findmin time: {total_elapsed:.2f}s')
+        print(f'The solver was interrupted at max_guess = {current_mg}.')
+        print('Increase the time limit and try again.')
+        print('#' * 60)
+        return
+
+    if upper == 0:
         print('\n' + '#' * 60)
         print('FIND-MIN RESULT: minimum number of guesses = 0')
         print(f'Total findmin time: {total_elapsed:.2f}s')
         print('#' * 60)
         return
 
-    # Re-solve at optimal with full output
+    # Re-solve at the best bound with full output
     print('\n' + '#' * 60)
-    print(f'FIND-MIN RESULT: minimum number of guesses = {optimal}')
+    if lower < upper:
+        print(f'FIND-MIN RESULT: best basis found: {upper}, lower bound: {lower}, not proven optimal')
+    else:
+        print(f'FIND-MIN RESULT: minimum number of guesses = {upper}')
     print(f'Total findmin time: {total_elapsed:.2f}s')
     print('#' * 60)
-    print(f'\nRe-solving with max_guess = {optimal} for detailed output ...\n')
+    if lower < upper:
+        print(f'\nRe-solving with max_guess = {upper} (best basis found, not proven optimal) for detailed output ...\n')
+    else:
+        print(f'\nRe-solving with max_guess = {upper} for detailed output ...\n')
     print('(Note: the timings below are for this single verification')
     print(' solve only, not for the entire findmin search.)\n')
-    _build_and_solve(optimal, quiet=False)
+    _build_and_solve(upper, quiet=False)
     print(f'\nTotal findmin search time: {total_elapsed:.2f}s')
 
 
-def _findmin_sat_incremental(parameters, start_mg, _w):
+def _findmin_sat_setup(parameters, start_mg, stream):
     """
-    Incremental SAT-based findmin.
-
-    For unweighted problems: uses PySAT's ITotalizer with assumption-based
-    bounds.  The SAT solver is created once; structural constraints and
-    totalizer encoding are added once.  Each iteration only changes the
-    assumption literal, so the solver reuses all previously learned clauses.
-
-    For weighted problems: the input is parsed once and structural
-    constraints are generated once, but the PB cardinality constraint
-    is rebuilt per iteration (still saves parsing + constraint generation).
+    Parse the input and generate the SAT model without its cardinality
+    constraint, once for a whole findmin search.  stream=None streams the
+    clauses into the live solver for unweighted problems only.
     """
     from .gdsat import ReduceGDtoSAT
-    from pysat import solvers as pysat_solvers
-    from pysat.card import ITotalizer
-    from pysat import pb
+    from .compiledsystem import compile_relation_system
 
     # Create solver object ONCE (parses input, generates deductions) — quietly
     old_stdout = sys.stdout
     sys.stdout = io.StringIO()
     try:
+        system = compile_relation_system(parameters['inputfile'],
+                                         preprocess=parameters['preprocess'],
+                                         D=parameters['D'],
+                                         extra_known=_parse_extra_known(parameters))
         solver_obj = ReduceGDtoSAT(
             inputfile_name=parameters['inputfile'],
             outputfile_name=parameters['outputfile'],
@@ -192,17 +193,104 @@ def _findmin_sat_incremental(parameters, start_mg, _w):
             dglayout=parameters['dglayout'],
             drawgraph=False,
             log=0,
-            extra_known=_parse_extra_known(parameters))
+            system=system,
+            prune=parameters.get('prune', True),
+            stream=system.weights is None if stream is None else stream,
+            hint=parameters.get('hint'))
         solver_obj.generate_sat_constraints()
         solver_obj.generate_boundary_no_cardinality()
+        if solver_obj.sat_solver is not None:
+            solver_obj.apply_hint(solver_obj.sat_solver)
+    finally:
+        sys.stdout = old_stdout
+
+    return solver_obj
+
+
+def _findmin_smt_incremental(parameters, start_mg, _w):
+    """
+    Incremental SMT-based findmin.  The input is parsed and the structural
+    constraints are asserted once; each bound on max_guess is passed to the
+    check as an assumption, so the solver keeps its state and learned lemmas
+    across iterations.  Each check is stopped after time_limit seconds.
+    Returns the interval (lower, upper) of the optimum, see _findmin_descent.
+    """
+    from .gdsmt import ReduceGDtoSMT
+
+    old_stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        solver_obj = ReduceGDtoSMT(
+            inputfile_name=parameters['inputfile'],
+            outputfile_name=parameters['outputfile'],
+            max_guess=start_mg,
+            max_steps=parameters['maxsteps'],
+            smt_solver_name=parameters['smtsolver'],
+            tikz=parameters['tikz'],
+            preprocess=parameters['preprocess'],
+            D=parameters['D'],
+            dglayout=parameters['dglayout'],
+            drawgraph=False,
+            log=0,
+            extra_known=_parse_extra_known(parameters),
+            prune=parameters.get('prune', True))
+        solver_obj.make_incremental_model()
     finally:
         sys.stdout = old_stdout
 
+    time_limit = parameters['timelimit']
+    current_mg = start_mg
+    lower, upper = 0, None
+    while current_mg >= 0:
+        iter_start = time.time()
+        result, n_guessed = solver_obj.solve_with_bound(current_mg, time_limit)
+        iter_elapsed = time.time() - iter_start
+        if result is True:
+            print(f'  max_guess = {current_mg:{_w}d}:  SAT  — a guess basis of size {n_guessed:{_w}d} exists  ({iter_elapsed:.2f}s)')
+            upper = n_guessed
+            if n_guessed < current_mg:
+                current_mg = n_guessed
+            else:
+                current_mg -= 1
+        elif result is False:
+            print(f'  max_guess = {current_mg:{_w}d}:  UNSAT  ({iter_elapsed:.2f}s)')
+            lower = current_mg + 1
+            break
+        else:
+            print(f'  max_guess = {current_mg:{_w}d}:  TIMEOUT  ({iter_elapsed:.2f}s)')
+            break
+
+    return lower, upper
+
+
+def _findmin_sat_incremental(parameters, start_mg, _w):
+    """
+    Incremental SAT-based findmin.
+
+    For unweighted problems: uses PySAT's ITotalizer with assumption-based
+    bounds.  The SAT solver is created once; structural constraints and
+    totalizer encoding are added once.  Each iteration only changes the
+    assumption literal, so the solver reuses all previously learned clauses.
+
+    For weighted problems: the input is parsed once and structural
+    constraints are generated once, but the PB cardinality constraint
+    is rebuilt per iteration (still saves parsing + constraint generation).
+
+    Returns the interval (lower, upper) of the optimum, see _findmin_descent.
+    """
+    from pysat import solvers as pysat_solvers
+    from pysat.card import ITotalizer
+    from pysat import pb
+
+    # Unweighted problems stream the clauses into the solver used for the
+    # whole descent; weighted ones keep them to rebuild a solver per bound
+    solver_obj = _findmin_sat_setup(parameters, start_mg, stream=None)
+
     lits, weights = solver_obj.get_cardinality_lits()
     has_weights = weights is not None
     n_lits = len(lits)
     current_mg = start_mg
-    optimal = None
+    lower, upper = 0, None
 
     if not has_weights:
         # ── Unweighted: ITotalizer + assumptions (fully incremental) ──
@@ -210,8 +298,7 @@ def _findmin_sat_incremental(parameters, start_mg, _w):
         itot = ITotalizer(lits=lits, ubound=ubound,
                           top_id=solver_obj.top_variable_identifier_so_far)
 
-        sat = pysat_solvers.Solver(name=parameters['satsolver'])
-        sat.append_formula(solver_obj.cnf_formula)
+        sat = solver_obj.sat_solver
         for cl in itot.cnf.clauses:
             sat.add_clause(cl)
 
@@ -230,13 +317,14 @@ def _findmin_sat_incremental(parameters, start_mg, _w):
                 model = sat.get_model()
                 n_guessed = sum(1 for l in lits if model[l - 1] > 0)
                 print(f'  max_guess = {current_mg:{_w}d}:  SAT  — a guess basis of size {n_guessed:{_w}d} exists  ({iter_elapsed:.2f}s)')
-                optimal = n_guessed
+                upper = n_guessed
                 if n_guessed < current_mg:
                     current_mg = n_guessed
                 else:
                     current_mg -= 1
             elif result is False:
                 print(f'  max_guess = {current_mg:{_w}d}:  UNSAT  ({iter_elapsed:.2f}s)')
+                lower = current_mg + 1
                 break
             else:
                 print(f'  max_guess = {current_mg:{_w}d}:  TIMEOUT  ({iter_elapsed:.2f}s)')
@@ -270,7 +358,8 @@ def _findmin_sat_incremental(parameters, start_mg, _w):
                 weighted_cost = sum(w for l, w in zip(lits, weights)
                                     if model[l - 1] > 0)
                 print(f'  max_guess = {current_mg:{_w}d}:  SAT  — size {n_guessed:{_w}d} (weight {weighted_cost}) exists  ({iter_elapsed:.2f}s)')
-                optimal = n_guessed
+                # The bound constrains the weighted cost, so does the interval
+                upper = weighted_cost
                 # Jump based on weighted cost (that is what the bound constrains)
                 if weighted_cost < current_mg:
                     current_mg = weighted_cost
@@ -278,6 +367,7 @@ def _findmin_sat_incremental(parameters, start_mg, _w):
                     current_mg -= 1
             elif result is False:
                 print(f'  max_guess = {current_mg:{_w}d}:  UNSAT  ({iter_elapsed:.2f}s)')
+                lower = current_mg + 1
                 break
             else:
                 print(f'  max_guess = {current_mg:{_w}d}:  TIMEOUT  ({iter_elapsed:.2f}s)')
@@ -285,7 +375,227 @@ def _findmin_sat_incremental(parameters, start_mg, _w):
 
             sat.delete()
 
-    return optimal
+    return lower, upper
+
+
+def _probe_worker(probe, bound, results):
+    """Run one findmin probe in a forked process (see _findmin_sat_bisect)"""
+    results.put((bound,) + probe(bound, -1))
+
+
+def _findmin_sat_bisect(parameters, start_mg, _w):
+    """
+    Bound probing for findmin: binary search over the bound on the (weighted)
+    number of guesses, instead of decreasing it one step at a time.
+
+    The SAT model is built once.  Unweighted bounds are the outputs of an
+    ITotalizer, weighted ones are PB encodings guarded by a selector literal,
+    so every probe is a single call under assumptions.  The interval
+    [lower, upper] of the optimum is tightened as the answers arrive:
+    a SAT probe lowers the upper bound to the cost of its model, an UNSAT
+    probe at bound b raises the lower bound to b + 1.
+
+    With probes > 1, that many bounds, evenly spread over the interval, are
+    solved at once, each in a forked copy of the solver.  Probes that become
+    useless are cancelled, and each one is stopped after time_limit seconds.
+    A bound whose probe timed out is not tried again, and the search stops
+    when all bounds left in the interval timed out.  Returns the interval
+    (lower, upper), see _findmin_descent.
+    """
+    import multiprocessing
+    import queue
+    from pysat.card import ITotalizer
+    from pysat import pb
+
+    solver_obj = _findmin_sat_setup(parameters, start_mg, stream=True)
+    sat = solver_obj.sat_solver
+    lits, weights = solver_obj.get_cardinality_lits()
+    time_limit = parameters['timelimit']
+    number_of_probes = max(1, parameters.get('probes', 1))
+    top_id = solver_obj.top_variable_identifier_so_far
+    if weights is None:
+        itot = ITotalizer(lits=lits, ubound=min(start_mg + 1, len(lits)), top_id=top_id)
+        sat.append_formula(itot.cnf.clauses)
+    else:
+        itot = None
+        # Selector literal of the PB encoding of each bound tried so far
+        selectors = {}
+
+    def cost_of(model):
+        if weights is None:
+            return sum(1 for l in lits if model[l - 1] > 0)
+        return sum(w for l, w in zip(lits, weights) if model[l - 1] > 0)
+
+    def probe(bound, probe_time_limit):
+        """Solve with cost <= bound.  Returns (result, cost of the model)"""
+        nonlocal top_id
+        if itot is not None:
+            assumptions = [-itot.rhs[bound]] if bound < len(itot.rhs) else []
+        else:
+            if bound not in selectors:
+                card = pb.PBEnc.leq(lits=lits, weights=weights, bound=bound,
+                                    top_id=top_id, encoding=pb.EncType.binmerge)
+                selectors[bound] = max(card.nv, top_id) + 1
+                top_id = selectors[bound]
+                sat.append_formula([cl + [-selectors[bound]] for cl in card.clauses])
+            assumptions = [selectors[bound]]
+        result = solver_obj._solve_limited(sat, assumptions=assumptions, time_limit=probe_time_limit)
+        return result, cost_of(sat.get_model()) if result else None
+
+    lower, upper = 0, None
+    timed_out = set()
+
+    def report(bound, result, cost, elapsed):
+        nonlocal lower, upper
+        if result:
+            upper = cost if upper is None else min(upper, cost)
+            status = f'SAT  — cost {cost:{_w}d}'
+        elif result is False:
+            lower = max(lower, bound + 1)
+            status = 'UNSAT'
+        else:
+            timed_out.add(bound)
+            status = 'TIMEOUT'
+        interval = f'[{lower}, {upper}]' if upper is not None else f'[{lower}, ?]'
+        print(f'  max_guess = {bound:{_w}d}:  {status:<{12 + _w}s}  interval {interval}  ({elapsed:.2f}s)')
+
+    # Establish an upper bound first
+    iter_start = time.time()
+    result, cost = probe(start_mg, time_limit)
+    report(start_mg, result, cost, time.time() - iter_start)
+    if not result:
+        # UNSAT raised lower above start_mg, a timeout left it untouched
+        sat.delete()
+        return lower, None
+
+    forking = number_of_probes > 1
+    if forking:
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+    while lower < upper:
+        candidates = [b for b in range(lower, upper) if b not in timed_out]
+        if not candidates:
+            break
+        step = len(candidates) / (number_of_probes + 1)
+        bounds = sorted(set(candidates[int(step * (i + 1))] for i in range(number_of_probes)))
+        if not forking:
+            iter_start = time.time()
+            result, cost = probe(bounds[0], time_limit)
+            report(bounds[0], result, cost, time.time() - iter_start)
+            continue
+        running = {}
+        for bound in bounds:
+            process = context.Process(target=_probe_worker, args=(probe, bound, results), daemon=True)
+            process.start()
+            running[bound] = (process, time.time())
+        try:
+            while running:
+                try:
+                    bound, result, cost = results.get(timeout=0.1)
+                except queue.Empty:
+                    bound = None
+                if bound in running:
+                    report(bound, result, cost, time.time() - running.pop(bound)[1])
+                # Cancel the probes that timed out or can no longer tighten the
+                # interval, and give up on the ones that crashed
+                for b, (process, started) in list(running.items()):
+                    expired = time_limit != -1 and time.time() - started > time_limit
+                    if expired or process.exitcode not in (None, 0):
+                        report(b, None, None, time.time() - started)
+                    if expired or process.exitcode not in (None, 0) or not lower <= b < upper:
+                        process.terminate()
+                        process.join()
+                        del running[b]
+        finally:
+            for process, _ in running.values():
+                process.terminate()
+                process.join()
+
+    if lower < upper:
+        print(f'  The interval [{lower}, {upper}] could not be closed within the time limit')
+    sat.delete()
+    return lower, upper
+
+
+def _make_backend(solver, parameters):
+    """
+    Create the CP, CP-SAT, MILP, SAT, SMT, MaxSAT or local search model builder for the given parameters
+    """
+
+    common = dict(inputfile_name=parameters['inputfile'],
+                  outputfile_name=parameters['outputfile'],
+                  max_guess=parameters['maxguess'],
+                  max_steps=parameters['maxsteps'],
+                  tikz=parameters['tikz'],
+                  preprocess=parameters['preprocess'],
+                  D=parameters['D'],
+                  dglayout=parameters['dglayout'],
+                  drawgraph=parameters.get('drawgraph', True),
+                  log=parameters['log'],
+                  extra_known=_parse_extra_known(parameters),
+                  prune=parameters.get('prune', True))
+    if solver == 'cp':
+        from .gdcp import ReduceGDtoCP
+        return ReduceGDtoCP(cp_solver_name=parameters['cpsolver'],
+                            cp_optimization=parameters['cpoptimization'],
+                            threads=parameters.get('threads', 0),
+                            hint=parameters.get('hint'),
+                            **common)
+    elif solver == 'milp' and parameters.get('milpsolver') == 'highs':
+        from .gdhighs import ReduceGDtoHiGHS
+        return ReduceGDtoHiGHS(direction=parameters['milpdirection'],
+                               threads=parameters.get('threads', 0),
+                               **common)
+    elif solver == 'milp':
+        from .gdmilp import ReduceGDtoMILP
+        return ReduceGDtoMILP(direction=parameters['milpdirection'],
+                              threads=parameters.get('threads', 0),
+                              hint=parameters.get('hint'),
+                              **common)
+    elif solver == 'sat':
+        from .gdsat import ReduceGDtoSAT
+        return ReduceGDtoSAT(sat_solver=parameters['satsolver'], hint=parameters.get('hint'), **common)
+    elif solver == 'smt':
+        from .gdsmt import ReduceGDtoSMT
+        return ReduceGDtoSMT(smt_solver_name=parameters['smtsolver'], **common)
+    elif solver == 'cpsat':
+        from .gdcpsat import ReduceGDtoCPSAT
+        return ReduceGDtoCPSAT(cp_optimization=parameters['cpoptimization'],
+                               threads=parameters.get('threads', 0),
+                               hint=parameters.get('hint'),
+                               **common)
+    elif solver == 'maxsat':
+        from .gdmaxsat import ReduceGDtoMaxSAT
+        return ReduceGDtoMaxSAT(sat_solver=parameters['satsolver'],
+                                stratified=parameters.get('stratify', False),
+                                **common)
+    elif solver == 'localsearch':
+        from .localsearch import LocalSearch
+        return LocalSearch(threads=parameters.get('threads', 0), **common)
+    raise ValueError('Unknown solver: %s' % solver)
+
+
+def _solve_backend(solver, gd, parameters):
+    """
+    Build the model of a backend created by _make_backend and solve it.
+    Returns True (solution found), False (UNSAT/infeasible) or None.
+    """
+
+    gd.time_limit = parameters['timelimit']
+    if solver == 'sat' and parameters.get('deepen', False):
+        return gd.deepen() is not None
+    gd.make_model()
+    if solver in ('cp', 'cpsat'):
+        return gd.solve_via_cpsolver()
+    elif solver == 'milp':
+        return gd.solve_model()
+    elif solver == 'sat':
+        return gd.solve_via_satsolver()
+    elif solver == 'maxsat':
+        return gd.solve_via_maxsat()
+    elif solver == 'localsearch':
+        return gd.solve_via_localsearch()
+    return gd.solve_via_smtsolver()
 
 
 def search_using_cp(parameters):
@@ -294,80 +604,89 @@ def search_using_cp(parameters):
     and then solve it
     """
 
-    from .gdcp import ReduceGDtoCP
-
-    gdsmt = ReduceGDtoCP(inputfile_name=parameters['inputfile'],
-                    outputfile_name=parameters['outputfile'],
-                    max_guess=parameters['maxguess'],
-                    max_steps=parameters['maxsteps'],
-                    cp_solver_name=parameters['cpsolver'],
-                    cp_optimization=parameters['cpoptimization'],
-                    tikz=parameters['tikz'],
-                    preprocess=parameters['preprocess'],
-                    D=parameters['D'],
-                    dglayout=parameters['dglayout'],
-                    drawgraph=parameters.get('drawgraph', True),
-                    log=parameters['log'],
-                    threads=parameters.get('threads', 0),
-                    extra_known=_parse_extra_known(parameters))
-    gdsmt.make_model()
-    gdsmt.time_limit = parameters['timelimit']
-    gdsmt.solve_via_cpsolver()
+    return _solve_backend('cp', _make_backend('cp', parameters), parameters)
+
+def search_using_cpsat(parameters):
+    """
+    Convert the guess-and-determine or key-bridging problem to a CP-SAT model
+    through the OR-Tools API (no MiniZinc), and then solve it
+    """
+
+    return _solve_backend('cpsat', _make_backend('cpsat', parameters), parameters)
 
 def search_using_milp(parameters):
     """
     Convert the guess-and-determine or key-bridging problem to an MILP problem, 
     and then solve it
     """
-    
-    from .gdmilp import ReduceGDtoMILP
-    
-    gdmilp = ReduceGDtoMILP(inputfile_name=parameters['inputfile'],
-                        outputfile_name=parameters['outputfile'],
-                        max_guess=parameters['maxguess'],
-                        max_steps=parameters['maxsteps'],
-                        direction=parameters['milpdirection'],
-                        tikz=parameters['tikz'],
-                        preprocess=parameters['preprocess'],
-                        D=parameters['D'],
-                        dglayout=parameters['dglayout'],
-                        drawgraph=parameters.get('drawgraph', True),
-                        log=parameters['log'],
-                        threads=parameters.get('threads', 0),
-                        extra_known=_parse_extra_known(parameters))
-    gdmilp.make_model()
-    gdmilp.time_limit = parameters['timelimit']
-    gdmilp.solve_model()
+
+    return _solve_backend('milp', _make_backend('milp', parameters), parameters)
 
 def search_using_sat(parameters):
     """
     Convert the guess-and-detrmine or key-bridging problem to a SAT problem,
     and then solve it.  When findmin is enabled, iteratively decrease max_guess
     until the model becomes UNSAT, returning the minimum number of guesses.
+    When deepen is enabled, find the smallest number of steps (up to
+    max_steps) for which max_guess guesses suffice.
     """
-    from .gdsat import ReduceGDtoSAT
 
     findmin = parameters.get('findmin', False)
+    if parameters.get('enumerate'):
+        return _enumerate_sat_bases(parameters)
     if not findmin:
         # Single-shot mode (original behaviour)
-        gdsat = ReduceGDtoSAT(inputfile_name=parameters['inputfile'],
-                            outputfile_name=parameters['outputfile'],
-                            max_guess=parameters['maxguess'],
-                            max_steps=parameters['maxsteps'],
-                            sat_solver=parameters['satsolver'],
-                            tikz=parameters['tikz'],
-                            preprocess=parameters['preprocess'],
-                            D=parameters['D'],
-                            dglayout=parameters['dglayout'],
-                            drawgraph=parameters.get('drawgraph', True),
-                            log=parameters["log"],
-                            extra_known=_parse_extra_known(parameters))
-        gdsat.make_model()
-        gdsat.time_limit = parameters['timelimit']
-        gdsat.solve_via_satsolver()
+        return _solve_backend('sat', _make_backend('sat', parameters), parameters)
     else:
         _findmin_descent(parameters, solver_type='sat')
 
+def _enumerate_sat_bases(parameters):
+    """
+    --enumerate: stream up to N guess bases out of one incremental SAT model
+    (see ReduceGDtoSAT.enumerate_bases), printing them and writing them as
+    JSON lines into the output file as soon as they are found.  -tl is the
+    deadline of the whole enumeration.
+    """
+    import json
+
+    gd = _make_backend('sat', parameters)
+    gd.make_model()
+    limit = parameters['enumerate']
+    block_supersets = parameters.get('blocksupersets', False)
+    time_limit = parameters['timelimit']
+    start_time = time.time()
+    deadline = None if time_limit == -1 else start_time + time_limit
+    weights = gd.system.weights
+    print('-' * 60)
+    print('ENUMERATION (up to %d %s)' % (limit, 'inclusion-minimal bases' if block_supersets else 'bases'))
+    print('-' * 60)
+    number_of_bases = 0
+    with open(parameters['outputfile'], 'w') as outputfile:
+        for basis in gd.enumerate_bases(limit, block_supersets, deadline):
+            number_of_bases += 1
+            elapsed_time = time.time() - start_time
+            record = {'index': number_of_bases, 'size': len(basis), 'basis': basis,
+                      'elapsed': round(elapsed_time, 3)}
+            if weights is not None:
+                record['weight'] = sum(weights[gd.system.var_index[v]] for v in basis)
+            print('  Basis %d: %d guessed variable(s)  (%0.2fs)' % (number_of_bases, len(basis), elapsed_time), flush=True)
+            print('    %s' % ', '.join(basis))
+            outputfile.write(json.dumps(record) + '\n')
+            outputfile.flush()
+    gd.sat_solver.delete()
+    gd.sat_solver = None
+    status = gd.enumeration_status
+    print('\n' + '=' * 60)
+    print('ENUMERATION RESULT: %d guess basis/bases in %0.2f seconds' % (number_of_bases, time.time() - start_time))
+    print({'complete': 'All the guess bases within max_guess and max_steps were found.',
+           'limit': 'Stopped after %d bases (there may be more).' % limit,
+           'timeout': 'Stopped at the time limit (there may be more).'}[status])
+    print('Written to: %s' % parameters['outputfile'])
+    print('=' * 60)
+    if number_of_bases > 0:
+        return True
+    return False if status == 'complete' else None
+
 def search_using_smt(parameters):
     """
     Convert the guess-and-determine or key-bridging problem to a SMT problem,
@@ -375,40 +694,73 @@ def search_using_smt(parameters):
     until the model becomes UNSAT, returning the minimum number of guesses.
     """
 
-    from .gdsmt import ReduceGDtoSMT
-
     findmin = parameters.get('findmin', False)
     if not findmin:
         # Single-shot mode (original behaviour)
-        gdsmt = ReduceGDtoSMT(inputfile_name=parameters['inputfile'],
-                            outputfile_name=parameters['outputfile'],
-                            max_guess=parameters['maxguess'],
-                            max_steps=parameters['maxsteps'],
-                            smt_solver_name=parameters['smtsolver'],
-                            tikz=parameters['tikz'],
-                            preprocess=parameters['preprocess'],
-                            D=parameters['D'],
-                            dglayout=parameters['dglayout'],
-                            drawgraph=parameters.get('drawgraph', True),
-                            log=parameters['log'],
-                            extra_known=_parse_extra_known(parameters))
-        gdsmt.make_model()
-        gdsmt.time_limit = parameters['timelimit']
-        gdsmt.solve_via_smtsolver()
+        return _solve_backend('smt', _make_backend('smt', parameters), parameters)
     else:
         _findmin_descent(parameters, solver_type='smt')
 
+def search_using_maxsat(parameters):
+    """
+    Convert the problem of finding a minimum guess basis to a weighted partial
+    MaxSAT problem, and then solve it via RC2
+    """
+
+    return _solve_backend('maxsat', _make_backend('maxsat', parameters), parameters)
+
+def search_using_localsearch(parameters):
+    """
+    Search for a small guess basis by simulated annealing, using the
+    propagation engine as the fitness oracle (see localsearch.py)
+    """
+
+    return _solve_backend('localsearch', _make_backend('localsearch', parameters), parameters)
+
+def search_using_portfolio(parameters):
+    """
+    Race the available CP, MILP, SAT and SMT backends in parallel processes,
+    and report the first one that solves the problem (see portfolio.py)
+    """
+
+    from .portfolio import run_portfolio
+    return run_portfolio(parameters)
+
 def search_using_groebnerbasis(parameters):
     """
     Convert the guess-and-determine or key-bridging problem to the problem of computing Groebner basis,
     and then solve it.
 
-    Prefers *passagemath* (``sage`` importable in the current Python);
-    falls back to a system SageMath binary if available.
+    Prefers *passagemath* (``sage`` importable in the current Python), in
+    which case the solver runs in-process; falls back to a system SageMath
+    binary if available.
     """
+    if get_sage_importable():
+        # passagemath is installed – run gdgroebner in-process, so that the
+        # polynomials never leave memory
+        from .gdgroebner import ReduceGDtoGroebner
+        gdgroebner = ReduceGDtoGroebner(inputfile_name=parameters['inputfile'],
+                                        outputfile_name=parameters['outputfile'],
+                                        preprocess=parameters['preprocess'],
+                                        D=parameters['D'],
+                                        term_ordering=parameters['term_ordering'],
+                                        overlapping_number=parameters['overlapping_number'],
+                                        temp_dir=TEMP_DIR,
+                                        cnf_to_anf_conversion=parameters['cnf_to_anf_conversion'],
+                                        log=parameters['log'],
+                                        extra_known=_parse_extra_known(parameters))
+        gdgroebner.make_model()
+        gdgroebner.solve()
+        return
+    if not get_sage_path():
+        raise RuntimeError(
+            "Groebner solver requires passagemath (pip install 'autoguess[groebner]') "
+            "or a system SageMath installation, but neither was found."
+        )
+
+    # Fall back to the system SageMath binary
     import pathlib
     _gdgroebner_path = str(pathlib.Path(__file__).parent / "gdgroebner.py")
-
     args = [
         "--inputfile", parameters['inputfile'],
         "--output", parameters['outputfile'],
@@ -423,19 +775,7 @@ def search_using_groebnerbasis(parameters):
     known_str = parameters.get('known', None)
     if known_str:
         args.extend(["--known", known_str])
-
-    if SAGE_IMPORTABLE:
-        # passagemath is installed – run gdgroebner as a module with current Python
-        cmd = [sys.executable, "-m", "autoguess.core.gdgroebner"] + args
-    elif PATH_SAGE:
-        # Fall back to the system SageMath binary
-        cmd = [PATH_SAGE, "-python3", _gdgroebner_path] + args
-    else:
-        raise RuntimeError(
-            "Groebner solver requires passagemath (pip install 'autoguess[groebner]') "
-            "or a system SageMath installation, but neither was found."
-        )
-
+    cmd = [get_sage_path(), "-python3", _gdgroebner_path] + args
     subprocess.call(cmd)
 
 def search_using_mark(parameters):
@@ -484,7 +824,11 @@ def search_using_propagate(parameters):
         if not extra_known:
             print("Error: --reducebasis requires -kn with the initial guess basis to reduce.")
             return
-        reduce_basis(parsed_data=parsed_data, basis_variables=extra_known)
+        reduce_basis(parsed_data=parsed_data, basis_variables=extra_known,
+                     processes=parameters.get('threads', 0),
+                     strategy=parameters.get('reducestrategy', 'subsets'),
+                     max_steps=parameters.get('maxsteps'),
+                     sat_solver=parameters.get('satsolver', 'cadical153'))
     else:
         from .propagate import propagate_knowledge
         known_variables = list(parsed_data.get('known_variables', []))
@@ -0,0 +1,147 @@
+'''
+Created on Oct 18, 2026
+
+@author: Hosein Hadipour
+@contact: hsn.hadipour@gmail.com
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+In case you use this tool please include the above copyright informations (name, contact, license)
+
+Warm starts: a known guess basis (a list of variables, the output file of a
+previous run, or the greedy heuristic) is turned into a full assignment of the
+unrolled model, which the exact backends use as a hint (PySAT phases,
+CP-SAT hints, MiniZinc warm_start annotations, Gurobi MIP starts).
+'''
+
+import os
+import numpy as np
+from .propagate import PropagationEngine, greedy_guess_basis
+
+
+def read_hint(hint):
+    """
+    Return the list of variable names of a hint, which is either a
+    comma-separated list of variables or the output file of a previous run
+    (the line following "... variable(s) are guessed:")
+    """
+
+    if not os.path.isfile(hint):
+        return [v.strip() for v in hint.split(',') if v.strip()]
+    with open(hint, 'r') as hint_file:
+        lines = hint_file.read().splitlines()
+    for i, line in enumerate(lines):
+        if line.rstrip().endswith('variable(s) are guessed:'):
+            guessed = lines[i + 1] if i + 1 < len(lines) else ''
+            # Drop the "(represents: ...)" notes of the dummy variables
+            return [v.split(' (')[0].strip() for v in guessed.split(', ') if v.strip()]
+    raise ValueError('No guessed variables found in the hint file %s' % hint)
+
+
+class WarmStart:
+    """
+    Full step-by-step assignment of the unrolled model for a hinted guess
+    basis.  The states come from the propagation engine (the variable v is
+    known at step s iff its iteration is at most s), and a path variable
+    (d, s) is true iff all the dependencies of deduction d are known at
+    step s - 1, so the assignment satisfies all the step constraints; it
+    is only infeasible if the basis exceeds max_guess or does not determine
+    the targets within max_steps.
+
+    hint:   comma-separated variables, a result file, or 'greedy' for the
+            basis of propagate.greedy_guess_basis
+    """
+
+    def __init__(self, system, cone, hint, max_steps):
+        self.system = system
+        self.cone = cone
+        self.max_steps = max_steps
+        if hint == 'greedy':
+            greedy = greedy_guess_basis(system.parsed_data)
+            names = greedy[0] if greedy is not None else []
+        else:
+            names = read_hint(hint)
+        notguessed = set(system.notguessed_variables)
+        self.basis = []
+        for v in names:
+            if v not in system.var_index:
+                print('Hint: unknown variable %s is ignored' % v)
+            elif v in notguessed:
+                print('Hint: %s cannot be guessed, and is ignored' % v)
+            elif v not in self.basis:
+                self.basis.append(v)
+        engine = PropagationEngine(system.variables, system.symmetric_relations, system.implication_relations)
+        basis_ids = [system.var_index[v] for v in self.basis]
+        level = np.array(engine.state(system.known + basis_ids, record=False).level)
+        levels = level[system.targets]
+        self.undetermined = int(np.count_nonzero((levels == -1) | (levels > max_steps)))
+        self.depth = int(levels.max(initial=0)) if self.undetermined == 0 else None
+        steps = np.arange(max_steps + 1)[:, None]
+        self.states = (level >= 0) & (level <= steps)
+        # dep_missing[s - 1][d]: number of dependencies of d unknown at step s - 1
+        m = system.num_of_deductions
+        dep_idx = np.frombuffer(system.dep_idx, dtype=np.int32)
+        dep_of = np.repeat(np.arange(m), np.diff(np.frombuffer(system.dep_ptr, dtype=np.int32)))
+        self.paths = np.array([np.bincount(dep_of, weights=~state[dep_idx], minlength=m) == 0
+                               for state in self.states[:-1]]).reshape(max_steps, m)
+
+    def summary(self):
+        text = 'Hint: %d guessed variable(s)' % len(self.basis)
+        if self.depth is not None:
+            return text + ', all targets determined within %d step(s)' % self.depth
+        return text + ', %d target(s) not determined within %d step(s) (partial hint)' % (
+            self.undetermined, self.max_steps)
+
+    def live_states(self, cone=None):
+        """
+        The states, with the variables pruned by the cone of influence (which
+        the models fix to false) set to false
+        """
+
+        cone = cone if cone is not None else self.cone
+        return np.array([self.states[step] & cone.masks(step)[0] for step in range(self.max_steps + 1)])
+
+    def values(self, ids):
+        """
+        Values of the given integer ids (state or path variables) of the
+        compiled system, as a boolean array
+        """
+
+        system = self.system
+        ids = np.asarray(ids, dtype=np.int64) - 1
+        step, offset = np.divmod(ids, system.layer_size)
+        n = system.num_of_vars
+        values = np.zeros(len(ids), dtype=bool)
+        state = offset < n
+        values[state] = self.states[step[state], offset[state]]
+        path = ~state
+        values[path] = self.paths[step[path], offset[path] - n]
+        return values
+
+    def literals(self, cone=None):
+        """
+        The signed literals of the state and path variables kept by the
+        cone of influence (default: the one given to the constructor)
+        """
+
+        system = self.system
+        cone = cone if cone is not None else self.cone
+        ids = []
+        for step in range(self.max_steps + 1):
+            var_mask, ded_mask = cone.masks(step)
+            ids.append(step * system.layer_size + np.flatnonzero(var_mask) + 1)
+            if step > 0:
+                ids.append((step - 1) * system.layer_size + system.num_of_vars + np.flatnonzero(ded_mask) + 1)
+        ids = np.concatenate(ids)
+        return np.where(self.values(ids), ids, -ids).tolist()
@@ -0,0 +1,75 @@
+"""
+Startup time of the command line interface.
+
+Backends (Sage, MiniZinc, OR-Tools, SMT solvers, ...) are resolved lazily, so
+importing the CLI, printing its help, or solving with a backend that does not
+need them must stay cheap and must not import any of them.
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+# Generous enough for slow CI machines; an eager import of Sage or MiniZinc
+# alone takes several seconds
+STARTUP_BUDGET = float(os.environ.get("AUTOGUESS_STARTUP_BUDGET", "2.0"))
+
+HEAVY_MODULES = ("sage", "minizinc", "ortools", "pysmt", "z3", "gurobipy")
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+EXAMPLE1 = os.path.join(os.path.dirname(TESTS_DIR), "ciphers", "Example1", "relationfile.txt")
+
+
+def timed_run(args, cwd=TESTS_DIR, env=None):
+    # Not from the repository root, where the legacy autoguess.py script
+    # would shadow the installed package
+    start_time = time.perf_counter()
+    result = subprocess.run(args, capture_output=True, text=True, cwd=cwd, env=env)
+    elapsed_time = time.perf_counter() - start_time
+    assert result.returncode == 0, result.stderr
+    return result, elapsed_time
+
+
+def imported_heavy_modules(importtime_log):
+    """Return the heavy modules listed in the output of python -X importtime"""
+    modules = re.findall(r"^import time:.*\|\s*(\S+)\s*$", importtime_log, re.MULTILINE)
+    return sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+
+
+def test_import_cli_is_fast_and_lazy():
+    check = ("import sys, autoguess.cli; "
+             "print(' '.join(m for m in sys.modules if m.split('.')[0] in %r))" % (HEAVY_MODULES,))
+    result, elapsed_time = timed_run([sys.executable, "-c", check])
+    assert result.stdout.split() == []
+    assert elapsed_time < STARTUP_BUDGET
+
+
+def test_help_is_fast():
+    executable = shutil.which("autoguess")
+    if executable is None:
+        pytest.skip("the autoguess entry point is not installed")
+    result, elapsed_time = timed_run([executable, "-s", "sat", "--help"])
+    assert "usage" in result.stdout
+    assert elapsed_time < STARTUP_BUDGET
+
+
+@pytest.mark.parametrize("solver, extra_args, expected", [
+    ("sat", ["-mg", "2", "-ms", "5"], "Number of guesses:         2"),
+    ("propagate", ["-kn", "s,v"], "Total known after prop.:   7 / 7"),
+])
+def test_solve_is_fast_and_lazy(tmp_path, solver, extra_args, expected):
+    pytest.importorskip("pysat")
+    env = dict(os.environ, AUTOGUESS_CACHE_DIR=str(tmp_path / "cache"),
+               AUTOGUESS_TEMP_DIR=str(tmp_path / "temp"))
+    args = [sys.executable, "-X", "importtime", "-m", "autoguess",
+            "-i", EXAMPLE1, "-s", solver, "--nograph",
+            "-o", str(tmp_path / "output")] + extra_args
+    result, elapsed_time = timed_run(args, cwd=str(tmp_path), env=env)
+    assert expected in result.stdout
+    assert imported_heavy_modules(result.stderr) == []
+    assert elapsed_time < STARTUP_BUDGET